@@ -23,9 +23,12 @@ Run this file:  python 06_first_local_ai_call.py
 ================================================================
 """
 
+import asyncio
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from llm_client import aclose_clients, gather_bounded, get_async_client, get_client
+from token_budget import count_tokens
 
 # ============================================================
 # STEP 1: Load configuration from .env
@@ -52,11 +55,14 @@ print(f"🤖 Model:    {model}")
 # server. LM Studio exposes one at /v1.
 #
 # api_key is required by the SDK but the local server ignores
-# it — pass any non-empty string.
-client = OpenAI(
-    base_url=base_url,
-    api_key="lm-studio",  # value doesn't matter for local server
-)
+# it — pass any non-empty string. Under the hood that's just:
+#
+#   client = OpenAI(base_url=base_url, api_key="lm-studio")
+#
+# llm_client.py does exactly that ONCE per provider, with a tuned
+# keep-alive connection pool, so every call reuses the same
+# connection instead of opening a new one.
+client = get_client("local")
 print("\n✅ Client created.")
 
 
@@ -65,15 +71,20 @@ print("\n✅ Client created.")
 # ============================================================
 prompt = "In 3 short bullets, what makes Python a great language for AI?"
 
+# We can count tokens BEFORE sending — locally, no round trip
+# (token_budget.py). Compare the estimate with the real number
+# the server reports below.
+messages = [{"role": "user", "content": prompt}]
+estimated = count_tokens(messages, model)
+
 print(f"\n🗣️  Prompt: {prompt}")
+print(f"🔢 Estimated prompt tokens (local): {estimated}")
 print("⏳ Asking the local model...\n")
 
 try:
     response = client.chat.completions.create(
         model=model,
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
+        messages=messages,
         temperature=0.7,   # 0 = focused, 1 = creative
         max_tokens=200,
     )
@@ -90,6 +101,7 @@ try:
         print(f"\n📊 Tokens — prompt: {usage.prompt_tokens}, "
               f"completion: {usage.completion_tokens}, "
               f"total: {usage.total_tokens}")
+        print(f"   (local estimate was {estimated} prompt tokens)")
 
 except Exception as e:
     print(f"❌ ERROR: {type(e).__name__}: {e}")
@@ -103,24 +115,41 @@ except Exception as e:
 # ============================================================
 # STEP 4: Try a different temperature
 # ============================================================
+# The two requests don't depend on each other, so instead of
+# waiting for one round trip and THEN the next, we fire both at
+# once with the async client and wait for them together.
 print("\n" + "=" * 60)
 print("BONUS: Same prompt, two temperatures")
 print("=" * 60)
 
 creative_prompt = "Write a one-sentence motto for a Python + AI bootcamp."
+temperatures = (0.2, 1.0)
 
-for temp in (0.2, 1.0):
-    print(f"\n🌡️  temperature={temp}")
+
+async def motto_at(temp):
+    aclient = get_async_client("local")
     try:
-        r = client.chat.completions.create(
+        r = await aclient.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": creative_prompt}],
             temperature=temp,
             max_tokens=80,
         )
-        print(f"   → {r.choices[0].message.content.strip()}")
+        return f"   → {r.choices[0].message.content.strip()}"
     except Exception as e:
-        print(f"   (skipped: {e})")
+        return f"   (skipped: {e})"
+
+
+async def all_mottos():
+    try:
+        return await gather_bounded([motto_at(t) for t in temperatures])
+    finally:
+        await aclose_clients()
+
+
+for temp, line in zip(temperatures, asyncio.run(all_mottos())):
+    print(f"\n🌡️  temperature={temp}")
+    print(line)
 
 
 print("\n" + "=" * 60)
@@ -22,17 +22,12 @@ Run this file:  python 07_chat_with_memory.py
 ================================================================
 """
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from llm_client import get_client, get_model
+from response_cache import ResponseCache
+from run_report import parse_run, run_facts
 
-load_dotenv()
-
-client = OpenAI(
-    base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
-    api_key="lm-studio",
-)
-model = os.getenv("LOCAL_LLM_MODEL", "local-model")
+client = get_client("local")
+model = get_model("local")
 
 print("=" * 60)
 print("MULTI-TURN CHAT WITH MEMORY")
@@ -132,19 +127,32 @@ Skipped:
 - referral_share_link           (feature-flagged off)
 """
 
+# Count in Python, not in the model: run_report.py parses the notes
+# (free text, JUnit XML or pytest JSON) and we send the exact totals
+# and failure list. No arithmetic for the model to get wrong.
+run = parse_run(meeting_notes)
+print(f"🔢 Counted locally: {run['passed']} passed, {run['failed']} failed, "
+      f"{run['skipped']} skipped — pass rate {run['pass_rate']}%")
+
 summary_messages = [
     {"role": "system",
      "content": "You are an SDET. Reply with two sections: 'Headline' "
                 "(1 line: green/amber/red + reason) and 'Top issues' "
-                "(bullets with module + 1-line cause)."},
+                "(bullets with module + 1-line cause). The numbers you are "
+                "given are exact — quote them, don't recompute them."},
     {"role": "user",
-     "content": f"Summarize this test run:\n\n{meeting_notes}"},
+     "content": f"Summarize this test run:\n\n{run_facts(run)}"},
 ]
 
-r = client.chat.completions.create(
-    model=model, messages=summary_messages, max_tokens=400, temperature=0.3
+# Same notes + same prompt every run → serve repeats from the
+# on-disk cache (response_cache.py) instead of the model.
+cache = ResponseCache()
+r = cache.create(
+    client, model=model, messages=summary_messages, max_tokens=400, temperature=0.3
 )
 print(r.choices[0].message.content)
+stats = cache.stats()
+print(f"\n💾 Cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
 
 
 print("\n" + "=" * 60)
@@ -156,6 +164,7 @@ print("""
      message, send the full list again.
    • System prompt = behaviour. Set once, reuse across turns.
    • Lower temperature for "stick to the facts" tasks.
+   • Let Python do the counting; send the model exact facts.
 
 🚀 Next: Video 8 — wrap all this in a class and build a real
    personal Life Assistant.
@@ -30,7 +30,11 @@ Run this file:  python 08_smarter_ai_patterns.py
 
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from llm_client import get_model, print_token, stream_chat
+from llm_router import ProviderRouter
+from response_cache import ResponseCache
+from tracing import span
 
 load_dotenv()
 
@@ -62,33 +66,40 @@ print("\n" + "-" * 60)
 print("PART 1 — Connect to OpenRouter")
 print("-" * 60)
 
-if os.getenv("OPENROUTER_API_KEY"):
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-    )
-    model = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
-    where = "CLOUD (OpenRouter)"
-else:
-    # Fall back to LM Studio so the file still works offline.
-    client = OpenAI(
-        base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
-        api_key="lm-studio",
-    )
-    model = os.getenv("LOCAL_LLM_MODEL", "local-model")
-    where = "LOCAL (LM Studio)"
-
-print(f"✅ Using {where}")
-print(f"   model = {model}")
-
-# Tiny "hello" call to prove the connection works.
-hello = client.chat.completions.create(
+# llm_client.py keeps one pooled client per provider. Instead of
+# choosing ONE of them here, we hand both to a router
+# (llm_router.py): every call goes to whichever backend is
+# currently fastest and healthy, and if LM Studio stalls or
+# OpenRouter errors mid-session, the next one answers instead.
+#
+# The router looks like a client (router.chat.completions.create),
+# so the rest of this file doesn't need to know it's there.
+client = ProviderRouter()
+model = "auto"   # the router fills in each provider's own model
+
+names = {"openrouter": "CLOUD (OpenRouter)", "local": "LOCAL (LM Studio)"}
+where = " + ".join(names[b.provider] for b in client.backends)
+if len(client.backends) == 1:
+    where += "  — add OPENROUTER_API_KEY to .env for cloud failover"
+
+print(f"✅ Routing across {where}")
+for b in client.backends:
+    print(f"   {b.provider:<10} model = {get_model(b.provider)}")
+
+# Tiny "hello" call to prove the connection works. It's fully
+# deterministic (temperature=0), so the answer is cached on disk
+# (response_cache.py) and reruns skip the round trip.
+cache = ResponseCache()
+hello = cache.create(
+    client,
     model=model,
     messages=[{"role": "user", "content": "Reply with the single word: OK."}],
     max_tokens=10,
     temperature=0,
 )
-print(f"   Connection test → {hello.choices[0].message.content.strip()!r}")
+print(f"   Connection test → {hello.choices[0].message.content.strip()!r}"
+      f"  via {client.last_provider or 'cache'}"
+      f"  (cache hits so far: {cache.stats()['hits']})")
 
 
 # ============================================================
@@ -183,19 +194,67 @@ def ask(client, model, history, user_text, **params):
     """
     history.append({"role": "user", "content": user_text})
 
-    response = client.chat.completions.create(
+    # Timed (with token counts) when tracing is on — see tracing.py
+    with span("ask", messages=len(history)):
+        with span("llm.request", model=model) as request:
+            response = client.chat.completions.create(
+                model=model,
+                messages=history,
+                **params,
+            )
+            request.usage(response)
+
+    reply = response.choices[0].message.content
+    history.append({"role": "assistant", "content": reply})
+    return reply
+
+
+async def ask_async(aclient, model, history, user_text, **params):
+    """
+    Same as ask(), but with the async client (llm_client.get_async_client)
+    so several INDEPENDENT questions can be in flight at once:
+
+        replies = await gather_bounded([
+            ask_async(aclient, model, [system], q) for q in questions
+        ])
+
+    The request is built from a snapshot of `history`, and both new
+    messages are appended together once the reply arrives.
+    """
+    user_msg = {"role": "user", "content": user_text}
+
+    response = await aclient.chat.completions.create(
         model=model,
-        messages=history,
+        messages=history + [user_msg],
         **params,
     )
 
     reply = response.choices[0].message.content
-    history.append({"role": "assistant", "content": reply})
+    history.extend([user_msg, {"role": "assistant", "content": reply}])
     return reply
 
 
-def chat_loop(client, model):
-    """A simple REPL: ask → reply → ask → ... until 'quit'."""
+def ask_streaming(client, model, history, user_text, **params):
+    """
+    Like ask(), but prints the reply token-by-token as it is generated
+    (see llm_client.stream_chat). Returns (reply, stats) where stats
+    holds time-to-first-token and tokens/sec for this turn.
+    """
+    history.append({"role": "user", "content": user_text})
+    reply, stats = stream_chat(
+        client, on_token=print_token, model=model, messages=history, **params
+    )
+    history.append({"role": "assistant", "content": reply})
+    return reply, stats
+
+
+def chat_loop(client, model, stream=True):
+    """
+    A simple REPL: ask → reply → ask → ... until 'quit'.
+
+    With stream=True (the default) the reply is printed as it arrives,
+    followed by its time-to-first-token and tokens/sec.
+    """
     history = [
         {"role": "system",
          "content": "You are a friendly, concise tutor. 3 short bullets max."}
@@ -215,26 +274,39 @@ def chat_loop(client, model):
             print("👋 Bye!")
             break
 
+        params = dict(
+            temperature=0.5,
+            max_tokens=300,
+            # Try uncommenting these to feel their effect:
+            # top_p=0.9,
+            # presence_penalty=0.3,
+            # frequency_penalty=0.3,
+            # stop=["\n\n"],
+        )
         try:
-            reply = ask(
-                client, model, history, user_text,
-                temperature=0.5,
-                max_tokens=300,
-                # Try uncommenting these to feel their effect:
-                # top_p=0.9,
-                # presence_penalty=0.3,
-                # frequency_penalty=0.3,
-                # stop=["\n\n"],
-            )
+            if stream:
+                print("\n🤖 Tutor: ", end="", flush=True)
+                _, stats = ask_streaming(client, model, history, user_text, **params)
+                print(f"\n   ⏱️  first token {stats['ttft']:.2f}s · "
+                      f"{stats['tokens_per_sec']:.1f} tok/s\n")
+            else:
+                reply = ask(client, model, history, user_text, **params)
+                print(f"\n🤖 Tutor: {reply}\n")
         except Exception as e:
             print(f"❌ {type(e).__name__}: {e}")
             continue
 
-        print(f"\n🤖 Tutor: {reply}\n")
-
     print(f"📊 Conversation length: {len(history)} messages "
           f"(including system prompt).")
 
+    # When `client` is the router, show how each backend did
+    if isinstance(client, ProviderRouter):
+        for provider, h in client.stats().items():
+            print(f"   {provider:<10} calls={h['calls']:<3} "
+                  f"avg={h['avg_latency']:.2f}s errors={h['error_rate']:.0%} "
+                  f"circuit={h['circuit']}")
+        print(f"   Failovers this session: {client.failovers}")
+
 
 # Run the loop. Comment this out if you just want to read the file.
 chat_loop(client, model)
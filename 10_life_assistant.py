@@ -24,20 +24,19 @@ Run this file:  python 10_life_assistant.py
 ================================================================
 """
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from chat_memory import ConversationMemory
+from llm_client import get_async_client, get_client, get_model, print_token, stream_chat
+from token_budget import ContextPlanner
+from tracing import span
+from warmup import start_warmup
 
 # ============================================================
 # Setup — connect to your local LLM
 # ============================================================
-load_dotenv()
-
-client = OpenAI(
-    base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
-    api_key="lm-studio",  # local server ignores the value
-)
-model = os.getenv("LOCAL_LLM_MODEL", "local-model")
+# One shared, pooled client (see llm_client.py) — every turn
+# reuses the same keep-alive connection to LM Studio.
+client = get_client("local")
+model = get_model("local")
 
 
 # ============================================================
@@ -109,29 +108,99 @@ categories = {
 class LifeAssistant:
     """A persona-driven assistant with conversation memory."""
 
-    def __init__(self, client, model, system_prompt, category_name):
+    def __init__(self, client, model, system_prompt, category_name,
+                 async_client=None, memory_budget=1500):
         self.client = client
+        self.async_client = async_client  # only needed for achat()
         self.model = model
         self.category = category_name
+        # Full transcript, kept locally for stats — NOT what we send
         self.history = [{"role": "system", "content": system_prompt}]
+        # What we send: system prompt + running summary + recent turns
+        # that fit in `memory_budget` tokens (see chat_memory.py)
+        self.memory = ConversationMemory(system_prompt, budget=memory_budget,
+                                         model=model)
+        # Checks every request against the model's context window
+        # BEFORE sending it (see token_budget.py)
+        self.planner = ContextPlanner(client, model)
         self.question_count = 0
-
-    def chat(self, user_message):
-        """Send a message, get a reply, remember both."""
-        self.history.append({"role": "user", "content": user_message})
+        self.turn_stats = []  # one {ttft, total, tokens, tokens_per_sec} per streamed turn
+
+    def _remember(self, role, content):
+        self.history.append({"role": role, "content": content})
+        self.memory.add(role, content)
+
+    def chat(self, user_message, stream=False, on_token=print_token):
+        """
+        Send a message, get a reply, remember both.
+
+        With stream=True each token is handed to `on_token` as it
+        arrives (printed by default), and the turn's timing is saved
+        in self.turn_stats.
+        """
+        with span("life.chat", stream=stream):
+            with span("life.build_messages") as build:
+                self._remember("user", user_message)
+                self.question_count += 1
+                self.memory.record_request()
+
+                messages, max_tokens = self.planner.fit(self.memory.messages(),
+                                                        max_tokens=800)
+                build.set(messages=len(messages))
+            params = dict(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.7,
+            )
+            with span("llm.request", model=self.model) as request:
+                if stream:
+                    reply, stats = stream_chat(self.client, on_token=on_token, **params)
+                    self.turn_stats.append(stats)
+                    # Waiting for the first token = network + prompt processing
+                    request.phase("llm.first_token", 0, stats["ttft"])
+                    request.phase("llm.generate", stats["ttft"], stats["total"] - stats["ttft"],
+                                  tokens=stats["tokens"])
+                    request.set(completion_tokens=stats["tokens"])
+                else:
+                    completion = self.client.chat.completions.create(**params)
+                    reply = completion.choices[0].message.content
+                    request.usage(completion)
+            if not reply:
+                reply = "(The model returned an empty response — try a simpler question.)"
+
+            self._remember("assistant", reply)
+            # Fold the oldest turns into the summary once we're over budget
+            with span("life.compact"):
+                self.memory.compact(self.client, self.model)
+            return reply
+
+    async def achat(self, user_message):
+        """Async chat(): same request, but awaitable so callers can fan out."""
+        aclient = self.async_client or get_async_client("local")
+        user_msg = {"role": "user", "content": user_message}
         self.question_count += 1
+        # Like chat(): the user turn counts before the request is logged.
+        # It's added to memory with the reply, below, as a pair.
+        self.memory.record_request(pending=[user_msg])
 
-        completion = self.client.chat.completions.create(
+        messages, max_tokens = self.planner.fit(
+            self.memory.messages() + [user_msg], max_tokens=800
+        )
+        completion = await aclient.chat.completions.create(
             model=self.model,
-            messages=self.history,
-            max_tokens=800,
+            messages=messages,
+            max_tokens=max_tokens,
             temperature=0.7,
         )
         reply = completion.choices[0].message.content
         if not reply:
             reply = "(The model returned an empty response — try a simpler question.)"
 
-        self.history.append({"role": "assistant", "content": reply})
+        # Append the pair together so overlapping calls never interleave
+        self._remember("user", user_message)
+        self._remember("assistant", reply)
+        await self.memory.acompact(aclient, self.model)
         return reply
 
     @property
@@ -166,6 +235,10 @@ Keep it under 80 words."""
 # Main flow
 # ============================================================
 def main():
+    # Load the model in the background while the user reads the menu —
+    # LM Studio's first request is the slow one (see warmup.py)
+    warm = start_warmup(client, model)
+
     print("═" * 50)
     print("   🌟 YOUR PERSONAL LIFE ASSISTANT 🌟")
     print("   Built with Python + a local LLM")
@@ -182,6 +255,10 @@ def main():
 
     selected = categories[choice]
     print(f"\n✅ Loading: {selected['name']}")
+    print(f"🔥 Model warm-up: {warm.describe()}")
+    if warm.status != "failed":
+        # Pre-process this persona's system prompt while they type
+        start_warmup(client, model, selected["prompt"])
     print("─" * 50)
     print("Ask me anything! Type 'quit' to exit.\n")
 
@@ -199,14 +276,19 @@ def main():
         if user_input.lower() in {"quit", "exit", "q"}:
             break
 
+        # Stream the reply so the first words show up straight away
+        print("\n🤖 Assistant: ", end="", flush=True)
         try:
-            reply = assistant.chat(user_input)
+            assistant.chat(user_input, stream=True)
         except Exception as e:
             print(f"\n❌ {type(e).__name__}: {e}")
             print("   (Is LM Studio still running?)\n")
             continue
 
-        print(f"\n🤖 Assistant: {reply}\n")
+        stats = assistant.turn_stats[-1]
+        print(f"\n   ⏱️  first token {stats['ttft']:.2f}s · "
+              f"{stats['tokens_per_sec']:.1f} tok/s · "
+              f"{assistant.memory.turn_savings[-1]} prompt tokens saved\n")
 
     # ----- Farewell + stats -----
     if assistant.question_count == 0:
@@ -227,6 +309,15 @@ def main():
     print(f"   Category:           {selected['name']}")
     print(f"   Questions asked:    {assistant.question_count}")
     print(f"   Messages in memory: {assistant.message_count}")
+    if assistant.memory.tokens_saved:
+        print(f"   Prompt tokens saved: {assistant.memory.tokens_saved} "
+              f"({assistant.memory.compactions} compaction(s))")
+    if assistant.turn_stats:
+        n = len(assistant.turn_stats)
+        avg_ttft = sum(t["ttft"] for t in assistant.turn_stats) / n
+        avg_tps = sum(t["tokens_per_sec"] for t in assistant.turn_stats) / n
+        print(f"   Avg first token:    {avg_ttft:.2f}s")
+        print(f"   Avg speed:          {avg_tps:.1f} tokens/sec")
     print("─" * 50)
 
     print("""
@@ -0,0 +1,283 @@
+"""
+================================================================
+catalog_import.py — The giant spreadsheet, straight into a Catalog
+================================================================
+
+The assignment's scenario: test cases live in a spreadsheet. Export
+it (CSV, TSV, or one JSON object per line) and load it here instead
+of typing dicts by hand:
+
+   from catalog_import import import_cases
+
+   catalog, report = import_cases("test_cases.csv")
+   report["imported"], report["rejected"]   # → 1999874, 126
+   report["errors"][:3]                     # → [(line, id, reason), ...]
+
+   python catalog_import.py test_cases.csv  # same, with a printed report
+
+The file is read row by row and handled in chunks of `chunk_rows`,
+so memory use is the Catalog itself plus one chunk — a 5-million-row
+export never sits in memory as a list of dicts.
+
+Spreadsheets are messy, so every row is normalized first:
+
+   status     — "Passed", "OK", "✅" → pass;  "FAILED", "error" → fail;
+                "Skipped", "blocked", "not run" → skip
+   priority   — "high", "P1", "critical", "1" → High  (and so on)
+   automated  — "Yes", "TRUE", "x", "1", "automated" → True;
+                "No", "manual", "0", empty → False
+   headers    — "Test Case ID", "Name", "Component", "Result"... are
+                recognized as id, title, module, status
+
+A row that still doesn't fit (unknown status, missing id, duplicate
+id, bad JSON, a broken CSV quote...) is counted and skipped — the
+import carries on. The first `max_errors` problems are kept with
+their line numbers. Bytes that aren't valid in `encoding` (a cp1252
+"Café" read as UTF-8) become "�" instead of stopping the import;
+pass encoding="cp1252" for older Excel exports.
+Benchmark: python benchmarks/bench_catalog_import.py
+================================================================
+"""
+
+import csv
+import json
+import sys
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+from compact_catalog import Catalog
+
+# Lowercased spreadsheet spellings → catalog values
+STATUS_ALIASES = {
+    "pass": ("pass", "passed", "ok", "success", "green", "✅", "✔"),
+    "fail": ("fail", "failed", "failure", "error", "broken", "red", "❌", "✘"),
+    "skip": ("skip", "skipped", "blocked", "not run", "pending", "n/a", "ignored", "⏭"),
+}
+PRIORITY_ALIASES = {
+    "High": ("high", "h", "p0", "p1", "critical", "blocker", "1"),
+    "Medium": ("medium", "med", "m", "p2", "major", "normal", "2"),
+    "Low": ("low", "l", "p3", "p4", "minor", "trivial", "3", "4"),
+}
+AUTOMATED_ALIASES = {
+    True: ("yes", "y", "true", "t", "1", "x", "✅", "auto", "automated"),
+    False: ("no", "n", "false", "f", "0", "", "-", "manual"),
+}
+HEADER_ALIASES = {
+    "id": ("id", "test id", "test case id", "tc id", "case id", "key"),
+    "title": ("title", "name", "test name", "test case", "summary", "description"),
+    "module": ("module", "component", "area", "feature", "suite"),
+    "priority": ("priority", "prio", "severity"),
+    "status": ("status", "result", "outcome", "last result"),
+    "automated": ("automated", "automation", "is automated", "auto"),
+}
+REQUIRED = ("id", "title", "module", "priority", "status")   # automated defaults to False
+FIELD_SIZE_LIMIT = 16 * 1024 * 1024   # csv's default (128 KB) is smaller than some exported cells
+
+
+def _squash(text):
+    """'  Not_Run ' → 'not run': the spelling the alias tables use."""
+    return " ".join(text.lower().replace("_", " ").split())
+
+
+def _lookup(aliases):
+    return {alias: value for value, names in aliases.items() for alias in names}
+
+
+_STATUS = _lookup(STATUS_ALIASES)
+_PRIORITY = _lookup(PRIORITY_ALIASES)
+_AUTOMATED = _lookup(AUTOMATED_ALIASES)
+_HEADERS = _lookup(HEADER_ALIASES)
+
+
+class RowError(ValueError):
+    """A row that can't go into the catalog. `reason` groups it in the report."""
+
+    def __init__(self, reason, value=None):
+        super().__init__(reason if value is None else f"{reason} {value!r}")
+        self.reason = reason
+
+
+# ============================================================
+# Normalizing one row
+# ============================================================
+def _text(raw, field):
+    """The stripped text of a required field, or RowError if it's empty."""
+    value = raw.get(field)
+    text = value.strip() if isinstance(value, str) else "" if value is None else str(value).strip()
+    if not text:
+        raise RowError(f"missing {field}")
+    return text
+
+
+def _normalize(text, table, field):
+    result = table.get(text)   # exact spelling first: the common case
+    if result is None:
+        result = table.get(_squash(text))
+    if result is None:
+        raise RowError(f"unknown {field}", text)
+    return result
+
+
+def normalize_case(raw):
+    """A raw row {field: value} → a catalog case dict, or RowError."""
+    automated = raw.get("automated")
+    if not isinstance(automated, bool):
+        automated = False if automated is None else \
+            _normalize(str(automated).strip(), _AUTOMATED, "automated")
+    return {
+        "id": _text(raw, "id"),
+        "title": _text(raw, "title"),
+        "module": _text(raw, "module").lower(),   # "Login" and "login" are one module
+        "priority": _normalize(_text(raw, "priority"), _PRIORITY, "priority"),
+        "status": _normalize(_text(raw, "status"), _STATUS, "status"),
+        "automated": automated,
+    }
+
+
+# ============================================================
+# Reading the file: (line number, {field: value}) per row
+# ============================================================
+def map_headers(header):
+    """Column positions of the catalog fields in a header row."""
+    columns = {}
+    for position, name in enumerate(header):
+        field = _HEADERS.get(_squash(name))
+        if field is not None and field not in columns:
+            columns[field] = position
+    missing = [field for field in REQUIRED if field not in columns]
+    if missing:
+        raise ValueError(f"no column for {', '.join(missing)} in header {header!r}")
+    return columns
+
+
+def _delimited_rows(f, delimiter):
+    csv.field_size_limit(max(csv.field_size_limit(), FIELD_SIZE_LIMIT))
+    reader = csv.reader(f, delimiter=delimiter)
+    columns = map_headers(next(reader, []))
+    fields = list(columns.items())
+    width = max(columns.values()) + 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:   # a field over the limit, a stray NUL byte...
+            yield reader.line_num, RowError("unreadable row", str(e))
+            continue
+        if not row or not any(row):
+            continue   # blank line
+        if len(row) < width:
+            row += [None] * (width - len(row))
+        yield reader.line_num, {field: row[position] for field, position in fields}
+
+
+def _jsonl_rows(f):
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError("bad JSON", e.msg)
+            continue
+        if not isinstance(data, dict):
+            yield line_no, RowError("not a JSON object")
+            continue
+        yield line_no, {_HEADERS.get(_squash(key), key): value for key, value in data.items()}
+
+
+def detect_format(path):
+    """"csv", "tsv" or "jsonl", from the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if suffix in (".tsv", ".tab"):
+        return "tsv"
+    return "csv"
+
+
+def read_rows(f, fmt):
+    """(line number, raw row) pairs from an open text file, one at a time."""
+    if fmt == "jsonl":
+        return _jsonl_rows(f)
+    if fmt in ("csv", "tsv"):
+        return _delimited_rows(f, "\t" if fmt == "tsv" else ",")
+    raise ValueError(f"unknown format {fmt!r} (csv, tsv or jsonl)")
+
+
+# ============================================================
+# Importing
+# ============================================================
+def import_cases(source, catalog=None, fmt=None, chunk_rows=10_000, max_errors=100,
+                 on_chunk=None, encoding="utf-8-sig"):
+    """Stream a CSV/TSV/JSONL export into a Catalog; returns (catalog, report).
+
+    `source` is a path or an open text file. Bad rows are skipped and
+    reported, never fatal. on_chunk(report), if given, runs after each
+    chunk — handy for a progress line.
+    """
+    catalog = Catalog() if catalog is None else catalog
+    report = {
+        "rows": 0, "imported": 0, "rejected": 0,
+        "errors": [],              # first max_errors (line, id, reason)
+        "reasons": Counter(),      # reason → rows, for every rejected row
+    }
+    if isinstance(source, (str, Path)):
+        fmt = fmt or detect_format(source)
+        # utf-8-sig: Excel puts a byte-order mark in front of the header
+        with open(source, newline="", encoding=encoding, errors="replace") as f:
+            _load(read_rows(f, fmt), catalog, report, chunk_rows, max_errors, on_chunk)
+    else:
+        _load(read_rows(source, fmt or "csv"), catalog, report, chunk_rows, max_errors,
+              on_chunk)
+    report["reasons"] = dict(report["reasons"].most_common())
+    return catalog, report
+
+
+def _load(rows, catalog, report, chunk_rows, max_errors, on_chunk):
+    append, row_of = catalog.append, catalog.row_of
+    errors, reasons = report["errors"], report["reasons"]
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        for line_no, raw in chunk:
+            try:
+                if isinstance(raw, RowError):
+                    raise raw
+                case = normalize_case(raw)
+                if case["id"] in row_of:
+                    raise RowError("duplicate id", case["id"])
+                append(case)
+            except RowError as e:
+                reasons[e.reason] += 1
+                if len(errors) < max_errors:
+                    case_id = raw.get("id") if isinstance(raw, dict) else None
+                    errors.append((line_no, case_id, str(e)))
+                report["rejected"] += 1
+            else:
+                report["imported"] += 1
+        report["rows"] += len(chunk)
+        if on_chunk is not None:
+            on_chunk(report)
+
+
+def print_report(report, catalog):
+    print(f"📥 Read {report['rows']:,} row(s): {report['imported']:,} imported, "
+          f"{report['rejected']:,} rejected")
+    for reason, n in report["reasons"].items():
+        print(f"   ⚠️  {reason}: {n:,}")
+    for line_no, case_id, reason in report["errors"][:10]:
+        print(f"   line {line_no}: {case_id or '(no id)'} — {reason}")
+    if len(catalog):
+        pretty = ", ".join(f"{k}={v:,}" for k, v in catalog.status_summary().items())
+        print(f"📊 Status summary: {pretty}")
+        print(f"📈 Pass rate: {catalog.pass_rate():.1f}%")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"usage: python {Path(__file__).name} <cases.csv|.tsv|.jsonl>")
+    loaded, result = import_cases(sys.argv[1])
+    print_report(result, loaded)
@@ -0,0 +1,477 @@
+"""
+================================================================
+compact_catalog.py — The test case catalog, a million rows deep
+================================================================
+
+The assignment's catalog is a list of six-key dicts. That's the
+right shape to learn with, but every case costs a dict plus its
+strings (hundreds of bytes), and every summary is a Python loop.
+Fine at 50 cases; slow and heavy at a few million.
+
+Catalog stores the same data by COLUMN instead of by row:
+
+   id, title           — plain lists of strings
+   module, priority,   — each distinct value stored ONCE; the column
+   status                holds its small-int code (array of bytes)
+   automated           — a bitmap, 8 cases per byte
+
+...and still looks like the list of dicts, so the assignment's
+functions work on it unchanged:
+
+   catalog = Catalog([tc1, tc2, tc3])
+   catalog.append({"id": "TC-004", ...})
+   catalog[0]["status"]            # → "pass"
+   catalog[0]["status"] = "fail"   # updates the column
+   for tc in catalog: ...          # dict-like rows
+
+   catalog.status_summary()        # → {"pass": 2, "fail": 2, "skip": 1}
+   catalog.pass_rate()             # → 40.0
+   catalog.pass_rate(module="login")
+   catalog.memory_bytes()          # what the columns take
+
+Status summaries are never counted on demand: the catalog keeps
+running pass/fail/skip counters — overall, per module and per
+priority — and every append, remove or field update adjusts them
+by one. A dashboard can poll pass_rate() while a run streams
+results in, and each poll costs the same at 50 cases or 5 million.
+Other per-value counts (counts("module")) run over the code column
+in C (NumPy's bincount when NumPy is installed, array.count()
+otherwise). Compare with the dict version:
+python benchmarks/bench_catalog.py
+
+Filtering doesn't loop over cases either. Module, priority, status
+and automated each have a case-insensitive index — one bitmap of
+rows per value, like the automated column — kept up to date by
+append / field updates / remove, so
+
+   catalog.where(module="login", status="FAIL", priority="high")
+   catalog.count_where(status="fail", automated=False)
+
+AND a few bitmaps together (a couple of hundred KB per million
+cases) instead of checking every case. Each index also keeps how
+many rows each value has, so the smallest bitmap goes first, an
+empty one answers 0 straight away, and a one-field count_where()
+is a dict lookup. where() returns a lazy sequence — each CaseView
+is made as you read it — and rows_where() gives the bare row
+numbers. remove() moves the LAST case
+into the freed slot (O(1)), so removing changes the order of the
+rows after it.
+================================================================
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+try:
+    import numpy as np  # optional — only makes counting faster
+except ImportError:
+    np = None
+
+FIELDS = ("id", "title", "module", "priority", "status", "automated")
+INDEXED = ("module", "priority", "status", "automated")
+COUNTED = ("module", "priority", "status")   # changing any of these moves a status counter
+STATUSES = ("pass", "fail", "skip")
+PRIORITIES = ("High", "Medium", "Low")
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]   # set bits per byte
+
+
+class Vocabulary:
+    """Interned strings ↔ small-int codes for one column."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """Code for `value`, adding it if it's new."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+class CaseView(Mapping):
+    """One row of a Catalog, read and written like the original dict."""
+
+    __slots__ = ("_catalog", "_row")
+
+    def __init__(self, catalog, row):
+        self._catalog = catalog
+        self._row = row
+
+    def __getitem__(self, field):
+        return self._catalog._get(self._row, field)
+
+    def __setitem__(self, field, value):
+        self._catalog._set(self._row, field, value)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class CaseRows(Sequence):
+    """Matching rows of a Catalog: CaseViews made on access, not up front."""
+
+    __slots__ = ("_catalog", "rows")
+
+    def __init__(self, catalog, rows):
+        self._catalog = catalog
+        self.rows = rows   # row numbers, ascending
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return CaseRows(self._catalog, self.rows[i])
+        return CaseView(self._catalog, int(self.rows[i]))
+
+    def __iter__(self):
+        catalog = self._catalog
+        for row in self.rows:
+            yield CaseView(catalog, int(row))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"<{len(self)} case(s)>"
+
+
+class Catalog:
+    """Column-oriented test case catalog with list-of-dicts access."""
+
+    def __init__(self, cases=()):
+        self.ids = []
+        self.titles = []
+        self.vocab = {
+            "module": Vocabulary(),
+            "priority": Vocabulary(PRIORITIES),
+            "status": Vocabulary(STATUSES),
+        }
+        self.columns = {field: array("B") for field in self.vocab}
+        self.automated = bytearray()   # bitmap: bit (row % 8) of byte (row // 8)
+        self.row_of = {}               # id → row
+        self.indexes = {field: {} for field in INDEXED}   # field → key → bitmap of rows
+        self.index_sizes = {field: {} for field in INDEXED}   # field → key → rows set
+        self.status_counts = {}                            # status key → cases
+        self.status_by = {"module": {}, "priority": {}}    # field → key → {status: cases}
+        self.extend(cases)
+
+    # ------------------------------------------------------------
+    # List-of-dicts behaviour
+    # ------------------------------------------------------------
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [CaseView(self, r) for r in range(len(self))[row]]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("catalog index out of range")
+        return CaseView(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield CaseView(self, row)
+
+    def __delitem__(self, row):
+        self.remove(self[row]["id"])
+
+    def append(self, case):
+        """Add one test case (a dict with the six assignment fields)."""
+        if case["id"] in self.row_of:
+            raise ValueError(f"duplicate test case id {case['id']!r}")
+        row = len(self.ids)
+        self.ids.append(case["id"])
+        self.titles.append(case["title"])
+        self.row_of[case["id"]] = row
+        for field, column in self.columns.items():
+            self._store_code(field, column, None, case[field])
+        if row % 8 == 0:
+            self.automated.append(0)
+        self._set_bit(row, case["automated"])
+        for field in INDEXED:
+            self._index_add(field, case[field], row)
+        self._count_row(row, 1)
+
+    def extend(self, cases):
+        for case in cases:
+            self.append(case)
+
+    def _store_code(self, field, column, row, value):
+        """Put `value`'s code in `column` (append if row is None), widening if needed."""
+        code = self.vocab[field].code(value)
+        if code > 255 and column.typecode == "B":   # > 256 distinct values
+            column = self.columns[field] = array("H", column)
+        if row is None:
+            column.append(code)
+        else:
+            column[row] = code
+
+    def _get(self, row, field):
+        if field in self.columns:
+            return self.vocab[field].values[self.columns[field][row]]
+        if field == "automated":
+            return bool(self.automated[row >> 3] >> (row & 7) & 1)
+        if field == "id":
+            return self.ids[row]
+        if field == "title":
+            return self.titles[row]
+        raise KeyError(field)
+
+    def _set(self, row, field, value):
+        if field in self.indexes:
+            old = self._get(row, field)
+            self._index_discard(field, old, row)
+            self._index_add(field, value, row)
+        if field in self.columns:
+            self._count_row(row, -1)
+            self._store_code(field, self.columns[field], row, value)
+            self._count_row(row, 1)
+        elif field == "automated":
+            self._set_bit(row, value)
+        elif field == "id":
+            if value != self.ids[row] and value in self.row_of:
+                raise ValueError(f"duplicate test case id {value!r}")
+            del self.row_of[self.ids[row]]
+            self.ids[row] = value
+            self.row_of[value] = row
+        elif field == "title":
+            self.titles[row] = value
+        else:
+            raise KeyError(field)
+
+    def _set_bit(self, row, value):
+        if value:
+            self.automated[row >> 3] |= 1 << (row & 7)
+        else:
+            self.automated[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+    def get(self, case_id):
+        """The case with this id, or None."""
+        row = self.row_of.get(case_id)
+        return None if row is None else CaseView(self, row)
+
+    def remove(self, case_id):
+        """Delete a case by id in O(1): the last case moves into its row."""
+        row = self.row_of.pop(case_id)
+        for field in INDEXED:
+            self._index_discard(field, self._get(row, field), row)
+        self._count_row(row, -1)
+        last = len(self.ids) - 1
+        if row != last:
+            moved = dict(CaseView(self, last))
+            for field in INDEXED:
+                self._index_discard(field, moved[field], last)
+                self._index_add(field, moved[field], row)
+            self.ids[row], self.titles[row] = moved["id"], moved["title"]
+            self.row_of[moved["id"]] = row
+            for field, column in self.columns.items():
+                column[row] = column[last]
+            self._set_bit(row, moved["automated"])
+        self.ids.pop()
+        self.titles.pop()
+        for column in self.columns.values():
+            column.pop()
+        self._set_bit(last, False)
+        if last % 8 == 0:
+            self.automated.pop()
+
+    # ------------------------------------------------------------
+    # Secondary indexes
+    # ------------------------------------------------------------
+    @staticmethod
+    def _key(value):
+        """Index key: case-insensitive for strings, True/False for automated."""
+        return value.strip().lower() if isinstance(value, str) else bool(value)
+
+    def _index_add(self, field, value, row):
+        index, key = self.indexes[field], self._key(value)
+        bitmap = index.get(key)
+        if bitmap is None:
+            bitmap = index[key] = bytearray()
+        if row >> 3 >= len(bitmap):   # bitmaps grow lazily, so rare values stay small
+            bitmap.extend(bytes((row >> 3) - len(bitmap) + 1))
+        bit = 1 << (row & 7)
+        if not bitmap[row >> 3] & bit:
+            bitmap[row >> 3] |= bit
+            sizes = self.index_sizes[field]
+            sizes[key] = sizes.get(key, 0) + 1
+
+    def _index_discard(self, field, value, row):
+        key = self._key(value)
+        bitmap = self.indexes[field].get(key)
+        bit = 1 << (row & 7)
+        if bitmap is not None and row >> 3 < len(bitmap) and bitmap[row >> 3] & bit:
+            bitmap[row >> 3] &= ~bit & 0xFF
+            self.index_sizes[field][key] -= 1
+
+    def _bitmaps(self, filters):
+        """The filters' bitmaps, fewest rows first — or None if one matches nothing."""
+        picked = []
+        for field, value in filters.items():
+            if field not in self.indexes:
+                raise KeyError(f"no index on {field!r} (indexed: {', '.join(INDEXED)})")
+            key = self._key(value)
+            size = self.index_sizes[field].get(key, 0)
+            if not size:
+                return None
+            picked.append((size, self.indexes[field][key]))
+        picked.sort(key=lambda pair: pair[0])
+        return [bitmap for _, bitmap in picked]
+
+    @staticmethod
+    def _and(bitmaps):
+        """AND of the bitmaps: a uint8 array with NumPy, else an int (bit n = row n).
+
+        NumPy ANDs the bytearrays in place as uint8 views, cut to the
+        shortest (bits past its end are 0 anyway) — no big int per filter.
+        """
+        if np is not None:
+            size = min(len(bitmap) for bitmap in bitmaps)
+            result = np.frombuffer(bitmaps[0], dtype=np.uint8, count=size).copy()
+            for bitmap in bitmaps[1:]:
+                np.bitwise_and(result, np.frombuffer(bitmap, dtype=np.uint8, count=size),
+                               out=result)
+            return result
+        mask = int.from_bytes(bitmaps[0], "little")
+        for bitmap in bitmaps[1:]:
+            mask &= int.from_bytes(bitmap, "little")
+            if not mask:
+                break
+        return mask
+
+    @staticmethod
+    def _rows(data):
+        """Row numbers of the set bits in a bitmap (bytes or an int), ascending."""
+        if isinstance(data, int):
+            data = data.to_bytes((data.bit_length() + 7) // 8, "little")
+        if np is not None:
+            bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+            return np.flatnonzero(bits)
+        return [i * 8 + bit for i, byte in enumerate(data) if byte for bit in _BITS[byte]]
+
+    def rows_where(self, **filters):
+        """Row numbers of the cases matching ALL filters, ascending (a NumPy array
+        when NumPy is installed). Use these to read a column or two directly."""
+        if not filters:
+            return range(len(self))
+        bitmaps = self._bitmaps(filters)
+        if bitmaps is None:
+            return []
+        return self._rows(bitmaps[0] if len(bitmaps) == 1 else self._and(bitmaps))
+
+    def where(self, **filters):
+        """Cases matching ALL filters, e.g. where(module="login", status="fail"), in row order.
+
+        Returns a CaseRows: a sequence that makes each CaseView as it's
+        read, so a 300k-row match doesn't build 300k objects up front.
+        """
+        return CaseRows(self, self.rows_where(**filters))
+
+    def count_where(self, **filters):
+        """How many cases match ALL filters — without building the rows."""
+        if not filters:
+            return len(self)
+        bitmaps = self._bitmaps(filters)
+        if bitmaps is None:
+            return 0
+        if len(bitmaps) == 1:   # one filter: the running size of its bitmap
+            field, value = next(iter(filters.items()))
+            return self.index_sizes[field][self._key(value)]
+        data = self._and(bitmaps)
+        if isinstance(data, int):
+            return data.bit_count()
+        if hasattr(np, "bitwise_count"):   # NumPy 2.0+
+            return int(np.bitwise_count(data).sum(dtype=np.int64))
+        return int.from_bytes(data, "little").bit_count()
+
+    def in_module(self, module_name):
+        """Like the assignment's cases_in_module(), from the index."""
+        return self.where(module=module_name)
+
+    # ------------------------------------------------------------
+    # Running status counters
+    # ------------------------------------------------------------
+    def _count_row(self, row, delta):
+        """Add `delta` (+1 / -1) to the counters for this row's status."""
+        status = self._key(self._get(row, "status"))
+        for counts in (self.status_counts,
+                       self._status_counts_for("module", self._get(row, "module")),
+                       self._status_counts_for("priority", self._get(row, "priority"))):
+            n = counts.get(status, 0) + delta
+            if n:
+                counts[status] = n
+            else:
+                del counts[status]
+
+    def _status_counts_for(self, field, value):
+        return self.status_by[field].setdefault(self._key(value), {})
+
+    def status_summary(self, module=None, priority=None):
+        """{"pass": n, "fail": n, "skip": n} — like the assignment's status_summary().
+
+        Overall, or for one module and/or priority, read from the
+        running counters. Like the indexes, it's case-insensitive:
+        "PASS" and "pass" count together, as "pass". With both, the status indexes
+        are ANDed instead — no counter per (module, priority) pair.
+        """
+        if module is not None and priority is not None:
+            counts = {status: self.count_where(module=module, priority=priority, status=status)
+                      for status in self.indexes["status"]}
+        elif module is not None:
+            counts = self.status_by["module"].get(self._key(module), {})
+        elif priority is not None:
+            counts = self.status_by["priority"].get(self._key(priority), {})
+        else:
+            counts = self.status_counts
+        # pass, fail, skip first, then anything else; zeros left out
+        order = STATUSES + tuple(status for status in counts if status not in STATUSES)
+        return {status: counts[status] for status in order if counts.get(status)}
+
+    def pass_rate(self, module=None, priority=None):
+        """Passes / (passes + fails) as a percentage — skips don't count."""
+        summary = self.status_summary(module, priority)
+        runnable = summary.get("pass", 0) + summary.get("fail", 0)
+        return summary.get("pass", 0) / runnable * 100 if runnable else 0.0
+
+    # ------------------------------------------------------------
+    # Vectorised summaries
+    # ------------------------------------------------------------
+    def counts(self, field):
+        """{value: number of cases} for module / priority / status, zero counts left out."""
+        column, values = self.columns[field], self.vocab[field].values
+        if np is not None:
+            codes = np.frombuffer(column, dtype=np.uint8 if column.typecode == "B" else np.uint16)
+            tally = np.bincount(codes, minlength=len(values)).tolist()
+        else:
+            tally = [column.count(code) for code in range(len(values))]
+        return {value: n for value, n in zip(values, tally) if n}
+
+    def automated_count(self):
+        """How many cases are automated (a popcount over the bitmap)."""
+        return int.from_bytes(self.automated, "little").bit_count()
+
+    # ------------------------------------------------------------
+    def memory_bytes(self):
+        """Approximate bytes held by the catalog: containers plus the strings in them."""
+        strings = sum(sys.getsizeof(s) for s in self.ids) + \
+            sum(sys.getsizeof(s) for s in self.titles)
+        vocab = sum(sys.getsizeof(v) for vocab in self.vocab.values() for v in vocab.values)
+        indexes = sum(sys.getsizeof(b) for index in self.indexes.values() for b in index.values())
+        return (sys.getsizeof(self.ids) + sys.getsizeof(self.titles) + strings + vocab
+                + sum(sys.getsizeof(c) for c in self.columns.values())
+                + sys.getsizeof(self.automated) + indexes)
@@ -177,6 +177,26 @@ def pass_rate(catalog):
 # print(f"🤖 Automated: {len(automated)}/{len(catalog)} cases")
 
 
+# ------------------------------------------------------------
+# OPTIONAL: the whole spreadsheet — compact_catalog.py
+# ------------------------------------------------------------
+# A list of dicts is perfect for 5 cases and heavy for 5 million.
+# compact_catalog.Catalog stores the same fields by column (codes
+# for module/priority/status, a bitmap for automated) and still
+# acts like the list of dicts, so the functions above work on it:
+#
+#   from compact_catalog import Catalog
+#   catalog = Catalog([tc1, tc2, tc3, tc4, tc5])
+#   display_catalog(catalog)
+#   catalog.status_summary(), catalog.pass_rate()   # running counters, no loop
+#   catalog.where(module="login", status="fail")    # from indexes, no loop
+#
+# Got the real spreadsheet? Export it to CSV and stream it in —
+# messy spellings ("Passed", "P1", "x") are normalized, bad rows
+# reported:  python catalog_import.py test_cases.csv
+# ------------------------------------------------------------
+
+
 # ============================================================
 # 💡 WHY THIS MATTERS FOR LATER VIDEOS
 # ============================================================
@@ -199,4 +199,44 @@ system_prompt = "You are a helpful assistant."
 #       severity_hint and regenerate the report. Compare how
 #       (or whether) the model adjusts its tone and severity
 #       choice. This is a great prompt-engineering exercise.
+#
+# HINT: The four calls don't depend on each other, so a plain
+#       for-loop waits ~4× one round trip. Fire them together
+#       with the async client from the repo-root llm_client.py:
+#
+#   import asyncio, sys
+#   from pathlib import Path
+#   sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+#   from llm_client import aclose_clients, gather_bounded, get_async_client
+#
+#   async def report_for(hint):
+#       # TASK 4's user message, with `hint` as the severity
+#       # (steps_text and env_text are the ones from TASK 4)
+#       user_message = f"""Bug summary: {bug_summary}
+#   Tester-suggested severity: {hint}
+#   Environment:
+#   {env_text}
+#   Steps:
+#   {steps_text}
+#   Expected: {expected}
+#   Actual: {actual}
+#   """
+#       aclient = get_async_client("local")
+#       r = await aclient.chat.completions.create(
+#           model=model,
+#           messages=[{"role": "system", "content": system_prompt},
+#                     {"role": "user",   "content": user_message}],
+#           temperature=0.3,
+#           max_tokens=600,
+#       )
+#       return hint, r.choices[0].message.content
+#
+#   async def all_reports(hints):
+#       try:
+#           return await gather_bounded([report_for(h) for h in hints], limit=4)
+#       finally:
+#           await aclose_clients()
+#
+#   for hint, report in asyncio.run(all_reports(["Low", "Medium", "High", "Critical"])):
+#       print(f"\n=== severity_hint={hint} ===\n{report}")
 # ============================================================
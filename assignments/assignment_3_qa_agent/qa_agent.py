@@ -64,17 +64,28 @@ EXPECTED BEHAVIOR:
 ================================================================
 """
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-client = OpenAI(
-    base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
-    api_key="lm-studio",
+import json
+import sys
+from pathlib import Path
+
+# Shared helpers (llm_client.py, ...) live at the repo root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from context_retrieval import TurnIndex  # noqa: E402
+from llm_client import get_client, get_model  # noqa: E402
+from prompt_layout import PrefixCacheStats, PromptAssembler  # noqa: E402
+from run_report import parse_run, run_facts  # noqa: E402
+from skill_router import SkillRouter  # noqa: E402
+from structured_output import (  # noqa: E402
+    LIKELIHOODS,
+    TRIAGE_SCHEMA,
+    create_structured,
+    schema_instruction,
 )
-model = os.getenv("LOCAL_LLM_MODEL", "local-model")
+from tracing import span  # noqa: E402
+
+client = get_client("local")
+model = get_model("local")
 
 print("=" * 60)
 print("🧪 ASSIGNMENT 3: Multi-Skill QA Agent")
@@ -127,6 +138,110 @@ from raw test-run data.
 }
 
 
+# ------------------------------------------------------------
+# OPTIONAL: structured (JSON) output — QAAgent(..., structured=True)
+# ------------------------------------------------------------
+# The same four skills as typed JSON records instead of markdown,
+# validated locally (see structured_output.py at the repo root).
+# Handy when another script consumes the agent's answers.
+SKILL_SCHEMAS = {
+    "test_plan": {
+        "title": "test_plan",
+        "type": "object",
+        "properties": {
+            "in_scope": {"type": "array", "items": {"type": "string"}},
+            "out_of_scope": {"type": "array", "items": {"type": "string"}},
+            "scenarios": {"type": "array", "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "type": {"type": "string", "enum": ["functional", "negative", "edge",
+                                                        "perf", "security"]},
+                    "steps": {"type": "array", "items": {"type": "string"}},
+                    "expected": {"type": "string"},
+                },
+                "required": ["title", "type", "steps", "expected"],
+                "additionalProperties": False,
+            }},
+            "test_data": {"type": "array", "items": {"type": "string"}},
+            "automation_candidates": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["in_scope", "out_of_scope", "scenarios", "test_data",
+                     "automation_candidates"],
+        "additionalProperties": False,
+    },
+    "triage": TRIAGE_SCHEMA,
+    "summary": {
+        "title": "test_run_summary",
+        "type": "object",
+        "properties": {
+            "status": {"type": "string", "enum": ["green", "amber", "red"]},
+            "headline": {"type": "string"},
+            "passed": {"type": "integer", "minimum": 0},
+            "failed": {"type": "integer", "minimum": 0},
+            "skipped": {"type": "integer", "minimum": 0},
+            "pass_rate": {"type": "number", "minimum": 0, "maximum": 100},
+            "concerns": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+            "recommendation": {"type": "string", "enum": ["ship", "hold", "hotfix"]},
+        },
+        "required": ["status", "headline", "passed", "failed", "skipped", "pass_rate",
+                     "concerns", "recommendation"],
+        "additionalProperties": False,
+    },
+    "risk": {
+        "title": "risk_register",
+        "type": "object",
+        "properties": {
+            "risks": {"type": "array", "items": {
+                "type": "object",
+                "properties": {
+                    "risk": {"type": "string"},
+                    "category": {"type": "string",
+                                 "enum": ["timeline", "scope", "quality", "infra"]},
+                    "likelihood": {"type": "string", "enum": LIKELIHOODS},
+                    "impact": {"type": "string", "enum": LIKELIHOODS},
+                    "mitigation": {"type": "string"},
+                },
+                "required": ["risk", "category", "likelihood", "impact", "mitigation"],
+                "additionalProperties": False,
+            }},
+        },
+        "required": ["risks"],
+        "additionalProperties": False,
+    },
+}
+
+
+# ------------------------------------------------------------
+# Skill keywords for detect_skill(), weighted: 3 = says exactly
+# which skill ("test plan"), 1 = a hint ("failed" could be a bug
+# OR a test run). SkillRouter (skill_router.py at the repo root)
+# finds them all in one pass and the best-scoring skill wins.
+# Add a skill here and in SKILL_PROMPTS — no if/elif chain to grow.
+# ------------------------------------------------------------
+SKILL_KEYWORDS = {
+    "test_plan": {
+        "test plan": 3, "test cases for": 3, "coverage for": 3, "test scenarios": 3,
+        "test strategy": 3, "what should we test": 3, "how should i test": 3,
+        "scenarios": 1, "edge cases": 1, "acceptance criteria": 1,
+    },
+    "triage": {
+        "bug:": 3, "triage": 3, "stack trace": 3, "severity": 2, "crash": 2,
+        "crashes": 2, "exception": 2, "regression": 1, "broken": 1, "freezes": 1,
+        "error": 1, "steps to reproduce": 2, "duplicate": 1,
+    },
+    "summary": {
+        "summarize": 3, "summarise": 3, "test run": 3, "test results": 3,
+        "passed": 2, "failed": 1, "skipped": 2, "pass rate": 3, "flaky": 1,
+    },
+    "risk": {
+        "risk": 3, "risks": 3, "release readiness": 3, "go/no-go": 3,
+        "ready to ship": 3, "ship tomorrow": 2, "blockers": 1, "release": 1,
+    },
+}
+SKILL_ROUTER = SkillRouter(SKILL_KEYWORDS)
+
+
 # ============================================================
 # TASK 2: Build the QAAgent class (8 points)
 # ============================================================
@@ -143,10 +258,15 @@ from raw test-run data.
 class QAAgent:
     """A multi-skill QA Agent with conversation memory."""
 
-    def __init__(self, client, model):
+    def __init__(self, client, model, structured=False, context_budget=1200):
         self.client = client
         self.model = model
         self.name = "QA Agent"
+        self.structured = structured   # skills answer with JSON records
+        self.router = SKILL_ROUTER
+        self.last_confidence = 0.0     # detect_skill()'s confidence in its pick
+        self.last_run = None           # the latest test run the summary skill parsed
+        self.last_record = None        # the latest skill's record (structured mode)
 
         self.system_prompt = """You are an experienced QA / SDET assistant called "QA Agent".
 
@@ -163,73 +283,119 @@ Always remember the full conversation context."""
         self.history = [{"role": "system", "content": self.system_prompt}]
         self.skills_used = []
 
+        # General chat keeps the front of the prompt stable (manager
+        # system prompt → history window that moves in steps), so the
+        # server's prompt cache can reuse it across turns. Skill calls
+        # start with the same system prompt and put the skill
+        # instructions at the END. See prompt_layout.py.
+        self.layout = PromptAssembler(self.system_prompt, window=6)
+        self.prompt_stats = PrefixCacheStats(model)
+
+        # Skills see the earlier exchanges most RELEVANT to the request
+        # (BM25, see context_retrieval.py) within `context_budget`
+        # tokens, instead of just the last few — the risk skill needs
+        # the test plan from ten turns ago, not the small talk.
+        self.turns = TurnIndex(model)
+        self.context_budget = context_budget
+
     # ------------------------------------------------------------
     def detect_skill(self, user_message):
         """Return one of: 'test_plan', 'triage', 'summary', 'risk', or None."""
-        msg = user_message.lower()
-
-        # TODO: Implement keyword-based skill detection (4 points)
-        #
-        # Examples:
+        # Keyword-based skill detection, all skills scored at once:
         #   "test plan", "test cases for", "coverage for"  → "test_plan"
         #   "bug:", "crash", "stack trace", "triage"       → "triage"
         #   "passed", "failed", "test run", "summarize"    → "summary"
         #   "risk", "release readiness", "go/no-go"        → "risk"
         #
-        # if any(kw in msg for kw in ["test plan", "coverage for", "test cases for"]):
-        #     return "test_plan"
-        # elif ...
-        return None
+        # The textbook version is a chain of
+        #   if any(kw in msg for kw in [...]): return "test_plan"
+        # which takes the FIRST skill that matches, not the best one.
+        skill, self.last_confidence = self.router.route(user_message)
+        return skill
 
     # ------------------------------------------------------------
     def chat(self, user_message):
         """Process a user turn: detect skill → call model → remember."""
-
-        skill = self.detect_skill(user_message)
+        # Spans time each phase when tracing is on (LLM_TRACE=1, see
+        # tracing.py) and cost next to nothing when it's off.
+        with span("qa.chat") as turn:
+            return self._chat(user_message, turn)
+
+    def _chat(self, user_message, turn):
+        with span("qa.detect_skill"):
+            skill = self.detect_skill(user_message)
+        turn.set(skill=skill or "chat", confidence=self.last_confidence)
+        user_msg = {"role": "user", "content": user_message}
+        request_text = user_message
+
+        # Test-run results are counted HERE (run_report.py), exactly;
+        # the model gets the totals and the failure list, not raw logs
+        # to add up. Free text, JUnit XML and pytest JSON all work.
+        # The facts go in THIS request only — history keeps what the
+        # user actually sent.
+        with span("qa.parse_run"):
+            run = parse_run(user_message) if skill == "summary" else None
+        if run and run["total"]:
+            self.last_run = run
+            request_text = ("Summarize this test run. These numbers were counted exactly "
+                            "— use them as they are.\n\n" + run_facts(run))
+        else:
+            run = None
 
         if skill:
-            print(f"   🔧 [{skill}]")
+            print(f"   🔧 [{skill}] ({self.last_confidence:.0%} sure)")
             self.skills_used.append(skill)
 
-            # TODO: Build skill-specific messages.
-            # Include the skill prompt as system, then the last
-            # few turns of self.history (skip the original system
-            # message), then this user message.
-            #
-            # context = [m for m in self.history[1:][-6:]]  # last 6 turns
-            # skill_messages = (
-            #     [{"role": "system", "content": SKILL_PROMPTS[skill]}]
-            #     + context
-            #     + [{"role": "user", "content": user_message}]
-            # )
-            #
-            # response = self.client.chat.completions.create(
-            #     model=self.model,
-            #     messages=skill_messages,
-            #     temperature=0.3,
-            #     max_tokens=700,
-            # )
-            # reply = response.choices[0].message.content
-
-            reply = "TODO: implement skill-based response"
-        else:
-            # General chat — use the regular history
-            self.history.append({"role": "user", "content": user_message})
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.history,
-                temperature=0.5,
-                max_tokens=400,
-            )
-            reply = response.choices[0].message.content
-
-            # remove the user msg we just appended; we'll re-append
-            # below alongside the assistant reply for consistency
-            self.history.pop()
-
-        # TODO: Save BOTH user and assistant messages to history
-        # self.history.append({"role": "user", "content": user_message})
-        # self.history.append({"role": "assistant", "content": reply})
+        with span("qa.build_messages") as build:
+            if skill:
+                skill_prompt = SKILL_PROMPTS[skill]
+                if self.structured:
+                    skill_prompt += "\n" + schema_instruction(SKILL_SCHEMAS[skill])
+
+                # System prompt, then the relevant earlier exchanges (the
+                # latest one always), then this message with the skill
+                # prompt on top. Not a second system message: Gemma's and
+                # Mistral's chat templates reject one after the first turn.
+                query = user_message + " " + " ".join(SKILL_KEYWORDS[skill])
+                context = self.turns.select(query, self.context_budget, recent=1)
+                skill_msg = {"role": "user",
+                             "content": f"{skill_prompt}\n\n---\n\n{request_text}"}
+                messages = [self.history[0]] + context + [skill_msg]
+                params = dict(temperature=0.3, max_tokens=700)
+            else:
+                # General chat — the same layout, no skill instructions
+                messages = self.layout.build(self.history[1:], tail=[user_msg])
+                params = dict(temperature=0.5, max_tokens=400)
+            build.set(messages=len(messages))
+
+        with span("llm.request", model=self.model) as request:
+            if skill and self.structured:
+                self.last_record, response = create_structured(
+                    self.client, SKILL_SCHEMAS[skill],
+                    model=self.model, messages=messages, **params)
+                if run:
+                    # Errors count as failures in a release-status summary
+                    self.last_record.update(passed=run["passed"], skipped=run["skipped"],
+                                            failed=run["failed"] + run["errors"],
+                                            pass_rate=run["pass_rate"])
+                reply = json.dumps(self.last_record, ensure_ascii=False)
+            else:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    **params,
+                )
+                reply = response.choices[0].message.content
+            request.usage(response)
+
+        with span("qa.remember"):
+            self.prompt_stats.record(messages, response.usage)
+
+            # Save BOTH user and assistant messages to history (append-only,
+            # so earlier turns stay byte-identical for the prompt cache)
+            self.history.append(user_msg)
+            self.history.append({"role": "assistant", "content": reply})
+            self.turns.add(self.history[-2:])
 
         return reply
 
@@ -241,6 +407,14 @@ Always remember the full conversation context."""
         print(f"   Total messages: {total}")
         print(f"   Skills used:    {self.skills_used or '—'}")
         print(f"   Unique skills:  {len(unique)}/4 ({', '.join(unique) or '—'})")
+        cache = self.prompt_stats.summary()
+        if cache["requests"]:
+            print(f"   Prompt tokens:  {cache['prompt_tokens']} "
+                  f"({cache['cache_ratio']:.0%} reusable from prompt cache)")
+        picked = self.turns.last_selection
+        if picked:
+            print(f"   Last skill context: {picked['turns']} of {picked['of']} earlier "
+                  f"exchange(s), {picked['tokens']} tokens")
 
 
 # ============================================================
@@ -0,0 +1,216 @@
+"""
+================================================================
+bug_store.py — A durable, searchable home for every triaged bug
+================================================================
+
+`TriageAssistant.bugs_seen` lives in memory and vanishes at exit.
+BugStore keeps every bug (and its triage) in a local SQLite file:
+
+   • WAL mode  — readers never block the writer, and each insert is
+                 a cheap append instead of a full-file rewrite.
+   • FTS5      — a full-text index over each report's normalised
+                 words (the same ones dedup_index.py compares), so
+                 keyword search and duplicate lookup stay fast with
+                 hundreds of thousands of rows (no table scans).
+
+Duplicate lookup only searches on a report's RAREST words: "crash"
+may match 40,000 stored bugs, "checkout" 2,000 and "applepay" 12 —
+the rare ones find the real duplicates and touch far fewer rows.
+If even those are too common to rank them all (`scan_budget`), it
+falls back to the newest bugs containing the two rarest words, which
+FTS5 can stream without scoring every match.
+
+   store = BugStore()                       # triage_bugs.sqlite
+   store.add("BUG-1", "App crashes on login with + alias email")
+   store.set_triage("BUG-1", "## Severity\\nHigh ...")
+   store.page(1)                            # newest 20 bugs
+   store.search("login crash")              # keyword search, best first
+   store.similar("Login crash for plus emails", k=3)
+   # → [("BUG-1", 0.33)]   same shape as NearDuplicateIndex.query()
+================================================================
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dedup_index import shingles
+
+PAGE_SIZE = 20
+SCAN_BUDGET = 20_000   # max index entries similar() will rank by relevance
+
+
+def _terms(text):
+    """The words we index and search on — same as the dedup index."""
+    return " ".join(sorted(shingles(text)))
+
+
+def _fts_query(words, joiner):
+    return f" {joiner} ".join(f'"{w}"' for w in words)
+
+
+class BugStore:
+    """SQLite (WAL + FTS5) store for triaged bugs."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("TRIAGE_DB_PATH", "triage_bugs.sqlite")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")   # safe with WAL, much faster
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bugs (
+                number      INTEGER PRIMARY KEY,     -- the N in BUG-N
+                bug_id      TEXT UNIQUE NOT NULL,
+                text        TEXT NOT NULL,
+                terms       TEXT NOT NULL,           -- what FTS indexes
+                candidates  TEXT NOT NULL DEFAULT '[]',
+                triage      TEXT,
+                created     REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS bugs_fts USING fts5(
+                terms, content='bugs', content_rowid='number'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS bugs_vocab USING fts5vocab(bugs_fts, row);
+            CREATE TRIGGER IF NOT EXISTS bugs_ai AFTER INSERT ON bugs BEGIN
+                INSERT INTO bugs_fts(rowid, terms) VALUES (new.number, new.terms);
+            END;
+            CREATE TRIGGER IF NOT EXISTS bugs_ad AFTER DELETE ON bugs BEGIN
+                INSERT INTO bugs_fts(bugs_fts, rowid, terms)
+                VALUES ('delete', old.number, old.terms);
+            END;
+            CREATE TRIGGER IF NOT EXISTS bugs_au AFTER UPDATE OF terms ON bugs BEGIN
+                INSERT INTO bugs_fts(bugs_fts, rowid, terms)
+                VALUES ('delete', old.number, old.terms);
+                INSERT INTO bugs_fts(rowid, terms) VALUES (new.number, new.terms);
+            END;
+            """
+        )
+        self._db.commit()
+
+    # ------------------------------------------------------------
+    @staticmethod
+    def _record(row):
+        return {
+            "id": row["bug_id"],
+            "text": row["text"],
+            "candidates": [tuple(c) for c in json.loads(row["candidates"])],
+            "triage": row["triage"],
+        }
+
+    def add(self, bug_id, text, candidates=()):
+        """Insert a bug (its number is taken from the BUG-N id); re-adding updates it."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO bugs (number, bug_id, text, terms, candidates, created) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(number) DO UPDATE SET "
+                "text = excluded.text, terms = excluded.terms, candidates = excluded.candidates",
+                (int(bug_id.split("-")[1]), bug_id, text, _terms(text),
+                 json.dumps(list(candidates)), time.time()),
+            )
+            self._db.commit()
+
+    def set_triage(self, bug_id, triage):
+        with self._lock:
+            self._db.execute("UPDATE bugs SET triage = ? WHERE bug_id = ?", (triage, bug_id))
+            self._db.commit()
+
+    def get(self, bug_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM bugs WHERE bug_id = ?", (bug_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM bugs").fetchone()[0]
+
+    def next_number(self):
+        """The N to use for the next BUG-N."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(number), 0) + 1 FROM bugs").fetchone()[0]
+
+    def triaged(self, limit=None):
+        """Yield (text, triage) for the newest bugs that have a triage."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT text, triage FROM bugs WHERE triage IS NOT NULL "
+                "ORDER BY number DESC LIMIT ?", (-1 if limit is None else limit,),
+            ).fetchall()
+        for row in rows:
+            yield row["text"], row["triage"]
+
+    # ------------------------------------------------------------
+    def page(self, page=1, size=PAGE_SIZE):
+        """One page of bugs, newest first (page numbers start at 1)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM bugs ORDER BY number DESC LIMIT ? OFFSET ?",
+                (size, (page - 1) * size),
+            ).fetchall()
+        return [self._record(r) for r in rows]
+
+    def _match(self, query, size, offset=0, order="bm25(bugs_fts)"):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT bugs.* FROM bugs_fts JOIN bugs ON bugs.number = bugs_fts.rowid "
+                f"WHERE bugs_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?",
+                (query, size, offset),
+            ).fetchall()
+        return [self._record(r) for r in rows]
+
+    def search(self, keywords, page=1, size=PAGE_SIZE):
+        """Bugs containing ALL the keywords, best match first."""
+        words = sorted(shingles(keywords))
+        if not words:
+            return []
+        return self._match(_fts_query(words, "AND"), size, (page - 1) * size)
+
+    def rarest(self, words, n=8):
+        """Up to `n` (word, bug count) pairs, rarest first; unseen words are dropped."""
+        marks = ", ".join("?" * len(words))
+        with self._lock:
+            counts = self._db.execute(
+                f"SELECT term, doc FROM bugs_vocab WHERE term IN ({marks})", list(words)
+            ).fetchall()
+        return sorted(map(tuple, counts), key=lambda row: row[1])[:n]
+
+    def similar(self, text, k=3, min_score=0.15, pool=25, scan_budget=SCAN_BUDGET):
+        """
+        Duplicate candidates across ALL stored bugs: FTS5 picks the `pool`
+        best matches on the report's rarest words, then they're re-ranked
+        by Jaccard similarity — same (bug_id, score) pairs as dedup_index.
+        """
+        wanted = shingles(text)
+        rare = self.rarest(wanted) if wanted else []
+        if not rare:
+            return []
+
+        chosen, scanned = [], 0
+        for term, docs in rare:
+            if scanned + docs > scan_budget:
+                break
+            chosen.append(term)
+            scanned += docs
+        if chosen:
+            matches = self._match(_fts_query(chosen, "OR"), pool)
+        else:
+            both = [term for term, _ in rare[:2]]
+            matches = self._match(_fts_query(both, "AND"), pool, order="bugs_fts.rowid DESC")
+
+        scored = []
+        for bug in matches:
+            other = shingles(bug["text"])
+            union = wanted | other
+            score = len(wanted & other) / len(union) if union else 0.0
+            if score >= min_score:
+                scored.append((bug["id"], round(score, 2)))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
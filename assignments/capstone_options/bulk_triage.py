@@ -0,0 +1,294 @@
+"""
+================================================================
+🐞 BULK TRIAGE — thousands of bug reports from a JSONL/CSV file
+================================================================
+
+The interactive assistant triages one pasted bug at a time. This
+entry point chews through a whole backlog export instead:
+
+   • Streams the input file — never loads it all into memory.
+   • Triages with a bounded pool of worker threads (LM Studio can
+     serve a few requests in parallel; more just queue up).
+   • Appends one JSON result per bug to the output file as soon as
+     it's ready, so partial results are usable straight away.
+   • The output file IS the checkpoint: rerun the same command after
+     a crash or Ctrl+C and finished bugs are skipped.
+   • One bad input line or failed bug never stops the run: bad lines
+     are skipped with a warning, failures are written as "error"
+     records and retried on the next run.
+
+Each bug is triaged on its own (system prompt + the bug + its
+near-duplicate candidates from dedup_index.py) rather than replaying
+a 10,000-bug conversation.
+
+Input formats:
+   JSONL — one object per line, e.g. {"id": "JIRA-12", "text": "..."}
+   CSV   — a header row; text from the first of text / report /
+           description / summary / body, id from id / key / bug_id
+
+Add --json to get a typed record per bug ("severity", "owner_area",
+"duplicate_likelihood", "next_step", ...) instead of markdown — see
+structured_output.py. Those records are validated before they're
+written, so nothing downstream has to parse the model's prose.
+
+Add --embed to also pick duplicate candidates by meaning with the
+local embeddings endpoint (embedding_index.py, needs NumPy); the
+results then carry a "cluster" of semantically similar bug IDs.
+
+Add --prefilter to triage obvious bugs with local rules + naive Bayes
+(severity_classifier.py) instead of the model; those results are
+marked "local": true. The classifier keeps learning from the model's
+answers as the run goes.
+
+Run:
+   python bulk_triage.py backlog.jsonl --out triage_results.jsonl --workers 4
+   python bulk_triage.py backlog.jsonl --json --embed
+================================================================
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from defect_triage_assistant import TriageAssistant, client, model, start_embeddings
+from severity_classifier import SeverityClassifier
+from structured_output import TRIAGE_SCHEMA, create_structured
+
+TEXT_FIELDS = ("text", "report", "description", "summary", "body")
+ID_FIELDS = ("id", "key", "bug_id")
+
+
+# ============================================================
+# Reading — one record at a time
+# ============================================================
+def _pick(row, fields):
+    for field in fields:
+        if row.get(field):
+            return str(row[field])
+    return None
+
+
+def _json_rows(f):
+    """(line number, object) per JSONL line; bad lines are skipped with a warning."""
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"   ⚠️  line {line_no}: skipped — bad JSON ({e.msg})")
+            continue
+        if not isinstance(row, dict):
+            print(f"   ⚠️  line {line_no}: skipped — not a JSON object")
+            continue
+        yield line_no, row
+
+
+def read_reports(path):
+    """Yield (source_id, text) from a .jsonl or .csv file, streaming."""
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            rows = enumerate(csv.DictReader(f), start=1)
+        else:
+            rows = _json_rows(f)
+        for line_no, row in rows:
+            text = _pick(row, TEXT_FIELDS)
+            if text:
+                yield _pick(row, ID_FIELDS) or f"line-{line_no}", text
+
+
+def read_checkpoint(out_path):
+    """Results already written by an earlier run (errors are retried)."""
+    done = {}
+    if os.path.exists(out_path):
+        with open(out_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue   # a half-written last line from a crash
+                if "error" not in record:
+                    done[record["source_id"]] = record
+    return done
+
+
+# ============================================================
+# Triage — one stateless model call per bug
+# ============================================================
+class BulkTriage:
+    """Thread-pool triage of a streamed backlog with resumable output."""
+
+    def __init__(self, client, model, workers=4, cache=None, structured=False,
+                 embeddings=None, classifier=None):
+        self.agent = TriageAssistant(client, model, cache=cache, structured=structured,
+                                     embeddings=embeddings, classifier=classifier)
+        self.workers = workers
+        self._lock = threading.Lock()   # guards bug IDs + the dedup/embedding indexes
+
+    def restore(self, done):
+        """Rebuild bug IDs and the duplicate index from checkpointed results."""
+        for record in sorted(done.values(), key=lambda r: int(r["bug_id"].split("-")[1])):
+            self.agent.prepare_bug(record["text"], bug_id=record["bug_id"])
+            self.agent.register_bug(record["bug_id"])
+            if not record.get("local"):
+                triage = record["triage"]
+                structured = isinstance(triage, dict)
+                self.agent.learn(record["text"], json.dumps(triage) if structured else triage,
+                                 triage if structured else None)
+
+    def triage(self, source_id, text):
+        embeddings = self.agent.embeddings
+        if embeddings is not None:
+            # The /v1/embeddings round-trip happens here, in parallel; the
+            # vector is cached, so prepare_bug() under the lock doesn't wait
+            embeddings.embed([text])
+        with self._lock:
+            bug_id, user_msg = self.agent.prepare_bug(text)
+            candidates = self.agent.bugs_by_id[bug_id]["candidates"]
+            local = self.agent.local_triage(bug_id, text)
+
+        start = time.perf_counter()
+        if local:
+            reply, record = local
+            result = {"local": True, "triage": record if self.agent.structured else reply}
+        else:
+            result = self._ask_model(text, user_msg)
+
+        # Only triaged bugs join the indexes; a failed one is retried on resume
+        cluster = None
+        with self._lock:
+            if "error" in result:
+                self.agent.release_bug(bug_id)
+            else:
+                self.agent.register_bug(bug_id)
+                if embeddings is not None:
+                    cluster = embeddings.cluster_of(bug_id)
+
+        return {
+            "source_id": source_id,
+            "bug_id": bug_id,
+            "text": text,
+            "candidates": candidates,
+            **({"cluster": cluster} if cluster else {}),
+            "seconds": round(time.perf_counter() - start, 3),
+            **result,
+        }
+
+    def _ask_model(self, text, user_msg):
+        """{"triage": ...} from one stateless model call, or {"error": ...}."""
+        params = self.agent.triage_params(
+            [{"role": "system", "content": self.agent.system_prompt}, user_msg])
+        try:
+            if self.agent.structured:
+                record, _ = create_structured(self.agent.client, TRIAGE_SCHEMA,
+                                              cache=self.agent.cache, **params)
+                reply = json.dumps(record, ensure_ascii=False)
+            else:
+                if self.agent.cache:
+                    response = self.agent.cache.create(self.agent.client, **params)
+                else:
+                    response = self.agent.client.chat.completions.create(**params)
+                record, reply = None, response.choices[0].message.content
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+        with self._lock:
+            self.agent.learn(text, reply, record)   # the pre-classifier, if any
+        return {"triage": record if self.agent.structured else reply}
+
+    def run(self, in_path, out_path, progress_every=50):
+        """Triage every unfinished report in `in_path`, appending to `out_path`."""
+        done = read_checkpoint(out_path)
+        self.restore(done)
+        if done:
+            print(f"↩️  Resuming — {len(done)} bug(s) already triaged")
+
+        counts = {"ok": 0, "error": 0, "skipped": len(done)}
+        max_in_flight = self.workers * 2     # bounded queue → constant memory
+        started = time.perf_counter()
+
+        with open(out_path, "a", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {}   # future → (source_id, text)
+
+            def drain():
+                """Wait for at least one bug to finish and write its result."""
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    source_id, text = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:   # e.g. the embeddings call; retried on resume
+                        record = {"source_id": source_id, "text": text,
+                                  "error": f"{type(e).__name__}: {e}"}
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    counts["error" if "error" in record else "ok"] += 1
+                    total = counts["ok"] + counts["error"]
+                    if total % progress_every == 0:
+                        rate = total / (time.perf_counter() - started)
+                        print(f"   … {total} triaged ({rate:.1f} bugs/s, "
+                              f"{counts['error']} error(s))")
+
+            for source_id, text in read_reports(in_path):
+                if source_id in done:
+                    continue
+                if len(pending) >= max_in_flight:
+                    drain()
+                pending[pool.submit(self.triage, source_id, text)] = (source_id, text)
+
+            while pending:
+                drain()
+
+        counts["seconds"] = time.perf_counter() - started
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-triage bug reports from JSONL/CSV")
+    parser.add_argument("input", help="backlog file (.jsonl or .csv)")
+    parser.add_argument("--out", default="triage_results.jsonl",
+                        help="results file, also used as the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="parallel requests to the model (default 4)")
+    parser.add_argument("--json", action="store_true",
+                        help="write a typed JSON triage record per bug, not markdown")
+    parser.add_argument("--embed", action="store_true",
+                        help="semantic duplicate candidates + clusters via embeddings")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="triage obvious bugs locally, skipping the model")
+    args = parser.parse_args()
+
+    print("═" * 60)
+    print(f"   🐞 BULK TRIAGE  {args.input} → {args.out}  ({args.workers} workers)")
+    print("═" * 60)
+
+    try:
+        embeddings = start_embeddings() if args.embed else None
+        classifier = SeverityClassifier() if args.prefilter else None
+        bulk = BulkTriage(client, model, workers=args.workers, structured=args.json,
+                          embeddings=embeddings, classifier=classifier)
+        counts = bulk.run(args.input, args.out)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted — rerun the same command to resume.")
+        sys.exit(130)
+
+    print("─" * 60)
+    print(f"✅ {counts['ok']} triaged, ❌ {counts['error']} failed "
+          f"(rerun to retry), ⏭ {counts['skipped']} already done — "
+          f"{counts['seconds']:.1f}s")
+    if classifier:
+        pre = classifier.stats()
+        print(f"⚡ Pre-classifier: {pre['answered']} of {pre['checked']} bug(s) triaged "
+              f"locally — {pre['answered']} LLM call(s) avoided ({pre['avoided_ratio']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
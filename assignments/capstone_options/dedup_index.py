@@ -0,0 +1,124 @@
+"""
+================================================================
+dedup_index.py — Near-duplicate lookup for the Triage Assistant
+================================================================
+
+Instead of asking the model to re-read every earlier bug to spot
+duplicates, keep a small local index and hand the model ONLY the
+few bugs that actually look similar.
+
+How it works (MinHash + LSH):
+   1. Shingles  — each report becomes a set of normalised words
+                  ("login", "crash", "email", ...). Bug reports are
+                  short, so single words beat word pairs here.
+   2. MinHash   — that set is squeezed into a short signature of
+                  `num_perm` numbers. Two signatures agree in
+                  roughly Jaccard(A, B) of their positions.
+   3. LSH       — the signature is cut into `bands` of `rows` numbers;
+                  reports that share ANY band land in the same
+                  bucket, so a lookup only touches a handful of
+                  buckets instead of every bug ever seen. 32 bands
+                  of 4 rows make ~0.4 Jaccard the point where a
+                  report usually becomes a candidate — fewer, longer
+                  bands miss reworded duplicates, more, shorter
+                  bands make nearly every report a candidate.
+   4. Re-rank   — at most `max_candidates` candidates (the ones
+                  sharing the most bands) are scored by exact
+                  Jaccard similarity, and the top-k above
+                  `min_score` are returned.
+
+   index = NearDuplicateIndex()
+   index.add("BUG-1", "App crashes on login with + alias email on iOS")
+   index.query("Login crash on iOS for emails with a + alias")
+   # → [("BUG-1", 0.83)]
+================================================================
+"""
+
+import hashlib
+import random
+import re
+from collections import Counter, defaultdict
+
+_MERSENNE = (1 << 61) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in into is it its
+of on or so that the then there this to was were when where which while
+with after before again also can cannot does doesn don t not no
+""".split())
+
+
+def _fold(word):
+    """Crude plural folding so 'crashes' matches 'crash' and 'emails' matches 'email'."""
+    if word.endswith(("shes", "ches", "xes", "sses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is", "os")):
+        return word[:-1]
+    return word
+
+
+def shingles(text):
+    """Normalised, de-pluralised words minus stopwords — the units we compare on."""
+    return {_fold(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS}
+
+
+def _stable_hash(shingle):
+    # Python's hash() changes between runs; this doesn't
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index returning the top-k most similar earlier reports."""
+
+    def __init__(self, num_perm=128, bands=32, min_score=0.15, max_candidates=200, seed=7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.min_score = min_score
+        self.max_candidates = max_candidates
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE))
+                       for _ in range(num_perm)]
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+        self._shingles = {}   # bug id → shingle set (for exact re-ranking)
+
+    def __len__(self):
+        return len(self._shingles)
+
+    # ------------------------------------------------------------
+    def _signature(self, shingle_set):
+        hashes = [_stable_hash(s) for s in shingle_set] or [0]
+        return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return [tuple(signature[i * r:(i + 1) * r]) for i in range(self.bands)]
+
+    # ------------------------------------------------------------
+    def add(self, bug_id, text):
+        """Index one report under `bug_id`."""
+        shingle_set = shingles(text)
+        self._shingles[bug_id] = shingle_set
+        for band, key in zip(self._buckets, self._band_keys(self._signature(shingle_set))):
+            band[key].append(bug_id)
+
+    def query(self, text, k=3, exclude=None):
+        """Return up to k (bug_id, similarity) pairs, most similar first."""
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return []
+
+        shared = Counter()   # candidate → bands it shares with the query
+        for band, key in zip(self._buckets, self._band_keys(self._signature(shingle_set))):
+            shared.update(band.get(key, ()))
+        shared.pop(exclude, None)
+
+        scored = []
+        for bug_id, _ in shared.most_common(self.max_candidates):
+            other = self._shingles[bug_id]
+            score = len(shingle_set & other) / len(shingle_set | other)
+            if score >= self.min_score:
+                scored.append((bug_id, round(score, 2)))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
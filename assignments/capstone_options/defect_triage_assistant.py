@@ -18,27 +18,62 @@ WHAT IT DOES:
        - Duplicate-likelihood + which earlier bug(s) it might dupe
        - 2-3 clarifying questions if info is thin
    • Maintains memory of all bugs seen this session, so it can
-     spot duplicates across the conversation.
+     spot duplicates across the conversation. Each bug is sent
+     with only its likely duplicates (dedup_index.py) and the
+     triage they got — not the whole backlog.
+   • Keeps every bug in a SQLite store (bug_store.py), so bugs —
+     and duplicate detection — carry over between sessions.
+   • With --json, returns a typed JSON record per bug instead of
+     markdown (structured_output.py) — ready for scripts and CSVs.
+   • With --digest, each bug is sent with a one-line-per-bug digest
+     of earlier bugs (capped by a token budget) instead of its
+     look-alikes' full triage.
+   • With --embed, also finds duplicates by MEANING using the local
+     embeddings endpoint and groups bugs into clusters
+     (embedding_index.py, needs NumPy).
+   • With --prefilter, obvious bugs ("crash on login", "typo in the
+     footer") are triaged by local rules + naive Bayes and never
+     reach the model (severity_classifier.py).
 
 This is the ⭐⭐⭐ capstone version of Assignment 3's "triage"
 skill — same idea, but a real interactive loop with persistent
 memory and dup-detection across the session.
 
-Run this file:  python defect_triage_assistant.py
+Run this file:  python defect_triage_assistant.py            (markdown)
+                python defect_triage_assistant.py --json     (JSON records)
+                python defect_triage_assistant.py --digest   (compact context)
+                python defect_triage_assistant.py --embed    (semantic dupes)
+                python defect_triage_assistant.py --prefilter (skip obvious bugs)
 ================================================================
 """
 
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-client = OpenAI(
-    base_url=os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
-    api_key="lm-studio",
+import json
+import re
+import sys
+from pathlib import Path
+
+# Shared helpers (llm_client.py, ...) live at the repo root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bug_store import PAGE_SIZE, BugStore  # noqa: E402
+from dedup_index import NearDuplicateIndex  # noqa: E402
+from embedding_index import EmbeddingIndex  # noqa: E402
+from llm_client import get_async_client, get_client, get_model  # noqa: E402
+from prompt_layout import PrefixCacheStats  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from severity_classifier import SeverityClassifier  # noqa: E402
+from structured_output import (  # noqa: E402
+    TRIAGE_SCHEMA,
+    acreate_structured,
+    create_structured,
+    schema_instruction,
 )
-model = os.getenv("LOCAL_LLM_MODEL", "local-model")
+from token_budget import count_text_tokens  # noqa: E402
+from tracing import span  # noqa: E402
+from warmup import start_warmup  # noqa: E402
+
+client = get_client("local")
+model = get_model("local")
 
 
 SYSTEM_PROMPT = """You are "Triage Assistant" — a senior SDET on bug-triage rotation.
@@ -65,49 +100,393 @@ One sentence: assign / merge / request-info / hotfix / schedule.
 Rules:
 - Be concise. No fluff.
 - Use ONLY information from the conversation so far.
+- For duplicates, start from the "Likely duplicate candidates" listed with
+  each bug — they were pre-selected by a local similarity index.
+- If the user just chats (not a bug), respond normally as a friendly QA peer.
+"""
+
+# The same job, answered as a JSON record (see structured_output.py).
+# Fewer output tokens than five markdown sections, and nothing to scrape.
+JSON_SYSTEM_PROMPT = f"""You are "Triage Assistant" — a senior SDET on bug-triage rotation.
+
+For every bug the user pastes, fill in a triage record:
+- severity + severity_reason (one short sentence)
+- owner_area: a single component name (e.g., auth, payments, mobile-ios, infra, ui-cart)
+- duplicate_likelihood, and in duplicate_of the bug ID(s) you suspect it duplicates —
+  start from the "Likely duplicate candidates" listed with each bug
+- clarifying_questions: 2-3 short questions, or [] if the report is complete
+- next_step
+
+Rules:
+- Be concise. Use ONLY information from the conversation so far.
 - If the user just chats (not a bug), respond normally as a friendly QA peer.
+
+For bugs: {schema_instruction(TRIAGE_SCHEMA)}
 """
 
 
+DIGEST_BUDGET = 600   # tokens of earlier-bug digest sent with each bug
+
+_SEVERITY = re.compile(r"##\s*Severity\W*(Critical|High|Medium|Low)", re.IGNORECASE)
+_OWNER = re.compile(r"##\s*Owner area\s*\n+\W*([\w./ -]+)", re.IGNORECASE)
+
+
+LOCAL_REASON = "Pre-classified locally"   # marks triage the model never saw
+
+
+def triage_fields(reply, record=None):
+    """(severity, owner area) from a triage record, its JSON text, or our markdown."""
+    if record is None and (reply or "").lstrip().startswith("{"):
+        try:
+            record = json.loads(reply)
+        except ValueError:
+            pass
+    if record:
+        return record.get("severity", "?"), record.get("owner_area", "?")
+    # Our own markdown format — good enough, "?" if the model strayed
+    severity = _SEVERITY.search(reply or "")
+    area = _OWNER.search(reply or "")
+    return (severity.group(1).title() if severity else "?",
+            area.group(1).strip() if area else "?")
+
+
+def local_record(guess, candidates):
+    """A full triage record (TRIAGE_SCHEMA) from a pre-classifier guess."""
+    top = candidates[0][1] if candidates else 0.0
+    likelihood = "High" if top >= 0.6 else "Medium" if top >= 0.35 else "Low"
+    if likelihood == "High":
+        next_step = "merge"
+    else:
+        next_step = "hotfix" if guess["severity"] == "Critical" else "assign"
+    return {
+        "severity": guess["severity"],
+        "severity_reason": f"{LOCAL_REASON} ({guess['reason']}, "
+                           f"confidence {guess['confidence']:.2f}).",
+        "owner_area": guess["owner_area"],
+        "duplicate_likelihood": likelihood,
+        "duplicate_of": [cid for cid, _ in candidates] if likelihood != "Low" else [],
+        "clarifying_questions": [],
+        "next_step": next_step,
+    }
+
+
+def record_markdown(record):
+    """A triage record in SYSTEM_PROMPT's markdown layout."""
+    dupes = f" — possibly duplicates {', '.join(record['duplicate_of'])}" \
+        if record["duplicate_of"] else ""
+    questions = "\n".join(f"- {q}" for q in record["clarifying_questions"]) \
+        or "None — report is complete."
+    return (f"## Severity\n{record['severity']} — {record['severity_reason']}\n\n"
+            f"## Owner area\n{record['owner_area']}\n\n"
+            f"## Duplicate likelihood\n{record['duplicate_likelihood']}{dupes}\n\n"
+            f"## Clarifying questions\n{questions}\n\n"
+            f"## Suggested next step\n{record['next_step']}")
+
+
+def digest_line(bug_id, raw_text, reply, record=None):
+    """One line per triaged bug: ID, severity, owner area, first line of the report."""
+    severity, area = triage_fields(reply, record)
+    summary = raw_text.strip().splitlines()[0][:100] if raw_text.strip() else ""
+    return f"- {bug_id} [{severity}, {area}] {summary}"
+
+
+def format_triage(record):
+    """Render a JSON triage record for the terminal."""
+    dupes = ", ".join(record["duplicate_of"]) or "—"
+    questions = "".join(f"\n   • {q}" for q in record["clarifying_questions"]) or " none"
+    return (f"   Severity:   {record['severity']} — {record['severity_reason']}\n"
+            f"   Owner:      {record['owner_area']}\n"
+            f"   Duplicate:  {record['duplicate_likelihood']} ({dupes})\n"
+            f"   Next step:  {record['next_step']}\n"
+            f"   Questions:{questions}")
+
+
 class TriageAssistant:
     """Conversational triage with cross-bug memory."""
 
-    def __init__(self, client, model):
+    def __init__(self, client, model, cache=None, store=None, structured=False,
+                 digest_budget=None, embeddings=None, classifier=None):
         self.client = client
         self.model = model
-        self.history = [{"role": "system", "content": SYSTEM_PROMPT}]
-        self.bugs_seen = []   # list of {"id": "BUG-1", "text": "..."}
-
-    def add_bug(self, raw_text):
-        """Record a new bug under a sequential ID and ask the model to triage."""
-        bug_id = f"BUG-{len(self.bugs_seen) + 1}"
-        self.bugs_seen.append({"id": bug_id, "text": raw_text})
-
-        # Tell the model the new bug + remind it of previously-seen IDs
-        prior_ids = ", ".join(b["id"] for b in self.bugs_seen[:-1]) or "(none yet)"
+        self.cache = cache    # optional ResponseCache for repeat triage runs
+        self.store = store    # optional BugStore — bugs persist across sessions
+        self.structured = structured   # JSON records instead of markdown
+        self.system_prompt = JSON_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+        self.history = [{"role": "system", "content": self.system_prompt}]
+        self.records = {}     # bug ID → triage record (structured mode only)
+        self.bugs_seen = []   # list of {"id": "BUG-1", "text": "...", "candidates": [...]}
+        self.prompt_stats = PrefixCacheStats(model)   # cached vs. uncached prompt tokens
+        self.dup_index = NearDuplicateIndex()          # local near-duplicate lookup
+        self.embeddings = embeddings   # optional EmbeddingIndex — semantic look-alikes
+        self.classifier = classifier   # optional SeverityClassifier — skips obvious bugs
+        self.bugs_by_id = {}  # same records as bugs_seen, looked up by ID
+        self.next_number = store.next_number() if store else 1
+
+        # Digest mode (digest_budget=N tokens): bugs are NOT replayed from
+        # history; each one is sent with a digest of the latest earlier bugs.
+        self.digest_budget = digest_budget
+        self.digest = []      # (line, tokens) per triaged bug, oldest first
+        self.digest_start = 0
+        self.digest_tokens = 0   # tokens in digest[digest_start:]
+
+    def prepare_bug(self, raw_text, bug_id=None):
+        """
+        Reserve a sequential ID for a new bug and build its user message.
+        Does NOT call the model, touch history, or register the bug in the
+        store and indexes — register_bug() does that once its triage lands,
+        and release_bug() hands the ID back if it fails (bulk_triage.py
+        uses all three). Pass `bug_id` to re-register a bug that already
+        has an ID.
+        """
+        if bug_id is None:
+            bug_id = f"BUG-{self.next_number}"
+
+        # The store searches every session's bugs, the in-memory index
+        # just this one's
+        if self.store:
+            candidates = self.store.similar(raw_text, k=3)
+        else:
+            candidates = self.dup_index.query(raw_text, k=3)
+        if self.embeddings is not None:
+            # Same meaning, different words — these go first. This can
+            # fail (no /v1/embeddings route) before anything is reserved.
+            semantic = self.embeddings.query(raw_text, k=3)
+            seen = {cid for cid, _ in semantic}
+            candidates = (semantic + [c for c in candidates if c[0] not in seen])[:3]
+
+        self.next_number = max(self.next_number, int(bug_id.split("-")[1]) + 1)
+        self.bugs_by_id[bug_id] = {"id": bug_id, "text": raw_text, "candidates": candidates}
+
+        # Only the closest earlier bugs go to the model, with a preview,
+        # instead of expecting it to re-read the whole backlog.
+        if candidates:
+            dup_lines = "\n".join(
+                f"- {cid} (similarity {score:.2f}): "
+                f"{self._bug(cid)['text'].splitlines()[0][:160]}"
+                for cid, score in candidates
+            )
+        else:
+            dup_lines = "- none found"
+
+        # Only the report and its look-alikes, not this bug's own ID: with
+        # a BugStore, IDs carry on across sessions, so an ID here would
+        # make every prompt new and the ResponseCache could never hit.
         user_msg = (
-            f"New bug to triage — ID {bug_id}.\n"
-            f"Previously seen IDs: {prior_ids}.\n\n"
-            f"Raw report:\n{raw_text}"
+            f"New bug to triage.\n\n"
+            f"Raw report:\n{raw_text}\n\n"
+            f"Likely duplicate candidates (local similarity index):\n{dup_lines}"
         )
-
-        self.history.append({"role": "user", "content": user_msg})
-        response = self.client.chat.completions.create(
+        return bug_id, {"role": "user", "content": user_msg}
+
+    def register_bug(self, bug_id):
+        """Add a prepared bug to the store and the duplicate indexes (after its triage)."""
+        bug = self.bugs_by_id[bug_id]
+        if self.embeddings is not None:
+            self.embeddings.add(bug_id, bug["text"])   # vector cached by prepare_bug()
+        if self.store:
+            self.store.add(bug_id, bug["text"], bug["candidates"])
+        else:
+            self.dup_index.add(bug_id, bug["text"])
+        self.bugs_seen.append(bug)
+
+    def release_bug(self, bug_id):
+        """Forget a prepared bug whose triage failed (a retry reuses its ID if it was the last)."""
+        self.bugs_by_id.pop(bug_id, None)
+        if bug_id == f"BUG-{self.next_number - 1}":
+            self.next_number -= 1
+
+    def _bug(self, bug_id):
+        """A bug from this session, or from an earlier one via the store."""
+        return self.bugs_by_id.get(bug_id) or self.store.get(bug_id)
+
+    def _remember(self, bug_id, raw_text, reply, record=None):
+        """Add a triaged bug to the digest, sliding its window to fit the budget."""
+        line = digest_line(bug_id, raw_text, reply, record)
+        tokens = count_text_tokens(line, self.model) + 1
+        self.digest.append((line, tokens))
+        self.digest_tokens += tokens
+        if self.digest_tokens > self.digest_budget:
+            # Drop the oldest lines down to HALF the budget, not just one:
+            # the digest then only grows at its end for a while, which
+            # keeps it a stable prefix for the server's prompt cache.
+            while self.digest_tokens > self.digest_budget // 2:
+                self.digest_tokens -= self.digest[self.digest_start][1]
+                self.digest_start += 1
+
+    def _context(self, bug_id, user_msg):
+        """Messages to send with a new bug: system prompt, its look-alikes' triage, the bug.
+
+        Only the duplicate candidates the index picked are replayed —
+        each as its raw report and the triage it got — never the whole
+        backlog, so a bug costs the same however many came before it.
+        Digest mode sends the digest of earlier bugs instead.
+        """
+        if self.digest_budget:
+            return self._digest_context(user_msg)
+        messages = [self.history[0]]
+        for cid, _ in self.bugs_by_id[bug_id]["candidates"]:
+            earlier = self._bug(cid)
+            if earlier and earlier.get("triage"):   # a look-alike still being triaged has none
+                messages += [
+                    {"role": "user", "content": f"Earlier bug {cid} — raw report:\n{earlier['text']}"},
+                    {"role": "assistant", "content": earlier["triage"]},
+                ]
+        return messages + [user_msg]
+
+    def _digest_context(self, user_msg):
+        """System prompt with the digest of earlier bugs appended, then `user_msg`.
+
+        One system message only — Gemma's and Mistral's chat templates
+        reject a second one. The digest goes AFTER the fixed prompt, so
+        the prompt is still a reusable prefix for the server's cache.
+        """
+        lines = [line for line, _ in self.digest[self.digest_start:]]
+        if not lines:
+            return [self.history[0], user_msg]
+        skipped = f" ({self.digest_start} older bug(s) not shown)" if self.digest_start else ""
+        system = {"role": "system",
+                  "content": f"{self.history[0]['content']}\n\nBugs triaged earlier{skipped}:\n"
+                             + "\n".join(lines)}
+        return [system, user_msg]
+
+    def triage_params(self, messages):
+        """Request parameters for triaging one bug (shared with bulk_triage.py)."""
+        return dict(
             model=self.model,
-            messages=self.history,
+            messages=messages,
             temperature=0.2,   # triage should be consistent
-            max_tokens=500,
+            max_tokens=300 if self.structured else 500,
         )
-        reply = response.choices[0].message.content
-        self.history.append({"role": "assistant", "content": reply})
-        return bug_id, reply
+
+    def _finish(self, bug_id, raw_text, user_msg, reply, record=None):
+        """Remember a triaged bug: the store and indexes, history (or digest), records."""
+        self.register_bug(bug_id)
+        if self.digest_budget:
+            self._remember(bug_id, raw_text, reply, record)
+        else:
+            # The ID is added here, for chat() about "BUG-3"; the request left it out
+            labelled = {"role": "user", "content": f"{bug_id}: {user_msg['content']}"}
+            self.history.extend([labelled, {"role": "assistant", "content": reply}])
+        self.bugs_by_id[bug_id]["triage"] = reply   # replayed when a later bug looks alike
+        if record is not None:
+            self.records[bug_id] = record
+        if self.store:
+            self.store.set_triage(bug_id, reply)
+
+    def local_triage(self, bug_id, raw_text):
+        """(reply, record) from the pre-classifier if it's confident, else None."""
+        if self.classifier is None:
+            return None
+        guess = self.classifier.classify(raw_text)
+        if guess is None:
+            return None
+        record = local_record(guess, self.bugs_by_id[bug_id]["candidates"])
+        if self.structured:
+            return json.dumps(record, ensure_ascii=False), record
+        return record_markdown(record), None
+
+    def learn(self, raw_text, reply, record=None):
+        """Teach the pre-classifier from the model's answer."""
+        if self.classifier is not None:
+            self.classifier.learn(raw_text, *triage_fields(reply, record))
+
+    def add_bug(self, raw_text):
+        """
+        Record a new bug under a sequential ID and ask the model to triage
+        (unless the pre-classifier is confident). In structured mode the
+        reply is the JSON record as text; the dict is in self.records[bug_id].
+        """
+        with span("triage.add_bug") as turn:
+            with span("triage.prepare"):   # similarity search + ID
+                bug_id, user_msg = self.prepare_bug(raw_text)
+            turn.set(bug_id=bug_id)
+            try:
+                with span("triage.prefilter"):
+                    local = self.local_triage(bug_id, raw_text)
+                if local:
+                    turn.set(local=True)
+                    self._finish(bug_id, raw_text, user_msg, *local)
+                    return bug_id, local[0]
+
+                with span("triage.build_messages"):
+                    params = self.triage_params(self._context(bug_id, user_msg))
+                record = None
+                with span("llm.request", model=self.model) as request:
+                    if self.structured:
+                        record, response = create_structured(
+                            self.client, TRIAGE_SCHEMA, cache=self.cache, **params)
+                        reply = json.dumps(record, ensure_ascii=False)
+                    elif self.cache:
+                        response = self.cache.create(self.client, **params)
+                        reply = response.choices[0].message.content
+                    else:
+                        response = self.client.chat.completions.create(**params)
+                        reply = response.choices[0].message.content
+                    request.usage(response)
+                with span("triage.finish"):
+                    self.prompt_stats.record(params["messages"], response.usage)
+                    self.learn(raw_text, reply, record)
+                    self._finish(bug_id, raw_text, user_msg, reply, record)
+                return bug_id, reply
+            except BaseException:   # failed or cancelled: nothing was registered
+                self.release_bug(bug_id)
+                raise
+
+    async def aadd_bug(self, raw_text, async_client=None):
+        """
+        Async add_bug(). Bugs triaged concurrently see the look-alikes
+        whose triage had landed when they started; the user/assistant
+        pair is appended to the history together once the reply lands.
+        """
+        aclient = async_client or get_async_client("local")
+        with span("triage.add_bug", mode="async") as turn:
+            with span("triage.prepare"):
+                bug_id, user_msg = self.prepare_bug(raw_text)
+            turn.set(bug_id=bug_id)
+            try:
+                with span("triage.prefilter"):
+                    local = self.local_triage(bug_id, raw_text)
+                if local:
+                    turn.set(local=True)
+                    self._finish(bug_id, raw_text, user_msg, *local)
+                    return bug_id, local[0]
+
+                with span("triage.build_messages"):
+                    params = self.triage_params(self._context(bug_id, user_msg))
+                record = None
+                with span("llm.request", model=self.model) as request:
+                    if self.structured:
+                        record, response = await acreate_structured(
+                            aclient, TRIAGE_SCHEMA, cache=self.cache, **params)
+                        reply = json.dumps(record, ensure_ascii=False)
+                    elif self.cache:
+                        response = await self.cache.acreate(aclient, **params)
+                        reply = response.choices[0].message.content
+                    else:
+                        response = await aclient.chat.completions.create(**params)
+                        reply = response.choices[0].message.content
+                    request.usage(response)
+                with span("triage.finish"):
+                    self.prompt_stats.record(params["messages"], response.usage)
+                    self.learn(raw_text, reply, record)
+                    self._finish(bug_id, raw_text, user_msg, reply, record)
+                return bug_id, reply
+            except BaseException:   # failed or cancelled: nothing was registered
+                self.release_bug(bug_id)
+                raise
 
     def chat(self, msg):
         """General conversation (not a bug)."""
-        self.history.append({"role": "user", "content": msg})
+        user_msg = {"role": "user", "content": msg}
+        if self.digest_budget:
+            # Digest mode: earlier chat turns after the digest, bugs via the digest
+            messages = self._digest_context(user_msg)[:-1] + self.history[1:] + [user_msg]
+        else:
+            messages = self.history + [user_msg]
+        self.history.append(user_msg)
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=self.history,
+            messages=messages,
             temperature=0.5,
             max_tokens=400,
         )
@@ -119,14 +498,56 @@ class TriageAssistant:
 # ============================================================
 # Interactive loop
 # ============================================================
+def start_embeddings():
+    """An EmbeddingIndex if NumPy and an embedding model are available, else None."""
+    try:
+        index = EmbeddingIndex(client)
+        index.embed(["warm-up"])   # fails fast if no embedding model is loaded
+    except Exception as e:
+        print(f"   ⚠️  Embeddings off — {type(e).__name__}: {e}")
+        return None
+    print(f"   🧠 Semantic duplicates on ({index.model})")
+    return index
+
+
+def train_classifier(classifier, store, limit=5000):
+    """Teach a SeverityClassifier from the model's earlier answers in the store."""
+    for text, triage in store.triaged(limit):
+        if LOCAL_REASON not in triage:   # don't learn from its own guesses
+            classifier.learn(text, *triage_fields(triage))
+    return classifier
+
+
 def main():
+    structured = "--json" in sys.argv[1:]
+    digest_budget = DIGEST_BUDGET if "--digest" in sys.argv[1:] else None
+    system_prompt = JSON_SYSTEM_PROMPT if structured else SYSTEM_PROMPT
+
+    # Load the model and pre-process the system prompt in the background
+    # while the user pastes their first bug (see warmup.py)
+    warm = start_warmup(client, model, system_prompt)
+
     print("═" * 60)
     print("   🐞 DEFECT TRIAGE ASSISTANT")
-    print("   Paste a bug, type 'list' to see seen bugs,")
-    print("   'chat <text>' to ask a non-bug question, 'quit' to exit.")
+    print("   Paste a bug, 'list [page]' to see seen bugs,")
+    print("   'list <keywords>' to search them, 'chat <text>' to ask")
+    print("   a non-bug question, 'clusters' for similar-bug groups")
+    print("   (with --embed), 'quit' to exit.")
     print("═" * 60)
 
-    agent = TriageAssistant(client, model)
+    embeddings = start_embeddings() if "--embed" in sys.argv[1:] else None
+    store = BugStore()
+    classifier = None
+    if "--prefilter" in sys.argv[1:]:
+        classifier = train_classifier(SeverityClassifier(), store)
+        print(f"   ⚡ Pre-classifier on (trained on {classifier.stats()['trained_on']} "
+              f"earlier bug(s), threshold {classifier.threshold})")
+    agent = TriageAssistant(client, model, cache=ResponseCache(), store=store,
+                            structured=structured, digest_budget=digest_budget,
+                            embeddings=embeddings, classifier=classifier)
+    if store.count():
+        print(f"   📚 {store.count()} bug(s) from earlier sessions in {store.path}")
+    reported_warmup = False
 
     while True:
         try:
@@ -137,17 +558,42 @@ def main():
         if not raw:
             continue
 
+        if not reported_warmup:
+            print(f"   🔥 Model warm-up: {warm.describe()}")
+            reported_warmup = True
+
         cmd = raw.lower()
         if cmd in {"quit", "exit", "q"}:
             break
 
-        if cmd == "list":
-            if not agent.bugs_seen:
-                print("   (no bugs yet)")
+        if cmd == "list" or cmd.startswith("list "):
+            arg = raw[5:].strip()
+            if arg and not arg.isdigit():
+                bugs = store.search(arg)
+                title = f"matching '{arg}'"
+            else:
+                page = int(arg or 1)
+                bugs = store.page(page)
+                pages = max(-(-store.count() // PAGE_SIZE), 1)
+                title = f"page {page}/{pages}, newest first"
+            if not bugs:
+                print("   (no bugs found)")
                 continue
-            for b in agent.bugs_seen:
+            print(f"   — {title} —")
+            for b in bugs:
                 preview = b["text"].splitlines()[0][:80]
-                print(f"   {b['id']}: {preview}")
+                dupes = ", ".join(cid for cid, _ in b["candidates"])
+                print(f"   {b['id']}: {preview}" + (f"  ≈ {dupes}" if dupes else ""))
+            continue
+
+        if cmd == "clusters":
+            groups = embeddings.clusters() if embeddings is not None else []
+            if embeddings is None:
+                print("   (run with --embed to group bugs by meaning)")
+            elif not groups:
+                print("   (no clusters yet — every bug looks unique)")
+            for group in groups:
+                print(f"   🧩 {len(group)} bugs: {', '.join(group)}")
             continue
 
         if cmd.startswith("chat "):
@@ -161,12 +607,27 @@ def main():
             print("   (Is LM Studio still running?)")
             continue
 
-        print(f"\n🤖 Triage for {bug_id}:\n{reply}")
+        who = "⚡ Local triage" if LOCAL_REASON in reply else "🤖 Triage"
+        if structured:
+            reply = format_triage(agent.records[bug_id])
+        print(f"\n{who} for {bug_id}:\n{reply}")
 
     # Wrap-up
     print("\n" + "═" * 60)
-    print(f"📊 Session done. Triaged {len(agent.bugs_seen)} bug(s).")
+    print(f"📊 Session done. Triaged {len(agent.bugs_seen)} bug(s), "
+          f"{store.count()} stored in total.")
+    stats = agent.cache.stats()
+    print(f"💾 Cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+    prefix = agent.prompt_stats.summary()
+    if prefix["requests"]:
+        print(f"♻️  Prompt tokens: {prefix['prompt_tokens']} sent, "
+              f"{prefix['cache_ratio']:.0%} reusable from the server's prompt cache")
+    if classifier:
+        pre = classifier.stats()
+        print(f"⚡ Pre-classifier: {pre['answered']} of {pre['checked']} bug(s) triaged "
+              f"locally — {pre['answered']} LLM call(s) avoided ({pre['avoided_ratio']:.0%})")
     print("═" * 60)
+    store.close()
 
 
 if __name__ == "__main__":
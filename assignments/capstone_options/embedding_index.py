@@ -0,0 +1,237 @@
+"""
+================================================================
+embedding_index.py — Semantic duplicates via local embeddings
+================================================================
+
+dedup_index.py and bug_store.py match on shared WORDS, so "login
+crashes for plus-sign emails" and "app dies signing in with an
+aliased address" look unrelated. Embeddings compare MEANING.
+
+LM Studio serves embedding models on the same OpenAI-compatible
+API (/v1/embeddings — load e.g. nomic-embed-text in LM Studio).
+This index:
+
+   1. Embeds each report (batched, and cached on disk by content
+      hash — re-triaging an unchanged report never re-embeds it).
+   2. Keeps every vector, normalised, in ONE contiguous float32
+      NumPy matrix, so "cosine similarity to every earlier bug" is
+      one matrix product (a whole block of new reports at once).
+   3. Groups reports into clusters incrementally: a new report
+      joins the cluster of its most similar earlier report if
+      that's above `threshold`, or starts a new cluster.
+
+   index = EmbeddingIndex(client)
+   index.add("BUG-1", "App crashes on login with + alias email")
+   index.query("Signing in dies for aliased addresses", k=3)
+   # → [("BUG-1", 0.83)]
+   index.clusters()          # → [["BUG-1", "BUG-7", ...], ...]
+
+Needs NumPy (pip install numpy) — everything else in the triage
+assistant works without it.
+
+Settings (optional, read from .env):
+  LOCAL_EMBEDDING_MODEL  embedding model id   (text-embedding-nomic-embed-text-v1.5)
+  LLM_EMBED_CACHE_PATH   on-disk vector cache (.embeddings_cache.sqlite)
+================================================================
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+from dotenv import load_dotenv
+
+try:
+    import numpy as np  # optional — only needed for embeddings
+except ImportError:
+    np = None
+
+load_dotenv()
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-nomic-embed-text-v1.5"
+
+
+# ============================================================
+# On-disk cache: content hash → float32 vector
+# ============================================================
+class EmbeddingCache:
+    """SQLite cache of embedding vectors, keyed by (model, text) hash."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("LLM_EMBED_CACHE_PATH", ".embeddings_cache.sqlite")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(model, text):
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """{key: vector} for the keys we already have."""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):   # SQLite parameter limit
+                chunk = keys[start:start + 500]
+                marks = ", ".join("?" * len(chunk))
+                for key, blob in self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", chunk):
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        """Store (key, vector) pairs."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ============================================================
+# The index
+# ============================================================
+class EmbeddingIndex:
+    """Float32 matrix of normalised embeddings with top-k search and clustering."""
+
+    def __init__(self, client, model=None, cache=None, threshold=0.85,
+                 min_score=0.6, batch_size=64, block=256):
+        if np is None:
+            raise ImportError("EmbeddingIndex needs NumPy — run: pip install numpy")
+        self.client = client
+        self.model = model or os.getenv("LOCAL_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.threshold = threshold     # cosine to join the nearest bug's cluster
+        self.min_score = min_score     # cosine to count as a duplicate candidate
+        self.batch_size = batch_size   # texts per /v1/embeddings request
+        self.block = block             # reports scored per matrix multiply in add_many()
+        self.embedded = 0              # vectors fetched from the server (cache misses)
+
+        self.ids = []                  # row → bug id
+        self._rows = {}                # bug id → row
+        self._matrix = None            # (capacity, dim) float32; rows [:len(ids)] are used
+        self._cluster_of = []          # row → cluster number
+        self._members = []             # cluster number → [bug ids]
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------------------------------------
+    def embed(self, texts):
+        """Normalised float32 vectors for `texts` (one row each), cache first."""
+        keys = [EmbeddingCache.key(self.model, t) for t in texts]
+        found = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            response = self.client.embeddings.create(
+                model=self.model, input=[texts[i] for i in batch])
+            fresh = [(keys[i], item.embedding) for i, item in zip(batch, response.data)]
+            self.cache.put_many(fresh)
+            found.update((key, np.asarray(vec, dtype=np.float32)) for key, vec in fresh)
+            self.embedded += len(batch)
+
+        vectors = np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _reserve(self, rows, dim):
+        """Make room for `rows` rows (capacity doubles, so appends are amortised O(1))."""
+        if self._matrix is None:
+            self._matrix = np.zeros((max(rows, 64), dim), dtype=np.float32)
+        elif rows > self._matrix.shape[0]:
+            bigger = np.zeros((max(rows, self._matrix.shape[0] * 2), dim), dtype=np.float32)
+            bigger[:self._matrix.shape[0]] = self._matrix
+            self._matrix = bigger
+
+    # ------------------------------------------------------------
+    @staticmethod
+    def _top_k(scores, k):
+        """Best k (index, score) from a 1-D score array — O(n), then sorts only k."""
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(i, float(scores[i])) for i in top[np.argsort(-scores[top])]]
+
+    def query(self, text, k=3, exclude=None):
+        """Up to k (bug_id, cosine) pairs above `min_score`, most similar first.
+
+        Always embeds `text` (even into an empty index), so a later
+        add() of the same text finds its vector in the cache.
+        """
+        vector = self.embed([text])[0]
+        n = len(self.ids)
+        if not n:
+            return []
+        scores = self._matrix[:n] @ vector   # cosine: rows are normalised
+        if exclude in self._rows:
+            scores[self._rows[exclude]] = -1.0
+        return [(self.ids[i], round(score, 2)) for i, score in self._top_k(scores, k)
+                if score >= self.min_score]
+
+    def add_many(self, items, k=3):
+        """
+        Index (bug_id, text) pairs and return each one's top-k EARLIER
+        look-alikes, in input order. Embeddings are fetched in batches
+        and similarities computed a block of reports at a time, as one
+        matrix multiply against everything indexed so far.
+        """
+        items = [(bug_id, text) for bug_id, text in items if bug_id not in self._rows]
+        if not items:
+            return []
+        vectors = self.embed([text for _, text in items])
+        results = []
+        for start in range(0, len(items), self.block):
+            batch = vectors[start:start + self.block]
+            n, b = len(self.ids), len(batch)
+            self._reserve(n + b, batch.shape[1])
+            self._matrix[n:n + b] = batch
+
+            # (n + b) x b scores in one multiply; column j only looks at
+            # the rows added before report j
+            scores = self._matrix[:n + b] @ batch.T
+            for j, (bug_id, _) in enumerate(items[start:start + b]):
+                best = self._top_k(scores[:n + j, j], k)
+                self.ids.append(bug_id)
+                self._rows[bug_id] = n + j
+                self._join_cluster(bug_id, best)
+                results.append([(self.ids[i], round(score, 2)) for i, score in best
+                                if score >= self.min_score])
+        return results
+
+    def add(self, bug_id, text, k=3):
+        """Index one report; returns its top-k look-alikes from BEFORE it was added."""
+        results = self.add_many([(bug_id, text)], k)
+        return results[0] if results else self.query(text, k, exclude=bug_id)
+
+    # ------------------------------------------------------------
+    def _join_cluster(self, bug_id, best):
+        """Incremental clustering: join the nearest earlier bug's cluster if close enough."""
+        if best and best[0][1] >= self.threshold:
+            cluster = self._cluster_of[best[0][0]]
+            self._members[cluster].append(bug_id)
+        else:
+            cluster = len(self._members)
+            self._members.append([bug_id])
+        self._cluster_of.append(cluster)
+
+    def cluster_of(self, bug_id):
+        """Every bug in the same cluster as `bug_id` (including itself)."""
+        return list(self._members[self._cluster_of[self._rows[bug_id]]])
+
+    def clusters(self, min_size=2):
+        """Clusters with at least `min_size` bugs, largest first."""
+        groups = [list(m) for m in self._members if len(m) >= min_size]
+        return sorted(groups, key=len, reverse=True)
@@ -0,0 +1,207 @@
+"""
+================================================================
+severity_classifier.py — Triage the obvious bugs without the LLM
+================================================================
+
+"Crash on login", "500 on checkout", "typo in the footer" — a lot
+of reports need no model to get a severity and an owner area. This
+pre-classifier answers those locally, in microseconds, and only
+sends the rest to the model.
+
+Two sources, combined per field (severity, owner area):
+   1. Rules        — keyword regexes ("crash" → Critical,
+                     "checkout" → payments). Two different words
+                     for one label are strong evidence; a single
+                     word is not enough on its own, and conflicting
+                     labels are weak.
+   2. Naive Bayes  — a tiny word-count model trained on the model's
+                     OWN earlier triage results (learn()), so it
+                     picks up your product's vocabulary over time.
+                     Silent until it has seen `min_training` bugs.
+
+When both agree, confidence goes up; when they disagree, it drops
+below any sensible threshold. Only guesses with confidence ≥
+`threshold` for BOTH fields are used instead of the model — so a
+lone "crash" goes to the model until Naive Bayes backs it up.
+
+   clf = SeverityClassifier(threshold=0.85)
+   clf.classify("App crashes on login for + alias emails")   # → None (one word each)
+   clf.classify("Checkout crash: 500 after payment")
+   # → {"severity": "Critical", "owner_area": "payments",
+   #    "confidence": 0.9, "reason": "rules: crash / 500 / checkout / payment"}
+   clf.learn("Refund button does nothing", "High", "payments")
+   clf.stats()   # → {"checked": 40, "answered": 23, "avoided_ratio": 0.575}
+================================================================
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from dedup_index import shingles
+
+SEVERITY_ORDER = ["Critical", "High", "Medium", "Low"]
+
+# (pattern, label) — every distinct matching word is collected per label
+SEVERITY_RULES = [
+    (r"\bcrash\w*|\bdata loss\b|\bsecurity\b|\bleak\w*|\b50[0234]\b|\boutage\b"
+     r"|\bcharged twice\b|\bcan(not|'t) (log ?in|sign ?in|pay|check ?out)\b", "Critical"),
+    (r"\bfreez\w*|\bhang(s|ing)?\b|\btime ?outs?\b|\bnot working\b|\bbroken\b"
+     r"|\bfails?\b|\bfailed\b|\bdoes(n't| not) (work|load|save)\b", "High"),
+    (r"\bslow\w*|\bincorrect\b|\bwrong\b|\bmissing\b|\bsometimes\b|\bintermittent\w*", "Medium"),
+    (r"\btypo\w*|\bmisspel\w*|\bcosmetic\b|\balign\w*|\bcolou?r\b|\bfont\b"
+     r"|\btooltip\b|\bpadding\b|\bwording\b", "Low"),
+]
+AREA_RULES = [
+    (r"\blog ?in\b|\bsign ?in\b|\bpassword\b|\bauth\w*|\bsso\b|\b2fa\b|\botp\b", "auth"),
+    (r"\bcheck ?out\b|\bpayment\w*|\bpay\b|\brefund\w*|\binvoice\w*|\bbilling\b"
+     r"|\bcharged\b|\bcards?\b", "payments"),
+    (r"\bcart\b|\bbasket\b", "ui-cart"),
+    (r"\bios\b|\biphone\b|\bipad\b", "mobile-ios"),
+    (r"\bandroid\b", "mobile-android"),
+    (r"\b50[0234]\b|\bserver\b|\bdatabase\b|\boutage\b|\bdeploy\w*|\bapi\b", "infra"),
+    (r"\bfooter\b|\bheader\b|\bbutton\b|\bfont\b|\bcss\b|\blayout\b|\btypo\w*", "ui"),
+]
+# Areas that give way to a more specific one: "checkout crashes on iOS"
+# belongs to payments, not mobile-ios
+GENERIC_AREAS = {"mobile-ios", "mobile-android", "infra", "ui"}
+
+_SEVERITY_RULES = [(re.compile(p, re.IGNORECASE), label) for p, label in SEVERITY_RULES]
+_AREA_RULES = [(re.compile(p, re.IGNORECASE), label) for p, label in AREA_RULES]
+
+RULE_CONFIDENCE = 0.9        # exactly one label, matched by two or more different words
+SINGLE_WORD_CONFIDENCE = 0.7  # exactly one label, one word — below threshold alone
+CONFLICT_CONFIDENCE = 0.5    # several labels matched (or rules vs. Bayes disagree)
+
+
+def _rule_guess(rules, text, worst_first=False, generic=()):
+    """(label, confidence, matched words) from keyword rules, or (None, 0, [])."""
+    hits = {}
+    for pattern, label in rules:
+        for match in pattern.finditer(text):
+            words = hits.setdefault(label, [])
+            word = match.group(0).lower()
+            if word not in words:
+                words.append(word)
+    if not hits:
+        return None, 0.0, []
+    specific = {label: words for label, words in hits.items() if label not in generic}
+    if specific and len(specific) < len(hits):
+        hits = specific
+    if len(hits) == 1:
+        label, words = next(iter(hits.items()))
+        return label, RULE_CONFIDENCE if len(words) > 1 else SINGLE_WORD_CONFIDENCE, words
+    # Several labels: keep the first (for severity, the worst) — weakly
+    label = min(hits, key=SEVERITY_ORDER.index) if worst_first else next(iter(hits))
+    return label, CONFLICT_CONFIDENCE, [words[0] for words in hits.values()]
+
+
+# ============================================================
+# Naive Bayes over the same normalised words as dedup_index
+# ============================================================
+class NaiveBayes:
+    """Multinomial naive Bayes with Laplace smoothing."""
+
+    def __init__(self):
+        self.docs = Counter()                 # label → training documents
+        self.words = defaultdict(Counter)     # label → word → count
+        self.totals = Counter()               # label → total words
+        self.vocab = set()
+
+    def __len__(self):
+        return sum(self.docs.values())
+
+    def learn(self, words, label):
+        self.docs[label] += 1
+        self.words[label].update(words)
+        self.totals[label] += len(words)
+        self.vocab.update(words)
+
+    def predict(self, words):
+        """(label, posterior probability) or (None, 0.0) if untrained."""
+        if not self.docs:
+            return None, 0.0
+        n, v = len(self), len(self.vocab) + 1
+        logs = {}
+        for label, docs in self.docs.items():
+            counts, total = self.words[label], self.totals[label] + v
+            logs[label] = math.log(docs / n) + sum(
+                math.log((counts[w] + 1) / total) for w in words)
+        best = max(logs, key=logs.get)
+        norm = sum(math.exp(score - logs[best]) for score in logs.values())
+        return best, 1.0 / norm
+
+
+# ============================================================
+# The pre-classifier
+# ============================================================
+def _combine(rule, bayes):
+    """Merge a rule guess and a Bayes guess, each (label, confidence)."""
+    (r_label, r_conf), (b_label, b_conf) = rule, bayes
+    if r_label and b_label:
+        if r_label == b_label:
+            return r_label, 1 - (1 - r_conf) * (1 - b_conf)   # both say so
+        return (r_label, CONFLICT_CONFIDENCE) if r_conf >= b_conf else \
+            (b_label, CONFLICT_CONFIDENCE)
+    return (r_label, r_conf) if r_label else (b_label, b_conf)
+
+
+class SeverityClassifier:
+    """Rules + naive Bayes guess at severity and owner area, with a confidence."""
+
+    def __init__(self, threshold=0.85, min_training=20):
+        self.threshold = threshold
+        self.min_training = min_training
+        self.severity_model = NaiveBayes()
+        self.area_model = NaiveBayes()
+        self.checked = 0
+        self.answered = 0
+
+    def learn(self, text, severity, owner_area):
+        """Train on one triaged bug (e.g. the model's answer for it)."""
+        words = list(shingles(text))
+        if severity in SEVERITY_ORDER:
+            self.severity_model.learn(words, severity)
+        if owner_area and owner_area != "?":
+            self.area_model.learn(words, owner_area.lower())
+
+    def _bayes(self, model, words):
+        if len(model) < self.min_training:
+            return None, 0.0
+        return model.predict(words)
+
+    def guess(self, text):
+        """Best guess for any report: dict with severity, owner_area, confidence, reason."""
+        words = list(shingles(text))
+        sev_rule, sev_conf, sev_words = _rule_guess(_SEVERITY_RULES, text, worst_first=True)
+        area_rule, area_conf, area_words = _rule_guess(_AREA_RULES, text, generic=GENERIC_AREAS)
+        severity, s_conf = _combine((sev_rule, sev_conf), self._bayes(self.severity_model, words))
+        area, a_conf = _combine((area_rule, area_conf), self._bayes(self.area_model, words))
+
+        matched = sev_words + [w for w in area_words if w not in sev_words]
+        reason = [f"rules: {' / '.join(matched)}"] if matched else []
+        if len(self.severity_model) >= self.min_training:
+            reason.append("naive Bayes on earlier triage")
+        return {
+            "severity": severity,
+            "owner_area": area,
+            "confidence": round(min(s_conf, a_conf), 2),
+            "reason": "; ".join(reason) or "no evidence",
+        }
+
+    def classify(self, text):
+        """The guess if it's confident enough to skip the model, else None."""
+        self.checked += 1
+        guess = self.guess(text)
+        if guess["severity"] and guess["owner_area"] and guess["confidence"] >= self.threshold:
+            self.answered += 1
+            return guess
+        return None
+
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "answered": self.answered,
+            "avoided_ratio": self.answered / self.checked if self.checked else 0.0,
+            "trained_on": len(self.severity_model),
+        }
@@ -0,0 +1,202 @@
+"""
+================================================================
+bench_catalog.py
+LIST-OF-DICTS VS. COLUMNAR CATALOG — MEMORY AND SUMMARY SPEED
+================================================================
+
+🎯 GOAL:
+   Show what Assignment 1's catalog costs at spreadsheet scale, and
+   what compact_catalog.Catalog saves. Builds the same N synthetic
+   test cases (1M by default) both ways and reports:
+
+     memory     — bytes allocated to hold the catalog (tracemalloc)
+     summary    — status_summary(): a Python loop over dicts vs.
+                  the Catalog's running status counters
+     pass rate  — the same, for pass_rate()
+     filters    — compound filters (module AND status AND priority,
+                  case-insensitive): a scan over the dicts vs. the
+                  Catalog's index bitmaps ANDed together (count_where / where)
+     live run   — a test run streaming status updates into the
+                  Catalog while a dashboard polls pass_rate()
+
+Run it:
+   python benchmarks/bench_catalog.py
+   python benchmarks/bench_catalog.py --cases 200000 --json catalog.json
+================================================================
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "assignments" / "assignment_1_test_case_catalog"))
+
+from compact_catalog import PRIORITIES, STATUSES, Catalog, np  # noqa: E402
+
+MODULES = ["login", "cart", "checkout", "search", "profile", "payments", "admin", "api"]
+
+
+def synthetic_cases(n, seed=7):
+    """N fresh test case dicts (new strings each call, so nothing is shared)."""
+    rng = random.Random(seed)
+    for i in range(n):
+        module = rng.choice(MODULES)
+        yield {
+            "id": f"TC-{i:07d}",
+            "title": f"{module.title()} scenario {i} with {rng.choice(['valid', 'bad'])} data",
+            "module": module,
+            "priority": rng.choice(PRIORITIES),
+            "status": rng.choices(STATUSES, weights=[80, 15, 5])[0],
+            "automated": rng.random() < 0.6,
+        }
+
+
+# The assignment's versions (TASK 5), as a student would write them
+def status_summary(catalog):
+    summary = {}
+    for tc in catalog:
+        summary[tc["status"]] = summary.get(tc["status"], 0) + 1
+    return summary
+
+
+def pass_rate(catalog):
+    summary = status_summary(catalog)
+    runnable = summary.get("pass", 0) + summary.get("fail", 0)
+    return summary.get("pass", 0) / runnable * 100 if runnable else 0.0
+
+
+def scan_filter(catalog, **filters):
+    """The list-of-dicts way: check every case (like cases_in_module())."""
+    wanted = {f: v.lower() if isinstance(v, str) else v for f, v in filters.items()}
+    return [tc for tc in catalog
+            if all((tc[f].lower() if isinstance(tc[f], str) else tc[f]) == v
+                   for f, v in wanted.items())]
+
+
+def dashboard_filters(n, seed=7):
+    """N compound filters like a dashboard would issue."""
+    rng = random.Random(seed)
+    filters = []
+    for _ in range(n):
+        f = {"module": rng.choice(MODULES).upper(), "status": rng.choice(STATUSES)}
+        if rng.random() < 0.7:
+            f["priority"] = rng.choice(PRIORITIES).lower()
+        if rng.random() < 0.3:
+            f["automated"] = rng.random() < 0.5
+        filters.append(f)
+    return filters
+
+
+def live_run(catalog, updates, poll_every, seed=7):
+    """Stream status changes into the catalog, polling pass_rate() as a dashboard would."""
+    rng = random.Random(seed)
+    rows = [catalog[rng.randrange(len(catalog))] for _ in range(updates)]
+    statuses = rng.choices(STATUSES, weights=[80, 15, 5], k=updates)
+    polls = 0
+    start = time.perf_counter()
+    for i, (case, status) in enumerate(zip(rows, statuses), 1):
+        case["status"] = status
+        if i % poll_every == 0:
+            catalog.pass_rate()
+            polls += 1
+    return time.perf_counter() - start, polls
+
+
+def measure(build):
+    """(object, bytes allocated while building it)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    parser.add_argument("--filters", type=int, default=300, help="compound filters to run")
+    parser.add_argument("--updates", type=int, default=200_000, help="live-run status updates")
+    parser.add_argument("--poll-every", type=int, default=100, help="updates between polls")
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args()
+    filters = dashboard_filters(args.filters)
+
+    print(f"\n📊 Catalog benchmark — {args.cases:,} test cases "
+          f"(counting with {'NumPy' if np is not None else 'array.count'})")
+    dicts, dict_bytes = measure(lambda: list(synthetic_cases(args.cases)))
+    dict_summary_s, expected = best_of(lambda: status_summary(dicts))
+    dict_rate_s, _ = best_of(lambda: pass_rate(dicts))
+    scanned = filters[:5]   # a full scan per filter — a few are enough to time it
+    dict_filter_s, dict_hits = best_of(lambda: [len(scan_filter(dicts, **f)) for f in scanned], 1)
+    del dicts
+
+    catalog, catalog_bytes = measure(lambda: Catalog(synthetic_cases(args.cases)))
+    col_summary_s, summary = best_of(catalog.status_summary)
+    col_rate_s, _ = best_of(catalog.pass_rate)
+    assert summary == {k: expected[k] for k in summary} and len(summary) == len(expected)
+    assert [len(catalog.where(**f)) for f in scanned] == dict_hits
+    count_s, _ = best_of(lambda: [catalog.count_where(**f) for f in filters])
+    where_s, _ = best_of(lambda: [catalog.where(**f) for f in filters])
+    live_s, polls = live_run(catalog, args.updates, args.poll_every)
+
+    results = {
+        "cases": args.cases,
+        "dict_mb": dict_bytes / 1e6,
+        "catalog_mb": catalog_bytes / 1e6,
+        "dict_summary_us": dict_summary_s * 1e6,
+        "catalog_summary_us": col_summary_s * 1e6,
+        "dict_pass_rate_us": dict_rate_s * 1e6,
+        "catalog_pass_rate_us": col_rate_s * 1e6,
+        "dict_filter_us": dict_filter_s / len(scanned) * 1e6,
+        "catalog_count_where_us": count_s / len(filters) * 1e6,
+        "catalog_where_us": where_s / len(filters) * 1e6,
+        "live_updates": args.updates,
+        "live_polls": polls,
+        "live_catalog_s": live_s,
+        "live_dict_rescans_s": polls * dict_rate_s,
+    }
+    print("─" * 60)
+    print(f"{'':<16} {'list of dicts':>16} {'Catalog':>12} {'ratio':>8}")
+    for label, a, b, unit in (
+            ("memory", results["dict_mb"], results["catalog_mb"], "MB"),
+            ("status_summary", results["dict_summary_us"], results["catalog_summary_us"], "µs"),
+            ("pass_rate", results["dict_pass_rate_us"], results["catalog_pass_rate_us"], "µs"),
+            ("count_where", results["dict_filter_us"], results["catalog_count_where_us"], "µs"),
+            ("where (rows)", results["dict_filter_us"], results["catalog_where_us"], "µs")):
+        print(f"{label:<16} {a:>13.1f} {unit} {b:>9.1f} {unit} {a / max(b, 1e-9):>7.1f}x")
+    print("─" * 60)
+    print(f"   live run: {args.updates:,} status updates + {polls:,} pass_rate() polls "
+          f"in {live_s:.2f} s;\n   the dict version would spend "
+          f"{results['live_dict_rescans_s']:.0f} s rescanning for the polls alone")
+    print(f"   per compound filter, mean of {len(filters)}; the Catalog's memory "
+          "includes its four indexes")
+    print(f"   {results['catalog_mb'] * 1e6 / args.cases:.0f} bytes/case columnar vs. "
+          f"{results['dict_mb'] * 1e6 / args.cases:.0f} as dicts "
+          "(ids and titles are plain strings in both)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"💾 Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
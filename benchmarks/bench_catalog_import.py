@@ -0,0 +1,153 @@
+"""
+================================================================
+bench_catalog_import.py
+STREAMING A MULTI-MILLION-ROW SPREADSHEET EXPORT INTO A CATALOG
+================================================================
+
+🎯 GOAL:
+   Check that catalog_import.import_cases() keeps up with a real
+   spreadsheet dump and that its memory overhead doesn't grow with
+   the file. Writes N messy rows (2M by default: mixed-case headers
+   and values, "P1"/"Passed"/"x" spellings, ~0.5% bad rows) and
+   reports:
+
+     throughput — rows per second, file on disk → indexed Catalog
+     overhead   — peak memory during the import MINUS the finished
+                  Catalog (tracemalloc), at N/10 rows and at N rows.
+                  Streaming means the two stay about the same.
+
+Run it:
+   python benchmarks/bench_catalog_import.py
+   python benchmarks/bench_catalog_import.py --rows 5000000 --format jsonl
+   python benchmarks/bench_catalog_import.py --chunk-rows 1000 --json import.json
+================================================================
+"""
+
+import argparse
+import csv
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "assignments" / "assignment_1_test_case_catalog"))
+
+from catalog_import import import_cases  # noqa: E402
+
+MODULES = ["Login", "cart", "CHECKOUT", "search", "profile", "payments", "admin", "api"]
+STATUS_SPELLINGS = ["pass", "Passed", "PASS", "ok", "fail", "Failed", "skip", "not run", "blocked"]
+PRIORITY_SPELLINGS = ["High", "high", "P1", "Medium", "P2", "med", "Low", "p3"]
+AUTOMATED_SPELLINGS = ["Yes", "yes", "x", "TRUE", "No", "", "manual"]
+HEADER = ["Test Case ID", "Name", "Component", "Priority", "Result", "Automated", "Owner"]
+
+
+def write_export(path, n, fmt, seed=7):
+    """N spreadsheet rows, ~0.5% of them bad (unknown status, no title, duplicate id)."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None if fmt == "jsonl" else csv.writer(f, delimiter="\t" if fmt == "tsv" else ",")
+        if writer:
+            writer.writerow(HEADER)
+        for i in range(n):
+            row = [f"TC-{i:07d}", f"Scenario {i}", rng.choice(MODULES),
+                   rng.choice(PRIORITY_SPELLINGS), rng.choice(STATUS_SPELLINGS),
+                   rng.choice(AUTOMATED_SPELLINGS), "qa-team"]
+            if rng.random() < 0.005:
+                bad = rng.randrange(3)
+                if bad == 0:
+                    row[4] = "flaky?"
+                elif bad == 1:
+                    row[1] = ""
+                else:
+                    row[0] = f"TC-{rng.randrange(max(i, 1)):07d}"
+            if writer:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(HEADER, row))) + "\n")
+
+
+def timed_import(path, chunk_rows):
+    gc.collect()
+    start = time.perf_counter()
+    catalog, report = import_cases(path, chunk_rows=chunk_rows)
+    return time.perf_counter() - start, catalog, report
+
+
+def import_overhead(path, chunk_rows):
+    """Peak bytes allocated during the import beyond what the finished Catalog holds."""
+    gc.collect()
+    tracemalloc.start()
+    catalog, _ = import_cases(path, chunk_rows=chunk_rows)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current, current, len(catalog)
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", choices=("csv", "tsv", "jsonl"), default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=10_000)
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        big = Path(tmp) / f"cases.{args.format}"
+        small = Path(tmp) / f"cases_small.{args.format}"
+        print(f"\n📝 Writing {args.rows:,} rows as {args.format.upper()}...")
+        write_export(big, args.rows, args.format)
+        write_export(small, args.rows // 10, args.format)
+        file_mb = big.stat().st_size / 1e6
+
+        print(f"📥 Importing ({args.chunk_rows:,} rows per chunk)...")
+        seconds, catalog, report = timed_import(big, args.chunk_rows)
+        assert report["imported"] == len(catalog)
+        assert report["imported"] + report["rejected"] == report["rows"] == args.rows
+        del catalog
+
+        small_overhead, small_catalog, small_n = import_overhead(small, args.chunk_rows)
+        big_overhead, big_catalog, big_n = import_overhead(big, args.chunk_rows)
+
+    results = {
+        "rows": args.rows,
+        "format": args.format,
+        "file_mb": file_mb,
+        "seconds": seconds,
+        "rows_per_s": args.rows / seconds,
+        "imported": report["imported"],
+        "rejected": report["rejected"],
+        "reasons": report["reasons"],
+        "overhead_small_mb": small_overhead / 1e6,
+        "overhead_big_mb": big_overhead / 1e6,
+        "catalog_small_mb": small_catalog / 1e6,
+        "catalog_big_mb": big_catalog / 1e6,
+    }
+    print("─" * 60)
+    print(f"file            {file_mb:>10.1f} MB")
+    print(f"import          {seconds:>10.1f} s   ({results['rows_per_s']:,.0f} rows/s)")
+    print(f"imported        {report['imported']:>10,}")
+    print(f"rejected        {report['rejected']:>10,}   "
+          + ", ".join(f"{reason}={n}" for reason, n in report["reasons"].items()))
+    print(f"overhead        {results['overhead_small_mb']:>10.1f} MB at {small_n:,} cases "
+          f"(Catalog {results['catalog_small_mb']:.0f} MB)")
+    print(f"                {results['overhead_big_mb']:>10.1f} MB at {big_n:,} cases "
+          f"(Catalog {results['catalog_big_mb']:.0f} MB)")
+    print("─" * 60)
+    print("   overhead = peak during import − the finished Catalog; it tracks the "
+          "chunk size, not the file")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"💾 Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+================================================================
+bench_latency.py
+END-TO-END LATENCY BENCHMARK — NO NETWORK, NO MODEL NEEDED
+================================================================
+
+🎯 GOAL:
+   Catch performance regressions in the course code itself (client
+   setup, history handling, prompt building...) by driving the real
+   classes through scripted sessions against mock_llm_server.py.
+
+   Scenarios:
+     ask          — 08_smarter_ai_patterns.ask()
+     life         — 10_life_assistant.LifeAssistant.chat()
+     life-stream  — the same, streamed
+     qa           — assignment 3 QAAgent.chat()
+     triage       — capstone TriageAssistant.add_bug()
+     triage-digest— the same with the compact digest context
+
+   For each one it reports p50 / p95 / p99 latency, throughput, and
+   CLIENT-SIDE OVERHEAD: wall time minus the time the mock server
+   spent "generating". Overhead is the number to watch — the mock's
+   own delay is fixed, so any growth there is our code.
+
+Run it:
+   python benchmarks/bench_latency.py
+   python benchmarks/bench_latency.py --turns 50 --json bench.json
+   python benchmarks/bench_latency.py --max-overhead-ms 25   # CI gate
+   python benchmarks/bench_latency.py --trace trace.json     # per-phase spans
+
+Exit code is 1 if any scenario's p95 overhead exceeds --max-overhead-ms.
+================================================================
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from mock_llm_server import MOCK_MODEL, start_server  # noqa: E402
+
+USER_TURNS = [
+    "How do I stay focused during long regression runs?",
+    "Give me a 20 minute routine I can do at my desk.",
+    "What should I eat before a late release night?",
+    "Summarize what we discussed so far in two bullets.",
+]
+BUG_REPORTS = [
+    "App crashes on login when email contains a + alias on iOS 17.",
+    "Checkout spinner never stops on Android 14 with 3+ saved cards.",
+    "Cart shows a ghost row after removing the last item (web).",
+    "Login crashes on iPhone 13 for emails with plus sign.",
+]
+
+
+# ============================================================
+# Helpers
+# ============================================================
+def load_script(relpath):
+    """Import a course script by path, silencing its prints and input() prompts."""
+    path = ROOT / relpath
+    # Scripts import their neighbours (e.g. dedup_index.py), as they
+    # would when run from their own folder
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(f"bench_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()), \
+            mock.patch("builtins.input", side_effect=EOFError):
+        spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values need not be sorted)."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def run_scenario(server, turns, call):
+    """Call `call(i)` `turns` times; return wall and overhead samples in seconds."""
+    walls, overheads = [], []
+    for i in range(turns):
+        served = len(server.service_times)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            call(i)
+        wall = time.perf_counter() - start
+        walls.append(wall)
+        overheads.append(wall - sum(server.service_times[served:]))
+    return walls, overheads
+
+
+def summarize(name, walls, overheads):
+    ms = 1000
+    return {
+        "scenario": name,
+        "calls": len(walls),
+        "p50_ms": percentile(walls, 50) * ms,
+        "p95_ms": percentile(walls, 95) * ms,
+        "p99_ms": percentile(walls, 99) * ms,
+        "throughput_per_s": len(walls) / sum(walls),
+        "overhead_p50_ms": percentile(overheads, 50) * ms,
+        "overhead_p95_ms": percentile(overheads, 95) * ms,
+    }
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--turns", type=int, default=20, help="calls per scenario")
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--json", help="also write results to this JSON file")
+    parser.add_argument("--max-overhead-ms", type=float,
+                        help="fail if any scenario's p95 overhead exceeds this")
+    parser.add_argument("--trace", help="record spans (tracing.py) and write them here "
+                                        "(.json = Chrome trace, .csv = flat)")
+    args = parser.parse_args()
+
+    from tracing import tracer
+    if args.trace:
+        tracer.enable()
+
+    server = start_server(token_delay=args.token_delay, jitter=args.jitter,
+                          prompt_delay=0.00005, reply_tokens=48)
+
+    # Point every script at the mock BEFORE importing them
+    os.environ.update({
+        "LOCAL_LLM_BASE_URL": server.base_url,
+        "LOCAL_LLM_MODEL": MOCK_MODEL,
+        "OPENROUTER_API_KEY": "",          # keep the router on the mock only
+        "LLM_CACHE_PATH": str(Path(tempfile.mkdtemp()) / "bench_cache.sqlite"),
+    })
+
+    patterns = load_script("08_smarter_ai_patterns.py")
+    life = load_script("10_life_assistant.py")
+    qa = load_script("assignments/assignment_3_qa_agent/qa_agent.py")
+    triage = load_script("assignments/capstone_options/defect_triage_assistant.py")
+
+    from llm_client import get_client, get_model
+    client, model = get_client("local"), get_model("local")
+    persona = life.categories["7"]
+
+    ask_history = [{"role": "system", "content": "You are a concise tutor."}]
+    life_agent = life.LifeAssistant(client, model, persona["prompt"], persona["name"])
+    stream_agent = life.LifeAssistant(client, model, persona["prompt"], persona["name"])
+    qa_agent = qa.QAAgent(client, model)
+    triage_agent = triage.TriageAssistant(client, model)
+    digest_agent = triage.TriageAssistant(client, model, digest_budget=triage.DIGEST_BUDGET)
+
+    scenarios = {
+        "ask": lambda i: patterns.ask(client, model, ask_history,
+                                      USER_TURNS[i % len(USER_TURNS)], max_tokens=48),
+        "life": lambda i: life_agent.chat(USER_TURNS[i % len(USER_TURNS)]),
+        "life-stream": lambda i: stream_agent.chat(USER_TURNS[i % len(USER_TURNS)],
+                                                   stream=True),
+        "qa": lambda i: qa_agent.chat(USER_TURNS[i % len(USER_TURNS)]),
+        "triage": lambda i: triage_agent.add_bug(BUG_REPORTS[i % len(BUG_REPORTS)]),
+        "triage-digest": lambda i: digest_agent.add_bug(BUG_REPORTS[i % len(BUG_REPORTS)]),
+    }
+
+    results = []
+    for name, call in scenarios.items():
+        results.append(summarize(name, *run_scenario(server, args.turns, call)))
+    server.shutdown()
+
+    print(f"\n📊 Latency benchmark — {args.turns} calls/scenario, "
+          f"mock token delay {args.token_delay * 1000:.1f} ms")
+    print("─" * 78)
+    print(f"{'scenario':<13} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'calls/s':>8} {'ovh p50':>9} {'ovh p95':>9}")
+    for r in results:
+        print(f"{r['scenario']:<13} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms "
+              f"{r['p99_ms']:>6.1f}ms {r['throughput_per_s']:>8.1f} "
+              f"{r['overhead_p50_ms']:>7.2f}ms {r['overhead_p95_ms']:>7.2f}ms")
+    print("─" * 78)
+    for name, agent in (("qa", qa_agent), ("triage", triage_agent),
+                        ("digest", digest_agent)):
+        cache = agent.prompt_stats.summary()
+        print(f"♻️  {name:<7} prompt tokens {cache['prompt_tokens']:>6}, "
+              f"{cache['cache_ratio']:.0%} served from the prefix cache")
+
+    if args.trace:
+        print(f"\n🧭 Where the time went (all scenarios, {len(tracer.spans)} spans)")
+        print(f"{'span':<22} {'count':>6} {'total':>10} {'mean':>9}")
+        for name, t in tracer.summary().items():
+            print(f"{name:<22} {t['count']:>6} {t['total_ms']:>8.1f}ms {t['mean_ms']:>7.2f}ms")
+        tracer.export(args.trace)
+        tracer.clear()   # don't write it again at exit
+        print(f"💾 Wrote {args.trace}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"💾 Wrote {args.json}")
+
+    if args.max_overhead_ms is not None:
+        slow = [r["scenario"] for r in results
+                if r["overhead_p95_ms"] > args.max_overhead_ms]
+        if slow:
+            print(f"❌ p95 overhead above {args.max_overhead_ms} ms: {', '.join(slow)}")
+            sys.exit(1)
+        print(f"✅ All scenarios under {args.max_overhead_ms} ms p95 overhead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+================================================================
+bench_skill_router.py
+SKILL DETECTION MICRO-BENCHMARK — NO NETWORK, NO MODEL NEEDED
+================================================================
+
+🎯 GOAL:
+   Keep QAAgent.detect_skill() cheap as skills and keywords grow.
+   Routes N synthetic messages (100k by default) two ways:
+
+     chain   — the textbook if/elif of `any(kw in msg for kw ...)`,
+               first matching skill wins
+     router  — skill_router.SkillRouter: one compiled regex, every
+               skill scored, best one wins
+
+   ...first with the real QAAgent keywords, then with 10x as many
+   skills (synthetic keywords), to show how each one scales. It
+   also reports how often the two disagree — those are messages
+   where the first match was not the best match.
+
+Run it:
+   python benchmarks/bench_skill_router.py
+   python benchmarks/bench_skill_router.py --messages 20000 --json router.json
+================================================================
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bench_latency import load_script  # noqa: E402
+from skill_router import SkillRouter  # noqa: E402
+
+FILLER = [
+    "the", "on", "iPhone 13", "for the new", "password reset flow", "checkout page",
+    "we saw", "after deploy", "in staging", "please", "can you", "tomorrow", "login",
+    "cart", "when the keyboard is open", "with 3 saved cards", "build 4812", "quickly",
+]
+
+
+def chain_detector(skills):
+    """The first-match-wins if/elif chain, generalised to any skills dict."""
+    keyword_lists = [(skill, list(keywords)) for skill, keywords in skills.items()]
+
+    def detect(message):
+        msg = message.lower()
+        for skill, keywords in keyword_lists:
+            if any(kw in msg for kw in keywords):
+                return skill
+        return None
+    return detect
+
+
+def synthetic_messages(skills, n, seed=7):
+    """Messages mixing filler words with 0-3 keywords from random skills."""
+    rng = random.Random(seed)
+    keywords = [kw for words in skills.values() for kw in words]
+    messages = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(6, 30))
+        for _ in range(rng.choice([0, 1, 1, 2, 3])):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        messages.append(" ".join(words).capitalize() + ".")
+    return messages
+
+
+def more_skills(skills, factor, seed=7):
+    """`skills` plus (factor - 1) x as many made-up skills with made-up keywords."""
+    rng = random.Random(seed)
+    bigger = dict(skills)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    for i in range(len(skills) * (factor - 1)):
+        bigger[f"skill_{i}"] = {
+            " ".join("".join(rng.choices(letters, k=rng.randint(4, 9)))
+                     for _ in range(rng.randint(1, 2))): rng.choice([1, 2, 3])
+            for _ in range(12)
+        }
+    return bigger
+
+
+def time_it(detect, messages):
+    start = time.perf_counter()
+    picks = [detect(m) for m in messages]
+    return time.perf_counter() - start, picks
+
+
+def bench(name, skills, messages):
+    router = SkillRouter(skills)
+    chain_s, chain_picks = time_it(chain_detector(skills), messages)
+    router_s, router_picks = time_it(lambda m: router.route(m)[0], messages)
+    differ = sum(a != b for a, b in zip(chain_picks, router_picks))
+    return {
+        "case": name,
+        "skills": len(skills),
+        "keywords": sum(len(k) for k in skills.values()),
+        "messages": len(messages),
+        "chain_us": chain_s / len(messages) * 1e6,
+        "router_us": router_s / len(messages) * 1e6,
+        "router_msgs_per_s": len(messages) / router_s,
+        "disagree_pct": differ / len(messages) * 100,
+    }
+
+
+# ============================================================
+# Main
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    # qa_agent.py builds a client at import; keep it pointed nowhere real
+    os.environ.setdefault("LOCAL_LLM_BASE_URL", "http://127.0.0.1:9/v1")
+    qa = load_script("assignments/assignment_3_qa_agent/qa_agent.py")
+
+    results = []
+    for name, skills in (("qa-agent", qa.SKILL_KEYWORDS),
+                         ("10x skills", more_skills(qa.SKILL_KEYWORDS, 10))):
+        messages = synthetic_messages(skills, args.messages)
+        results.append(bench(name, skills, messages))
+
+    print(f"\n📊 Skill detection — {args.messages:,} synthetic messages per case")
+    print("─" * 72)
+    print(f"{'case':<11} {'skills':>6} {'keywords':>8} {'chain':>10} {'router':>10} "
+          f"{'router msg/s':>13} {'differ':>7}")
+    for r in results:
+        print(f"{r['case']:<11} {r['skills']:>6} {r['keywords']:>8} "
+              f"{r['chain_us']:>8.2f}µs {r['router_us']:>8.2f}µs "
+              f"{r['router_msgs_per_s']:>13,.0f} {r['disagree_pct']:>6.1f}%")
+    print("─" * 72)
+    print("'differ' = messages where the first matching skill wasn't the best-scoring one")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"💾 Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+================================================================
+chat_memory.py
+KEEP LONG CONVERSATIONS INSIDE A TOKEN BUDGET
+================================================================
+
+🎯 GOAL:
+   In Video 7 we "gave the model memory" by resending the whole
+   history every turn. That works for five turns. For fifty, the
+   prompt grows every time (so the total tokens sent grow with
+   the SQUARE of the session length) until it no longer fits the
+   model's context window at all.
+
+   ConversationMemory keeps three things:
+     1. The system prompt            — always sent, verbatim
+     2. A running summary            — older turns, folded into a
+                                       few sentences by the model
+     3. The most recent turns        — verbatim, as many as fit in
+                                       `budget` tokens
+
+       memory = ConversationMemory(system_prompt, budget=1500)
+       memory.add("user", "Hi!")
+       reply = ...create(messages=memory.messages())
+       memory.add("assistant", reply)
+       memory.compact(client, model)   # fold old turns if over budget
+
+       memory.tokens_saved             # prompt tokens NOT resent so far
+================================================================
+"""
+
+from token_budget import REPLY_PRIMING, count_tokens
+
+SUMMARY_PROMPT = """You maintain the running memory of a chat between a user and an assistant.
+Merge the existing summary and the new turns into ONE updated summary.
+- Keep facts about the user (goals, constraints, preferences, numbers they gave).
+- Keep decisions and advice already given, so it isn't repeated.
+- Drop greetings and filler. Plain sentences, under 120 words."""
+
+
+class ConversationMemory:
+    """System prompt + running summary + recent turns within a token budget."""
+
+    def __init__(self, system_prompt, budget=1500, model=None):
+        self.system = {"role": "system", "content": system_prompt}
+        self.summary = ""
+        self.recent = []
+        self.budget = budget
+        self.model = model  # picks the tokenizer family for counting
+
+        self.full_tokens = 0    # tokens the next prompt WOULD be without compaction
+        self.tokens_saved = 0   # running total across the session
+        self.turn_savings = []  # tokens saved per request
+        self.compactions = 0
+
+    def _count(self, messages):
+        return count_tokens(messages, self.model)
+
+    # ------------------------------------------------------------
+    def messages(self):
+        """The message list to send: system (plus summary, if any), recent turns."""
+        system = self.system
+        if self.summary:
+            # Part of the ONE system message: Gemma's and Mistral's chat
+            # templates reject a second system message
+            system = {"role": "system",
+                      "content": f"{self.system['content']}\n\n"
+                                 f"Summary of the earlier conversation:\n{self.summary}"}
+        return [system] + self.recent
+
+    def add(self, role, content):
+        """Append one turn and keep the uncompacted-size counter up to date."""
+        msg = {"role": role, "content": content}
+        self.recent.append(msg)
+        if not self.full_tokens:
+            self.full_tokens = self._count([self.system])
+        self.full_tokens += self._count([msg]) - REPLY_PRIMING
+
+    def record_request(self, pending=()):
+        """Call right before sending messages(): logs how many tokens were saved.
+
+        `pending` is a turn sent along with messages() but not add()ed
+        yet (async callers add the user/assistant pair together).
+        """
+        pending = list(pending)
+        full = self.full_tokens or self._count([self.system])
+        if pending:
+            full += self._count(pending) - REPLY_PRIMING
+        saved = max(full - self._count(self.messages() + pending), 0)
+        self.turn_savings.append(saved)
+        self.tokens_saved += saved
+        return saved
+
+    # ------------------------------------------------------------
+    def _overflow(self):
+        """Oldest recent turns that don't fit the budget (whole user/assistant pairs)."""
+        cut = 0
+        while (cut < len(self.recent) - 2
+               and self._count(self.recent[cut:]) > self.budget):
+            cut += 2
+        return cut
+
+    def _summary_request(self, model, cut):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in self.recent[:cut])
+        return dict(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content":
+                    f"Existing summary:\n{self.summary or '(none)'}\n\n"
+                    f"New turns:\n{transcript}"},
+            ],
+            temperature=0.2,
+            max_tokens=200,
+        )
+
+    def _apply_summary(self, response, cut):
+        self.summary = (response.choices[0].message.content or self.summary).strip()
+        self.recent = self.recent[cut:]   # only drop turns once they're summarized
+        self.compactions += 1
+
+    def compact(self, client, model):
+        """Fold turns that no longer fit into the running summary (one model call)."""
+        cut = self._overflow()
+        if not cut:
+            return False
+        response = client.chat.completions.create(**self._summary_request(model, cut))
+        self._apply_summary(response, cut)
+        return True
+
+    async def acompact(self, aclient, model):
+        """Async compact() for an AsyncOpenAI client."""
+        cut = self._overflow()
+        if not cut:
+            return False
+        response = await aclient.chat.completions.create(**self._summary_request(model, cut))
+        self._apply_summary(response, cut)
+        return True
@@ -0,0 +1,126 @@
+"""
+================================================================
+context_retrieval.py
+SEND THE RELEVANT EARLIER TURNS, NOT JUST THE LATEST ONES
+================================================================
+
+🎯 GOAL:
+   A "last 6 messages" window is cheap and simple, but blind. Ask
+   for release risks and the test plan from ten turns ago has
+   already scrolled out, while the small talk from a minute ago
+   is still sent. You pay for tokens that don't help and lose the
+   ones that would.
+
+   TurnIndex keeps a BM25 index (the ranking behind most search
+   engines) over every user/assistant exchange. For each request
+   it picks the exchanges that best match the request, within a
+   token budget, and returns them in their original order:
+
+       turns = TurnIndex(model=model)
+       turns.add([user_msg, assistant_msg])      # after every turn
+       context = turns.select("release risks checkout",
+                              budget=1200, recent=1)
+       messages = [system] + context + [skill_msg, user_msg]
+
+How it picks:
+  ✅ The `recent` latest exchanges always go in (so follow-ups like
+     "what about on Android?" still make sense).
+  ✅ Then the best BM25 matches, best first, while they fit in the
+     budget. Exchanges with no words in common with the request are
+     never sent.
+  ✅ Scoring is incremental (word counts are kept as turns arrive),
+     so picking is one pass over the stored turns, with no model
+     call and no re-indexing.
+
+Trade-off: a picked context changes from request to request, so
+less of the prompt is shared with the previous one (see
+prompt_layout.py). Use it where the answer depends on WHICH
+history is sent, not for every chat turn.
+================================================================
+"""
+
+import math
+import re
+from collections import Counter
+
+from token_budget import REPLY_PRIMING, count_tokens
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it
+its me my of on or so that the this to was we what when which will with you your
+""".split())
+
+
+def terms(text):
+    """Lowercase words minus stopwords — what BM25 counts."""
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+class TurnIndex:
+    """BM25 index over conversation exchanges, with budgeted selection."""
+
+    def __init__(self, model=None, k1=1.5, b=0.75):
+        self.model = model   # picks the tokenizer family for counting
+        self.k1 = k1         # how quickly repeats of a word stop adding score
+        self.b = b           # how much long exchanges are penalised
+
+        self.turns = []      # one dict per exchange: messages, counts, length, tokens
+        self.df = Counter()  # word → number of exchanges containing it
+        self.total_length = 0
+        self.last_selection = None   # {"turns", "of", "tokens"} of the last select()
+
+    def __len__(self):
+        return len(self.turns)
+
+    def add(self, messages):
+        """Index one exchange (usually [user message, assistant reply])."""
+        words = terms(" ".join(m.get("content") or "" for m in messages))
+        counts = Counter(words)
+        self.df.update(counts.keys())
+        self.total_length += len(words)
+        self.turns.append({
+            "messages": list(messages),
+            "counts": counts,
+            "length": len(words),
+            "tokens": count_tokens(messages, self.model) - REPLY_PRIMING,
+        })
+
+    def scores(self, query):
+        """BM25 score of every exchange for `query`, in order."""
+        n = len(self.turns)
+        if not n:
+            return []
+        avg_length = self.total_length / n or 1
+        weights = {}
+        for word in set(terms(query)):
+            if self.df[word]:
+                weights[word] = math.log(1 + (n - self.df[word] + 0.5) / (self.df[word] + 0.5))
+        scores = []
+        for turn in self.turns:
+            counts, norm = turn["counts"], self.k1 * (
+                1 - self.b + self.b * turn["length"] / avg_length)
+            scores.append(sum(idf * counts[w] * (self.k1 + 1) / (counts[w] + norm)
+                              for w, idf in weights.items() if counts[w]))
+        return scores
+
+    def select(self, query, budget, recent=1):
+        """Messages of the chosen exchanges, oldest first, within `budget` tokens."""
+        n = len(self.turns)
+        chosen, used = set(), 0
+        for i in range(n - 1, max(n - recent, 0) - 1, -1):
+            if used + self.turns[i]["tokens"] > budget:
+                break
+            chosen.add(i)
+            used += self.turns[i]["tokens"]
+
+        scores = self.scores(query)
+        for i in sorted(range(n), key=lambda i: -scores[i]):
+            if scores[i] <= 0:
+                break
+            if i not in chosen and used + self.turns[i]["tokens"] <= budget:
+                chosen.add(i)
+                used += self.turns[i]["tokens"]
+
+        self.last_selection = {"turns": len(chosen), "of": n, "tokens": used}
+        return [m for i in sorted(chosen) for m in self.turns[i]["messages"]]
@@ -0,0 +1,289 @@
+"""
+================================================================
+llm_client.py
+ONE SHARED, POOLED CLIENT PER PROVIDER
+================================================================
+
+🎯 GOAL:
+   Stop building a fresh `OpenAI(...)` in every script. Each new
+   client opens its own TCP (and, for OpenRouter, TLS) connection,
+   so a burst of calls pays the handshake again and again.
+
+   This module owns ONE tuned HTTP connection pool per provider
+   and hands out the same client to every caller:
+
+       from llm_client import get_client, get_model
+
+       client = get_client("local")        # LM Studio
+       model  = get_model("local")
+
+       cloud  = get_client("openrouter")   # OpenRouter
+
+   For independent prompts there's an async twin, plus a helper
+   that fans them out with a cap on how many run at once:
+
+       from llm_client import get_async_client, gather_bounded
+
+       aclient = get_async_client("local")
+       replies = asyncio.run(gather_bounded(coros, limit=4))
+
+This file covers:
+  ✅ A provider table (local LM Studio + OpenRouter)
+  ✅ Keep-alive connection pooling via httpx
+  ✅ Configurable pool size and connect/read timeouts
+  ✅ Optional HTTP/2 (only if the `h2` package is installed)
+  ✅ Async clients + bounded-concurrency gather
+  ✅ Streaming replies with time-to-first-token + tokens/sec
+
+Tuning knobs (all optional, read from .env):
+  LLM_POOL_SIZE        max open connections per provider  (default 10)
+  LLM_KEEPALIVE        idle seconds before a connection closes (30)
+  LLM_CONNECT_TIMEOUT  seconds to open a connection       (5)
+  LLM_READ_TIMEOUT     seconds to wait for the reply      (120)
+  LLM_HTTP2            "1" to try HTTP/2                  (off)
+================================================================
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import os
+import threading
+import time
+import weakref
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+
+# ============================================================
+# Provider table — where each backend lives
+# ============================================================
+# Every provider speaks the same OpenAI-compatible API. Only the
+# URL, key and default model differ.
+PLACEHOLDER_KEYS = {"sk-or-your-key-here"}   # .env.example's stand-ins, not real keys
+
+
+def _api_key(name):
+    """An API key from the environment, or None if it's unset or still the placeholder."""
+    value = os.getenv(name, "").strip()
+    return value if value and value not in PLACEHOLDER_KEYS else None
+
+
+PROVIDERS = {
+    "local": {
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:1234/v1"),
+        "api_key": "lm-studio",  # LM Studio ignores the value
+        "model": os.getenv("LOCAL_LLM_MODEL", "local-model"),
+    },
+    "openrouter": {
+        "base_url": "https://openrouter.ai/api/v1",
+        "api_key": _api_key("OPENROUTER_API_KEY"),
+        "model": os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini"),
+    },
+}
+
+
+# ============================================================
+# Transport settings — one place to tune the connection pool
+# ============================================================
+def _env_number(name, default, cast=float):
+    """Read a numeric setting from the environment, falling back on bad input."""
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return cast(default)
+
+
+POOL_SIZE = _env_number("LLM_POOL_SIZE", 10, int)
+KEEPALIVE_SECONDS = _env_number("LLM_KEEPALIVE", 30)
+CONNECT_TIMEOUT = _env_number("LLM_CONNECT_TIMEOUT", 5)
+READ_TIMEOUT = _env_number("LLM_READ_TIMEOUT", 120)
+
+# HTTP/2 multiplexes many requests over one connection, but httpx
+# needs the optional `h2` package for it. Quietly stay on HTTP/1.1
+# if it's missing.
+HTTP2 = (os.getenv("LLM_HTTP2", "0") == "1"
+         and importlib.util.find_spec("h2") is not None)
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=POOL_SIZE,
+        max_keepalive_connections=POOL_SIZE,
+        keepalive_expiry=KEEPALIVE_SECONDS,
+    )
+
+
+def _timeout():
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+# ============================================================
+# The shared clients
+# ============================================================
+_clients = {}
+_lock = threading.Lock()
+
+
+def _check_provider(provider):
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider {provider!r} "
+                         f"(choose from: {', '.join(PROVIDERS)})")
+
+
+def get_client(provider="local"):
+    """Return the shared OpenAI client for `provider`, creating it once."""
+    _check_provider(provider)
+
+    with _lock:
+        client = _clients.get(provider)
+        if client is None:
+            settings = PROVIDERS[provider]
+            client = OpenAI(
+                base_url=settings["base_url"],
+                api_key=settings["api_key"],
+                timeout=_timeout(),
+                http_client=httpx.Client(
+                    limits=_limits(),
+                    timeout=_timeout(),
+                    http2=HTTP2,
+                ),
+            )
+            _clients[provider] = client
+        return client
+
+
+# ============================================================
+# Async clients — one pool per provider PER event loop
+# ============================================================
+# An async connection belongs to the event loop that opened it, so
+# each `asyncio.run(...)` gets its own pool. The weak dict lets a
+# finished loop's clients be garbage-collected with it.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client(provider="local"):
+    """Return the shared AsyncOpenAI client for `provider` on the running loop."""
+    _check_provider(provider)
+    loop = asyncio.get_running_loop()
+
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(provider)
+        if client is None:
+            settings = PROVIDERS[provider]
+            client = AsyncOpenAI(
+                base_url=settings["base_url"],
+                api_key=settings["api_key"],
+                timeout=_timeout(),
+                http_client=httpx.AsyncClient(
+                    limits=_limits(),
+                    timeout=_timeout(),
+                    http2=HTTP2,
+                ),
+            )
+            per_loop[provider] = client
+        return client
+
+
+async def gather_bounded(coros, limit=4):
+    """
+    Run coroutines concurrently, at most `limit` at a time, and
+    return their results in the SAME order they were given.
+
+    A local model serves a handful of requests in parallel at best,
+    so an unbounded gather just queues them on the server instead.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(c) for c in coros))
+
+
+async def aclose_clients():
+    """Close the async clients opened on the running loop (call before it ends)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.pop(loop, {})
+    for client in per_loop.values():
+        await client.close()
+
+
+# ============================================================
+# Streaming — show tokens as they arrive, and time them
+# ============================================================
+# On a local model most of the wait is generation. Printing each
+# token as it lands makes the first words appear in well under a
+# second, even when the full answer takes ten.
+def stream_chat(client, on_token=None, **params):
+    """
+    Call chat.completions.create(stream=True, **params), passing each
+    text fragment to `on_token` as it arrives.
+
+    Returns (reply, stats) where stats is a dict:
+        ttft            seconds until the first token
+        total           seconds for the whole reply
+        tokens          completion tokens (server count if reported,
+                        else number of streamed chunks)
+        tokens_per_sec  generation speed after the first token
+    """
+    start = time.perf_counter()
+    first = None
+    parts = []
+    chunks = 0
+    usage = None
+
+    for chunk in client.chat.completions.create(stream=True, **params):
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if not text:
+            continue
+        if first is None:
+            first = time.perf_counter()
+        chunks += 1
+        parts.append(text)
+        if on_token:
+            on_token(text)
+
+    end = time.perf_counter()
+    first = first or end
+    tokens = usage.completion_tokens if usage else chunks
+    generating = end - first
+    stats = {
+        "ttft": first - start,
+        "total": end - start,
+        "tokens": tokens,
+        "tokens_per_sec": tokens / generating if generating > 0 else 0.0,
+    }
+    return "".join(parts), stats
+
+
+def print_token(text):
+    """Default `on_token`: print without a newline and flush right away."""
+    print(text, end="", flush=True)
+
+
+def get_model(provider="local"):
+    """Return the configured model id for `provider`."""
+    return PROVIDERS[provider]["model"]
+
+
+def close_clients():
+    """Close every pooled connection. Runs automatically at exit."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+atexit.register(close_clients)
@@ -0,0 +1,241 @@
+"""
+================================================================
+llm_router.py
+PICK THE FASTEST HEALTHY BACKEND — AND FAIL OVER WHEN IT ISN'T
+================================================================
+
+🎯 GOAL:
+   Video 8 picks cloud OR local once, at startup. If LM Studio
+   stalls halfway through a session, or OpenRouter starts
+   returning 5xx, the chat just breaks.
+
+   The router keeps a rolling window of latency and errors for
+   every configured provider, sends each request to whichever
+   one is currently the best bet, and moves on to the next one
+   when a call fails:
+
+       from llm_router import ProviderRouter
+
+       router = ProviderRouter()          # local + openrouter (if keyed)
+       r = router.chat.completions.create(messages=msgs, max_tokens=200)
+       print(router.last_provider, r.choices[0].message.content)
+
+   `router.chat.completions.create(...)` has the same shape as a
+   normal client, so the router can be passed anywhere a client
+   is expected. Any `model=` you pass is replaced by the chosen
+   provider's own model from .env.
+
+How it decides:
+  ✅ Score = average latency ÷ success rate over the last N calls
+             (the expected wait for ONE good answer). Untried
+             providers score 0, so each gets tried early.
+  ✅ Circuit breaker: after `failure_threshold` failures in a row
+     a provider is skipped for `cooldown` seconds, then gets one
+     trial call ("half-open") before it's trusted again.
+  ✅ Network / timeout / rate-limit / 5xx errors fail over. So do
+     a provider's 401 / 403 / 404 (bad key, no access, unknown
+     model) — those also open its circuit at once. A bad request
+     would fail everywhere, so it's raised at once.
+  ✅ stream=True works too (llm_client.stream_chat): the router
+     waits for the FIRST chunk before committing to a provider, so
+     a stream that dies before it starts fails over. Once chunks
+     have reached the caller it can't switch, so a stall mid-stream
+     is raised, but it still counts against that provider. Latency
+     is the time to the LAST chunk, not just to the headers.
+================================================================
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from llm_client import PROVIDERS, get_client, get_model
+
+# Errors that mean "this backend is unhealthy", not "your request is wrong"
+FAILOVER_ERRORS = (
+    openai.APIConnectionError,   # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+# Errors that mean "this backend is misconfigured" (bad key, no access,
+# unknown model): another provider can still answer, but retrying this
+# one won't help, so its circuit opens straight away
+BACKEND_ERRORS = (
+    openai.AuthenticationError,    # 401
+    openai.PermissionDeniedError,  # 403
+    openai.NotFoundError,          # 404
+)
+# While reading a stream: the server's error events, or the connection dropping
+STREAM_ERRORS = (openai.APIError, httpx.TransportError)
+
+
+class _Backend:
+    """Rolling health record for one provider."""
+
+    def __init__(self, provider, window):
+        self.provider = provider
+        self.latencies = deque(maxlen=window)   # seconds, successful calls only
+        self.outcomes = deque(maxlen=window)    # True = success
+        self.consecutive_failures = 0
+        self.open_until = 0.0                   # circuit open until this time
+
+    @property
+    def avg_latency(self):
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @property
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def score(self):
+        """Expected seconds per successful answer (lower is better)."""
+        if not self.latencies:
+            # Untried → try it soon; only failures so far → last resort
+            return float("inf") if self.outcomes else 0.0
+        return self.avg_latency / max(1 - self.error_rate, 0.05)
+
+
+class ProviderRouter:
+    """Latency-aware router with failover and per-provider circuit breaking."""
+
+    def __init__(self, providers=None, window=20, failure_threshold=3,
+                 cooldown=30, timeout=None):
+        if providers is None:
+            # Every provider we have credentials for
+            providers = [name for name, cfg in PROVIDERS.items() if cfg["api_key"]]
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+
+        self.backends = [_Backend(p, window) for p in providers]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        # Per-call timeout, so a stalled server fails over instead of hanging
+        self.timeout = timeout or float(os.getenv("LLM_ROUTER_TIMEOUT", 30))
+        self.last_provider = None
+        self.failovers = 0
+        self._lock = threading.Lock()
+
+        # Client-shaped facade: router.chat.completions.create(...)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    # ------------------------------------------------------------
+    def _ranked(self):
+        """Backends to try, best first. Tripped ones only if nothing else is left."""
+        now = time.monotonic()
+        with self._lock:
+            closed = [b for b in self.backends if now >= b.open_until]
+            tripped = [b for b in self.backends if now < b.open_until]
+            closed.sort(key=_Backend.score)
+            # If everything is tripped, still try them, soonest-to-reopen first
+            tripped.sort(key=lambda b: b.open_until)
+        return closed or tripped
+
+    def _record(self, backend, ok, latency=None, trip=False):
+        """Log one call's outcome; `trip` opens the circuit on this failure alone."""
+        with self._lock:
+            backend.outcomes.append(ok)
+            if ok:
+                backend.latencies.append(latency)
+                backend.consecutive_failures = 0
+                backend.open_until = 0.0
+            else:
+                backend.consecutive_failures += 1
+                if trip or backend.consecutive_failures >= self.failure_threshold:
+                    backend.open_until = time.monotonic() + self.cooldown
+
+    # ------------------------------------------------------------
+    def create(self, **params):
+        """Route one chat.completions.create call, failing over on outage errors."""
+        params.pop("model", None)
+        stream = params.get("stream", False)
+        errors = []
+
+        for attempt, backend in enumerate(self._ranked()):
+            client = get_client(backend.provider).with_options(timeout=self.timeout)
+            start = time.perf_counter()
+            try:
+                response = client.chat.completions.create(
+                    model=get_model(backend.provider), **params
+                )
+            except FAILOVER_ERRORS + BACKEND_ERRORS as e:
+                self._record(backend, ok=False, trip=isinstance(e, BACKEND_ERRORS))
+                errors.append(f"{backend.provider}: {type(e).__name__}: {e}")
+                continue
+
+            if stream:
+                # Headers arriving proves little — wait for the first chunk
+                chunks = iter(response)
+                try:
+                    first = next(chunks, None)
+                except STREAM_ERRORS as e:
+                    response.close()
+                    self._record(backend, ok=False)
+                    errors.append(f"{backend.provider}: {type(e).__name__}: {e}")
+                    continue
+            else:
+                self._record(backend, ok=True, latency=time.perf_counter() - start)
+            self.last_provider = backend.provider
+            if attempt:
+                self.failovers += 1
+            if stream:
+                return _RoutedStream(self, backend, response, chunks, first, start)
+            return response
+
+        raise RuntimeError("All providers failed — " + " | ".join(errors))
+
+    def stats(self):
+        """Per-provider health snapshot."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                b.provider: {
+                    "calls": len(b.outcomes),
+                    "avg_latency": b.avg_latency,
+                    "error_rate": b.error_rate,
+                    "circuit": "open" if now < b.open_until else "closed",
+                }
+                for b in self.backends
+            }
+
+
+class _RoutedStream:
+    """A provider's stream that reports success / failure to the router when it ends."""
+
+    def __init__(self, router, backend, response, chunks, first, start):
+        self.provider = backend.provider
+        self._router = router
+        self._backend = backend
+        self._response = response
+        self._start = start
+        self._chunks = self._read(chunks, first)
+
+    def __iter__(self):
+        return self._chunks
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        self._chunks.close()
+        self._response.close()
+
+    def _read(self, chunks, first):
+        ok = False
+        try:
+            if first is not None:
+                yield first
+                yield from chunks
+            ok = True
+        except GeneratorExit:   # the caller stopped reading — not the provider's fault
+            ok = True
+            raise
+        finally:
+            latency = time.perf_counter() - self._start
+            self._router._record(self._backend, ok=ok, latency=latency if ok else None)
@@ -0,0 +1,301 @@
+"""
+================================================================
+mock_llm_server.py
+AN OFFLINE STAND-IN FOR LM STUDIO / OPENROUTER
+================================================================
+
+🎯 GOAL:
+   Run (and time) every script without a model, a GPU or the
+   internet. This is a tiny OpenAI-compatible server built on the
+   standard library. It speaks just enough of the API for the
+   OpenAI SDK to be happy:
+
+     GET  /v1/models              → one model, with its context length
+     POST /v1/chat/completions    → a canned reply (normal or streamed),
+                                    or schema-shaped JSON when the request
+                                    sets response_format (structured_output.py)
+     POST /v1/embeddings          → bag-of-words vectors (similar wording
+                                    → similar vectors), no model needed
+
+   and pretends to be a real model by sleeping like one:
+
+     prompt processing = UNCACHED prompt tokens × --prompt-delay
+     generation        = reply tokens  × --token-delay (± --jitter)
+
+   Like llama.cpp, it remembers the previous prompt: leading
+   messages identical to last time count as cached (reported in
+   usage.prompt_tokens_details.cached_tokens) and cost nothing.
+   Turn that off with --no-prefix-cache.
+
+Run it standalone and point .env at it:
+
+   python mock_llm_server.py --port 1235 --token-delay 0.02
+   # LOCAL_LLM_BASE_URL=http://127.0.0.1:1235/v1
+
+...or start it inside a Python program (the benchmarks do this):
+
+   from mock_llm_server import start_server
+   server = start_server(token_delay=0.005)
+   print(server.base_url)            # http://127.0.0.1:<port>/v1
+   server.shutdown()
+================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prompt_layout import shared_prefix_tokens
+from token_budget import count_tokens
+
+MOCK_MODEL = "mock-model"
+EMBEDDING_DIM = 256
+
+# Words the mock "model" strings together for its replies
+_WORDS = ("the test suite passed with a few flaky cases in login and "
+          "checkout so we should rerun them before the release and "
+          "add a regression test for the plus alias email bug").split()
+
+
+def _embedding(text):
+    """Hashed bag-of-words vector: texts sharing words point the same way."""
+    vector = [0.0] * EMBEDDING_DIM
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        bucket = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=4).digest(), "big")
+        vector[bucket % EMBEDDING_DIM] += 1.0
+    return vector
+
+
+def _sample(schema):
+    """A minimal value matching a JSON schema — the mock's "structured" reply."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: _sample(sub) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_sample(schema.get("items", {}))] if schema.get("minItems") else []
+    if kind in {"integer", "number"}:
+        return schema.get("minimum", 0)
+    if kind == "boolean":
+        return False
+    return " ".join(_WORDS[:3])
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer plus the knobs that shape the fake model's timing."""
+
+    daemon_threads = True
+
+    def __init__(self, address, token_delay=0.0, jitter=0.0, prompt_delay=0.0,
+                 reply_tokens=64, context_length=8192, prefix_cache=True, seed=0):
+        super().__init__(address, _Handler)
+        self.token_delay = token_delay
+        self.jitter = jitter
+        self.prompt_delay = prompt_delay
+        self.reply_tokens = reply_tokens
+        self.context_length = context_length
+        self.prefix_cache = prefix_cache
+        self.last_prompt = []     # what the "KV cache" currently holds
+        self.random = random.Random(seed)
+        self.requests_served = 0
+        self.service_times = []   # seconds spent "thinking" per request
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def token_pause(self):
+        with self._lock:
+            wobble = self.random.uniform(-self.jitter, self.jitter)
+        return max(self.token_delay + wobble, 0.0)
+
+    def cached_tokens(self, messages):
+        """Leading tokens shared with the previous prompt, then remember this one."""
+        with self._lock:
+            cached = (shared_prefix_tokens(self.last_prompt, messages)
+                      if self.prefix_cache else 0)
+            self.last_prompt = list(messages)
+        return cached
+
+    def record(self, seconds):
+        with self._lock:
+            self.requests_served += 1
+            self.service_times.append(seconds)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so pooling can be measured
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def log_message(self, *args):   # keep benchmark output clean
+        pass
+
+    # ------------------------------------------------------------
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    # ------------------------------------------------------------
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json({"object": "list", "data": [{
+                "id": MOCK_MODEL, "object": "model", "owned_by": "mock",
+                "context_length": self.server.context_length,
+            }]})
+        else:
+            self._send_json({"error": {"message": f"no route {self.path}"}}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json({"error": {"message": "invalid JSON"}}, 400)
+            return
+
+        if self.path.rstrip("/") == "/v1/chat/completions":
+            self._chat(request)
+        elif self.path.rstrip("/") == "/v1/embeddings":
+            self._embeddings(request)
+        else:
+            self._send_json({"error": {"message": f"no route {self.path}"}}, 404)
+
+    # ------------------------------------------------------------
+    def _embeddings(self, request):
+        texts = request.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        tokens = sum(len(t.split()) for t in texts)
+        self._send_json({
+            "object": "list", "model": request.get("model") or MOCK_MODEL,
+            "data": [{"object": "embedding", "index": i, "embedding": _embedding(t)}
+                     for i, t in enumerate(texts)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat(self, request):
+        server = self.server
+        start = time.perf_counter()
+        messages = request.get("messages", [])
+        prompt_tokens = count_tokens(messages)
+        cached = min(server.cached_tokens(messages), prompt_tokens)
+        n = min(request.get("max_tokens") or server.reply_tokens, server.reply_tokens)
+        words = [_WORDS[i % len(_WORDS)] for i in range(n)]
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            words = json.dumps(_sample(response_format["json_schema"]["schema"])).split(" ")
+            n = len(words)
+        elif response_format.get("type") == "json_object":
+            words, n = ["{}"], 1
+        model = request.get("model") or MOCK_MODEL
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": n,
+                 "total_tokens": prompt_tokens + n,
+                 "prompt_tokens_details": {"cached_tokens": cached}}
+
+        time.sleep((prompt_tokens - cached) * server.prompt_delay)
+        prompt_done = time.perf_counter()
+
+        if not request.get("stream"):
+            time.sleep(sum(server.token_pause() for _ in range(n)))
+            server.record(time.perf_counter() - start)
+            # llama.cpp's server reports its own timings like this
+            timings = {"prompt_n": prompt_tokens - cached,
+                       "prompt_ms": round((prompt_done - start) * 1000, 3),
+                       "predicted_n": n,
+                       "predicted_ms": round((time.perf_counter() - prompt_done) * 1000, 3)}
+            self._send_json({
+                "id": completion_id, "object": "chat.completion",
+                "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant",
+                                         "content": " ".join(words)}}],
+                "usage": usage,
+                "timings": timings,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(delta, finish=None, extra=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk",
+                     "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            chunk.update(extra or {})
+            self._send_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        event({"role": "assistant", "content": ""})
+        for i, word in enumerate(words):
+            time.sleep(server.token_pause())
+            event({"content": word if i == 0 else " " + word})
+        include_usage = (request.get("stream_options") or {}).get("include_usage")
+        event({}, finish="stop", extra={"usage": usage} if include_usage else None)
+        self._send_chunk("data: [DONE]\n\n")
+        self._send_chunk("")   # zero-length chunk ends the response
+        server.record(time.perf_counter() - start)
+
+
+# ============================================================
+# Start / stop helpers
+# ============================================================
+def start_server(host="127.0.0.1", port=0, **knobs):
+    """Start a MockLLMServer on a background thread (port 0 = any free port)."""
+    server = MockLLMServer((host, port), **knobs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1235)
+    parser.add_argument("--token-delay", type=float, default=0.02,
+                        help="seconds per generated token (default 0.02)")
+    parser.add_argument("--jitter", type=float, default=0.005,
+                        help="± random seconds added to each token (default 0.005)")
+    parser.add_argument("--prompt-delay", type=float, default=0.0002,
+                        help="seconds per prompt token (default 0.0002)")
+    parser.add_argument("--reply-tokens", type=int, default=64,
+                        help="maximum reply length in tokens (default 64)")
+    parser.add_argument("--context-length", type=int, default=8192)
+    parser.add_argument("--no-prefix-cache", action="store_true",
+                        help="process every prompt from scratch")
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        (args.host, args.port),
+        token_delay=args.token_delay, jitter=args.jitter,
+        prompt_delay=args.prompt_delay, reply_tokens=args.reply_tokens,
+        context_length=args.context_length, prefix_cache=not args.no_prefix_cache,
+    )
+    print(f"🧪 Mock LLM server on {server.base_url}  (model id: {MOCK_MODEL})")
+    print("   Set LOCAL_LLM_BASE_URL to that URL. Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,7 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from llm_client import get_client, get_model
 
-load_dotenv()
-
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
-
-model = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+client = get_client("openrouter")
+model = get_model("openrouter")
 
 response = client.chat.completions.create(
     model=model,
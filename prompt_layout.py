@@ -0,0 +1,100 @@
+"""
+================================================================
+prompt_layout.py
+KEEP THE FRONT OF THE PROMPT IDENTICAL — AND MEASURE THE PAYOFF
+================================================================
+
+🎯 GOAL:
+   LM Studio (llama.cpp) and many cloud providers remember the
+   work they did on the LAST prompt. If the next prompt starts with
+   exactly the same bytes, that shared prefix is reused and only
+   the new tail has to be processed. One changed character near
+   the top and the whole prompt is processed from scratch.
+
+   Two rules get you most of the win:
+     1. Stable things first, changing things last.
+        (system prompt → history → per-request instructions)
+     2. Never rewrite earlier messages; only append.
+
+   A sliding "last 6 messages" window breaks rule 2 on every turn:
+   the window's first message changes, so nothing after the system
+   prompt can be reused. PromptAssembler slides its window in
+   STEPS instead — the start stays put for `window` turns, then
+   jumps — so the prefix is reused on most turns while the prompt
+   stays bounded (between `window` and 2 × `window` messages).
+
+       layout = PromptAssembler(system_prompt, window=6)
+       messages = layout.build(history, tail=[skill_msg, user_msg])
+
+   PrefixCacheStats records, per request, how many prompt tokens
+   the server reported as cached (`usage.prompt_tokens_details.
+   cached_tokens`, when the server sends it) and a local estimate
+   of the reusable prefix for servers that don't.
+================================================================
+"""
+
+from token_budget import REPLY_PRIMING, count_tokens
+
+
+class PromptAssembler:
+    """Builds [system] + history window + tail with a prefix that rarely moves."""
+
+    def __init__(self, system_prompt, window=6):
+        self.system = {"role": "system", "content": system_prompt}
+        self.window = window
+
+    def window_start(self, n_messages):
+        """Index of the first history message to send (moves in steps of `window`)."""
+        if n_messages <= self.window:
+            return 0
+        return ((n_messages - self.window) // self.window) * self.window
+
+    def build(self, history, tail=()):
+        """history = turns WITHOUT the system prompt; tail = per-request messages."""
+        return [self.system] + history[self.window_start(len(history)):] + list(tail)
+
+
+def shared_prefix_tokens(previous, current, model=None):
+    """Tokens in the leading messages that are byte-identical between two requests."""
+    same = 0
+    for a, b in zip(previous, current):
+        if a["role"] != b["role"] or a["content"] != b["content"]:
+            break
+        same += 1
+    return count_tokens(current[:same], model) - REPLY_PRIMING if same else 0
+
+
+class PrefixCacheStats:
+    """Per-request record of cached vs. uncached prompt tokens."""
+
+    def __init__(self, model=None):
+        self.model = model
+        self.requests = []        # one dict per request
+        self._previous = []
+
+    def record(self, messages, usage=None):
+        """Call after each request with the messages sent and response.usage."""
+        prompt = getattr(usage, "prompt_tokens", None) or count_tokens(messages, self.model)
+        details = getattr(usage, "prompt_tokens_details", None)
+        reported = getattr(details, "cached_tokens", None)
+        reusable = shared_prefix_tokens(self._previous, messages, self.model)
+
+        entry = {
+            "prompt_tokens": prompt,
+            "cached_tokens": reported if reported is not None else min(reusable, prompt),
+            "source": "server" if reported is not None else "estimate",
+        }
+        entry["uncached_tokens"] = prompt - entry["cached_tokens"]
+        self.requests.append(entry)
+        self._previous = list(messages)
+        return entry
+
+    def summary(self):
+        prompt = sum(r["prompt_tokens"] for r in self.requests)
+        cached = sum(r["cached_tokens"] for r in self.requests)
+        return {
+            "requests": len(self.requests),
+            "prompt_tokens": prompt,
+            "cached_tokens": cached,
+            "cache_ratio": cached / prompt if prompt else 0.0,
+        }
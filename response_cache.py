@@ -0,0 +1,182 @@
+"""
+================================================================
+response_cache.py
+AN ON-DISK CACHE FOR REPEATABLE LLM CALLS
+================================================================
+
+🎯 GOAL:
+   Some calls ask the same question with the same settings every
+   run — a `temperature=0` connection test, a low-temperature
+   triage of the same bug, the same test-run summary in CI. There
+   is no reason to wait seconds for an answer we already have.
+
+       from response_cache import ResponseCache
+
+       cache = ResponseCache()
+       response = cache.create(client, model=model, messages=msgs,
+                               temperature=0, max_tokens=10)
+       print(response.choices[0].message.content)   # same shape as usual
+       print(cache.stats())
+
+How it works:
+  ✅ Key   = SHA-256 of (model, messages, sampling params) as JSON
+  ✅ Store = a small SQLite file (stdlib — nothing to install)
+  ✅ TTL   = entries older than `ttl_hours` count as a miss
+  ✅ LRU   = when the file grows past `max_mb`, the least recently
+             used answers are dropped first
+  ✅ Hit / miss / eviction counters via stats()
+
+Settings (optional, read from .env):
+  LLM_CACHE_PATH       file to store answers in   (.llm_cache.sqlite)
+  LLM_CACHE_MAX_MB     size cap before eviction   (50)
+  LLM_CACHE_TTL_HOURS  how long an answer lives   (168 = one week)
+================================================================
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from dotenv import load_dotenv
+from openai.types.chat import ChatCompletion
+
+load_dotenv()
+
+
+def cache_key(params):
+    """Hash the request parameters into a stable hex key."""
+    blob = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed, size-capped LRU cache of chat completions."""
+
+    def __init__(self, path=None, max_mb=None, ttl_hours=None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+        self.max_bytes = int(float(max_mb or os.getenv("LLM_CACHE_MAX_MB", 50)) * 1024 * 1024)
+        self.ttl = float(ttl_hours or os.getenv("LLM_CACHE_TTL_HOURS", 168)) * 3600
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # One connection shared by every thread, guarded by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key        TEXT PRIMARY KEY,
+                   body       TEXT NOT NULL,
+                   size       INTEGER NOT NULL,
+                   created    REAL NOT NULL,
+                   last_used  REAL NOT NULL
+               )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)"
+        )
+        self._db.commit()
+
+    # ------------------------------------------------------------
+    def get(self, key):
+        """Return the cached ChatCompletion for `key`, or None."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:  # expired — drop it
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+
+            self._db.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self.hits += 1
+        return ChatCompletion.model_validate_json(row[0])
+
+    def put(self, key, response):
+        """Store a ChatCompletion under `key`, evicting old entries if needed."""
+        body = response.model_dump_json()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least-recently-used rows until the total size fits."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # ------------------------------------------------------------
+    def create(self, client, **params):
+        """
+        Drop-in for client.chat.completions.create(**params): return the
+        cached answer if we have one, otherwise call the model and save it.
+        """
+        key = cache_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = client.chat.completions.create(**params)
+        self.put(key, response)
+        return response
+
+    async def acreate(self, aclient, **params):
+        """Async create() for an AsyncOpenAI client."""
+        key = cache_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        response = await aclient.chat.completions.create(**params)
+        self.put(key, response)
+        return response
+
+    # ------------------------------------------------------------
+    def stats(self):
+        """Return counters plus the current entry count and size on disk."""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        """Forget every cached answer."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
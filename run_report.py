@@ -0,0 +1,253 @@
+"""
+================================================================
+run_report.py
+COUNT THE TEST RESULTS IN PYTHON, LET THE MODEL WRITE ABOUT THEM
+================================================================
+
+🎯 GOAL:
+   "Summarize: 28 passed, 5 failed, 2 skipped" — asking the model
+   to add those up and work out a pass rate wastes prompt tokens on
+   raw logs and gets the arithmetic wrong surprisingly often (small
+   local models especially). Counting is Python's job.
+
+   parse_run() reads the common formats and returns exact numbers;
+   run_facts() turns them into a few lines the model can rely on:
+
+       from run_report import parse_run, run_facts
+
+       report = parse_run(open("junit.xml").read())
+       report["passed"], report["pass_rate"]      # → 28, 84.8
+       report["failed_by_module"]                 # → {"login": 2, ...}
+       prompt = run_facts(report)                 # send this, not the XML
+
+Formats (auto-detected, also when pasted inside a longer message):
+  ✅ JUnit XML        — <testsuites>/<testsuite> with <testcase>s
+                        (pytest --junitxml, Maven, Jest, Playwright...)
+  ✅ pytest JSON      — pytest-json-report's {"summary", "tests"}
+  ✅ Free text        — "28 passed, 5 failed (login=2, cart=2), 2 skipped",
+                        pytest's "=== 3 failed, 28 passed in 1.2s ===",
+                        "FAILED tests/test_x.py::test_y - reason" lines,
+                        and "Failures:" lists of "- name (module) reason"
+
+Pass rate = passed ÷ tests that ran (passed + failed + errors), as
+a percentage — skipped tests don't count either way.
+================================================================
+"""
+
+import json
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+# ============================================================
+# Free text
+# ============================================================
+_COUNT = re.compile(
+    r"(\d+)[ \t]+(passed|failed|failures?|skipped|errors?|xfailed|xpassed)\b"
+    r"(?:\s*\(([^)]*)\))?",
+    re.IGNORECASE,
+)
+_MODULE_COUNT = re.compile(r"([\w./-]+)\s*[=:]\s*(\d+)")
+_TOTAL = re.compile(r"\b(\d+)\s+total\b|\btotal\s*[:=]?\s*(\d+)", re.IGNORECASE)
+_PYTEST_LINE = re.compile(r"^(FAILED|ERROR)\s+(\S+?)(?:::(\S+))?(?:\s+-\s+(.*))?$")
+_SECTION = re.compile(r"^(failures|failed|errors|skipped)\s*(?:tests)?\s*:?\s*$", re.IGNORECASE)
+_LIST_ITEM = re.compile(r"^[-*•]\s*(\S+)(?:\s+\(([^)]*)\))?\s*(.*)$")
+
+_KIND = {
+    "passed": "passed", "failed": "failed", "failure": "failed", "failures": "failed",
+    "skipped": "skipped", "error": "errors", "errors": "errors",
+    "xfailed": "skipped", "xpassed": "passed",
+}
+
+
+def _empty(source):
+    return {
+        "source": source,
+        "passed": 0, "failed": 0, "skipped": 0, "errors": 0,
+        "failures": [],           # [{"name", "module", "reason"}] for failed AND errored tests
+        "skipped_tests": [],      # [{"name", "module", "reason"}]
+        "failed_by_module": {},   # module → failed + errored tests
+        "warnings": [],
+    }
+
+
+def _parse_text(text):
+    report = _empty("text")
+    by_module = Counter()
+    seen = set()
+    for number, word, detail in _COUNT.findall(text):
+        # First mention of each word only: "28 passed, 5 failed … the 5
+        # failed tests were all on iOS" is 5 failures, not 10
+        word = word.lower()
+        kind = _KIND[word]
+        # "failed", "failure" and "failures" are one count; pytest's
+        # xfailed / xpassed are counts of their own, next to skipped / passed
+        key = word if word.startswith("x") else kind
+        if key in seen:
+            continue
+        seen.add(key)
+        report[kind] += int(number)
+        if kind == "failed" and detail:
+            by_module.update({m: int(n) for m, n in _MODULE_COUNT.findall(detail)})
+
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            section = None
+            continue
+        pytest_line = _PYTEST_LINE.match(line)
+        header = _SECTION.match(line)
+        item = _LIST_ITEM.match(line)
+        if pytest_line:
+            _, path, name, reason = pytest_line.groups()
+            report["failures"].append({"name": name or path, "module": path,
+                                       "reason": (reason or "").strip()})
+        elif header:
+            section = "skipped_tests" if header.group(1).lower() == "skipped" else "failures"
+        elif section and item:
+            name, module, reason = item.groups()
+            if module and " " in module:   # "(no test data)" is a reason, not a module
+                module, reason = "", f"{module} {reason}"
+            report[section].append({"name": name, "module": module or "",
+                                    "reason": reason.strip()})
+
+    # Lists without counts ("Failures:\n- a\n- b") still count
+    counted = bool(seen)
+    if not counted:
+        report["failed"] = len(report["failures"])
+        report["skipped"] = len(report["skipped_tests"])
+
+    if not by_module:
+        by_module = Counter(f["module"] for f in report["failures"] if f["module"])
+    report["failed_by_module"] = dict(by_module.most_common())
+
+    total = _TOTAL.search(text)
+    if total:
+        stated = int(total.group(1) or total.group(2))
+        counted_total = report["passed"] + report["failed"] + report["skipped"] + report["errors"]
+        if counted and stated != counted_total:
+            report["warnings"].append(f"report says {stated} total, counts add up to "
+                                      f"{counted_total}")
+    return report
+
+
+# ============================================================
+# JUnit XML
+# ============================================================
+def _parse_junit(xml_text):
+    report = _empty("junit")
+    root = ET.fromstring(xml_text)
+    by_module = Counter()
+    for case in root.iter("testcase"):
+        module = case.get("classname") or case.get("file") or ""
+        name = case.get("name", "?")
+        problem = next((child for child in case if child.tag in ("failure", "error")), None)
+        skipped = case.find("skipped")
+        if problem is not None:
+            report["failed" if problem.tag == "failure" else "errors"] += 1
+            reason = problem.get("message") or (problem.text or "").strip().split("\n")[0]
+            report["failures"].append({"name": name, "module": module, "reason": reason})
+            by_module[module] += 1
+        elif skipped is not None:
+            report["skipped"] += 1
+            report["skipped_tests"].append({"name": name, "module": module,
+                                            "reason": skipped.get("message", "")})
+        else:
+            report["passed"] += 1
+    report["failed_by_module"] = dict(by_module.most_common())
+    return report
+
+
+# ============================================================
+# pytest-json-report
+# ============================================================
+def _parse_pytest_json(data):
+    report = _empty("pytest-json")
+    tests = data.get("tests")
+    if tests is None:   # --json-report-summary: counts only
+        summary = data.get("summary", {})
+        for kind, target in _KIND.items():
+            report[target] += summary.get(kind, 0)
+        return report
+
+    by_module = Counter()
+    for test in tests:
+        path, _, name = test.get("nodeid", "?").partition("::")
+        outcome = test.get("outcome", "")
+        kind = _KIND.get(outcome)
+        if kind is None:
+            continue
+        report[kind] += 1
+        stage = next((test[s] for s in ("setup", "call", "teardown")
+                      if isinstance(test.get(s), dict)
+                      and test[s].get("outcome") == outcome), {})
+        reason = (stage.get("crash") or {}).get("message") \
+            or str(stage.get("longrepr", "")).strip().split("\n")[-1]
+        entry = {"name": name or path, "module": path, "reason": reason}
+        if kind in ("failed", "errors"):
+            report["failures"].append(entry)
+            by_module[path] += 1
+        elif kind == "skipped":
+            report["skipped_tests"].append(entry)
+    report["failed_by_module"] = dict(by_module.most_common())
+    return report
+
+
+# ============================================================
+# Public API
+# ============================================================
+def parse_run(text):
+    """Parse a test-run report in any supported format (see the module docstring)."""
+    report = None
+    xml_start = re.search(r"<(?:\?xml|testsuites?\b)", text)
+    if xml_start:
+        try:
+            report = _parse_junit(text[xml_start.start():text.rfind(">") + 1])
+        except ET.ParseError:
+            report = None   # "in <testsuite> form please" is chat, not XML
+    else:
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end > start:
+            try:
+                data = json.loads(text[start:end + 1])
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and (isinstance(data.get("summary"), dict)
+                                           or isinstance(data.get("tests"), list)):
+                try:
+                    report = _parse_pytest_json(data)
+                except (ValueError, TypeError, AttributeError):
+                    report = None   # JSON-ish, but not pytest-json-report's shape
+    if report is None:
+        report = _parse_text(text)
+
+    ran = report["passed"] + report["failed"] + report["errors"]
+    report["total"] = ran + report["skipped"]
+    report["pass_rate"] = round(100 * report["passed"] / ran, 1) if ran else 0.0
+    return report
+
+
+def run_facts(report, max_items=10):
+    """The parsed numbers as short plain text for a prompt — exact, so the model needn't count."""
+    lines = [
+        f"Test run ({report['source']}), counted exactly:",
+        f"- Totals: {report['passed']} passed, {report['failed']} failed, "
+        f"{report['errors']} errors, {report['skipped']} skipped ({report['total']} total)",
+        f"- Pass rate: {report['pass_rate']}% of the tests that ran",
+    ]
+    if report["failed_by_module"]:
+        lines.append("- Failures by module: " + ", ".join(
+            f"{module} {n}" for module, n in report["failed_by_module"].items()))
+    for title, items in (("Failed", report["failures"]), ("Skipped", report["skipped_tests"])):
+        if items:
+            lines.append(f"- {title}:")
+            for item in items[:max_items]:
+                where = f" ({item['module']})" if item["module"] else ""
+                why = f" — {item['reason']}" if item["reason"] else ""
+                lines.append(f"  - {item['name']}{where}{why}")
+            if len(items) > max_items:
+                lines.append(f"  - … and {len(items) - max_items} more")
+    for warning in report["warnings"]:
+        lines.append(f"- Note: {warning}")
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""
+================================================================
+skill_router.py
+ONE-PASS KEYWORD ROUTING WITH SCORES, NOT FIRST-MATCH-WINS
+================================================================
+
+🎯 GOAL:
+   The obvious skill detector is a chain of
+
+       if any(kw in msg for kw in [...]):   return "test_plan"
+       elif any(kw in msg for kw in [...]): return "triage"
+
+   It rescans the message once per keyword, so it gets slower with
+   every keyword and skill you add, and the FIRST skill to match
+   wins, even when another skill matches far better. "Summarize the
+   run: login test failed with a crash" goes to triage ("crash")
+   although it's clearly a summary.
+
+   SkillRouter compiles every keyword of every skill into ONE regex,
+   finds all of them in a single pass over the message, and scores
+   each skill:
+
+       from skill_router import SkillRouter
+
+       router = SkillRouter({
+           "triage":  {"bug:": 3, "crash": 1, "triage": 3},
+           "summary": {"summarize": 3, "passed": 1, "failed": 1},
+       })
+       router.route("Summarize: 12 passed, 1 failed (crash on login)")
+       # → ("summary", 0.83)
+
+How it scores:
+  ✅ Each skill scores the sum of the weights of its DISTINCT
+     keywords found (a keyword repeated 5 times still counts once).
+  ✅ Best score wins. Ties go to the skill with more distinct
+     keywords, then to the skill listed first.
+  ✅ Confidence = winner's score ÷ all skills' scores — 1.0 when
+     only one skill matched, 0.5 for a dead heat between two.
+  ✅ Below `min_score` → (None, 0.0): leave it to general chat.
+
+Why it stays fast: the keywords are merged into a prefix tree
+before compiling ("test plan" / "test run" / "test cases for"
+share one "test " branch), so at each position of the message the
+regex engine follows one path instead of trying every keyword.
+Matching is case-insensitive, on whole words, and any run of
+whitespace matches a space in a keyword.
+
+Measured with benchmarks/bench_skill_router.py.
+================================================================
+"""
+
+import re
+from collections import defaultdict
+
+
+def _word(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(node, last=""):
+    """Regex for a prefix tree {char: subtree, "": end-of-keyword}."""
+    alternatives = [(r"\s+" if ch == " " else re.escape(ch)) + _trie_pattern(sub, ch)
+                    for ch, sub in sorted(node.items()) if ch]
+    if "" in node:
+        # A keyword ends here: it must end a word too (unless it ends in
+        # punctuation, like "bug:"). Listed last, so longer keywords win.
+        alternatives.append(r"(?!\w)" if _word(last) else "")
+    if len(alternatives) <= 1:
+        return "".join(alternatives)
+    if alternatives[-1] == "":
+        return "(?:" + "|".join(alternatives[:-1]) + ")?"
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def compile_keywords(keywords):
+    """
+    One regex matching any of `keywords` as whole words. Keywords and
+    the text it's used on should both be lowercase — a case-sensitive
+    pattern is several times faster than re.IGNORECASE.
+    """
+    tries = ({}, {})   # keywords starting with a word character / with punctuation
+    for keyword in keywords:
+        node = tries[not _word(keyword[0])]
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    words, other = (_trie_pattern(trie) for trie in tries)
+    # One leading \b for the whole tree, so the regex engine can skip
+    # ahead to the next word instead of testing a boundary per keyword
+    pattern = r"\b(?:" + words + ")" if words else ""
+    if other:
+        pattern = f"{pattern}|{other}" if pattern else other
+    return re.compile(pattern)
+
+
+class SkillRouter:
+    """Scores every skill in one pass over the message; see the module docstring."""
+
+    def __init__(self, skills, min_score=1):
+        """
+        skills: {skill: {keyword: weight}}, most important skill first
+                (the order breaks ties). The same keyword may appear
+                under several skills.
+        """
+        self.skills = list(skills)
+        self._rank = {skill: i for i, skill in enumerate(self.skills)}
+        self.min_score = min_score
+        self._keywords = defaultdict(list)   # normalised keyword → [(skill, weight)]
+        for skill, keywords in skills.items():
+            for keyword, weight in keywords.items():
+                self._keywords[self._normalise(keyword)].append((skill, weight))
+        self._pattern = compile_keywords(self._keywords)
+
+    @staticmethod
+    def _normalise(text):
+        return " ".join(text.lower().split())
+
+    def matches(self, message):
+        """Distinct keywords found in `message`, in order of first appearance."""
+        found = {}
+        for match in self._pattern.finditer(message.lower()):
+            found.setdefault(self._normalise(match.group(0)), None)
+        return list(found)
+
+    def scores(self, message):
+        """{skill: (score, distinct keywords)} for every skill that matched."""
+        scores = {}
+        for keyword in self.matches(message):
+            for skill, weight in self._keywords[keyword]:
+                score, hits = scores.get(skill, (0, 0))
+                scores[skill] = (score + weight, hits + 1)
+        return scores
+
+    def route(self, message):
+        """(best skill, confidence 0-1), or (None, 0.0) if nothing scores min_score."""
+        scores = self.scores(message)
+        if not scores:
+            return None, 0.0
+        best = min(scores, key=lambda s: (-scores[s][0], -scores[s][1], self._rank[s]))
+        score = scores[best][0]
+        if score < self.min_score:
+            return None, 0.0
+        total = sum(s for s, _ in scores.values())
+        return best, round(score / total, 2)
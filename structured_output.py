@@ -0,0 +1,285 @@
+"""
+================================================================
+structured_output.py
+TYPED JSON REPLIES INSTEAD OF MARKDOWN TO SCRAPE
+================================================================
+
+🎯 GOAL:
+   The triage and QA prompts ask for markdown sections and tables.
+   That reads nicely, but any code that wants "what severity did it
+   pick?" has to regex-scrape the reply and retry when the model
+   phrases it differently.
+
+   Instead, ask for JSON that matches a JSON schema and get back a
+   plain dict with typed fields:
+
+       from structured_output import TRIAGE_SCHEMA, create_structured
+
+       record, response = create_structured(
+           client, TRIAGE_SCHEMA, model=model, messages=messages)
+       record["severity"]          # → "High"
+       record["duplicate_of"]      # → ["BUG-3"]
+
+How it gets valid JSON:
+  1. Ask the server to enforce the schema (response_format
+     "json_schema" — LM Studio and many OpenRouter models support
+     it). Servers that refuse it (a 400 about response_format —
+     any other 400, like a prompt that's too long, is raised) get
+     plain JSON mode, then just the instructions in the prompt.
+     What worked is remembered per server, so the fallback is only
+     paid once.
+  2. Check the reply locally against the schema (validate()).
+  3. If it's broken, send the errors back ONCE and ask for a fix.
+     Still broken → StructuredOutputError. With a ResponseCache,
+     only replies that passed the check are cached.
+
+   Put schema_instruction(schema) in your prompt too — small models
+   follow the shape far better when they can see it.
+================================================================
+"""
+
+import json
+
+import openai
+
+from response_cache import cache_key
+
+# ============================================================
+# Schemas
+# ============================================================
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+LIKELIHOODS = ["Low", "Medium", "High"]
+
+TRIAGE_SCHEMA = {
+    "title": "bug_triage",
+    "type": "object",
+    "properties": {
+        "severity": {"type": "string", "enum": SEVERITIES},
+        "severity_reason": {"type": "string"},
+        "owner_area": {"type": "string", "minLength": 1},
+        "duplicate_likelihood": {"type": "string", "enum": LIKELIHOODS},
+        "duplicate_of": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+        "clarifying_questions": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+        "next_step": {"type": "string",
+                      "enum": ["assign", "merge", "request-info", "hotfix", "schedule"]},
+    },
+    "required": ["severity", "severity_reason", "owner_area", "duplicate_likelihood",
+                 "duplicate_of", "clarifying_questions", "next_step"],
+    "additionalProperties": False,
+}
+
+
+class StructuredOutputError(ValueError):
+    """The model's reply still didn't match the schema after the repair retry."""
+
+
+# ============================================================
+# Local validation (the subset of JSON Schema our schemas use)
+# ============================================================
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+
+def validate(value, schema, path="$"):
+    """Return a list of problems with `value` (empty list = valid)."""
+    expected = schema.get("type")
+    if expected:
+        # bool is a subclass of int in Python, but not in JSON
+        if not isinstance(value, _TYPES[expected]) or \
+                (isinstance(value, bool) and expected != "boolean"):
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if expected == "string" and len(value) < schema.get("minLength", 0):
+        errors.append(f"{path}: must not be empty")
+    if expected in {"integer", "number"}:
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: must be >= {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: must be <= {schema['maximum']}")
+
+    if expected == "array":
+        if len(value) > schema.get("maxItems", len(value)):
+            errors.append(f"{path}: at most {schema['maxItems']} items")
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema.get("items", {}), f"{path}[{i}]"))
+
+    if expected == "object":
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, item in value.items():
+            if key in properties:
+                errors.extend(validate(item, properties[key], f"{path}.{key}"))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{path}: unexpected key '{key}'")
+    return errors
+
+
+def parse_json(text):
+    """Pull the JSON object out of a reply (tolerates ```json fences and chatter)."""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in the reply")
+    return json.loads(text[start:end + 1])
+
+
+def schema_instruction(schema):
+    """Prompt text telling the model to answer with JSON of this shape."""
+    return ("Reply with ONLY a JSON object — no markdown, no prose — matching "
+            f"this JSON schema:\n{json.dumps(schema, separators=(',', ':'))}")
+
+
+# ============================================================
+# Calling the model
+# ============================================================
+def _response_formats(schema):
+    """Strongest first: schema-enforced, plain JSON mode, prompt only."""
+    return [
+        {"type": "json_schema",
+         "json_schema": {"name": schema.get("title", "reply"), "strict": True,
+                         "schema": schema}},
+        {"type": "json_object"},
+        None,
+    ]
+
+
+_supported = {}   # server base URL → index into _response_formats() that worked
+
+
+def _server(client):
+    return str(getattr(client, "base_url", type(client).__name__))
+
+
+_FORMAT_ERRORS = (openai.BadRequestError, openai.UnprocessableEntityError)
+
+
+def _rejects_format(error):
+    """Is this 400/422 about response_format — not, say, a prompt that's too long?"""
+    text = str(error).lower()
+    return any(word in text for word in ("response_format", "json_schema", "json_object",
+                                         "grammar"))
+
+
+def _attempts(client, schema, params):
+    """(format index, request) pairs to try, strongest format this server took first."""
+    formats = _response_formats(schema)
+    for i in range(_supported.get(_server(client), 0), len(formats)):
+        attempt = dict(params)
+        if formats[i]:
+            attempt["response_format"] = formats[i]
+        yield i, attempt
+
+
+def _cached(cache, attempt):
+    """(cached response or None, cache key) — only VALID replies are ever stored."""
+    if not cache:
+        return None, None
+    key = cache_key(attempt)
+    return cache.get(key), key
+
+
+def _step_down(error, attempt):
+    """Re-raise `error` unless it was this request's response_format the server refused."""
+    if "response_format" not in attempt or not _rejects_format(error):
+        raise error
+
+
+def _request(client, schema, cache, params):
+    """(response, cache key) — a cached reply, or one call stepping down formats."""
+    for i, attempt in _attempts(client, schema, params):
+        cached, key = _cached(cache, attempt)
+        if cached is not None:
+            return cached, None
+        try:
+            response = client.chat.completions.create(**attempt)
+        except _FORMAT_ERRORS as e:
+            _step_down(e, attempt)
+            continue   # this server doesn't do that format — try the next one
+        _supported[_server(client)] = i
+        return response, key
+
+
+async def _arequest(aclient, schema, cache, params):
+    """Async _request()."""
+    for i, attempt in _attempts(aclient, schema, params):
+        cached, key = _cached(cache, attempt)
+        if cached is not None:
+            return cached, None
+        try:
+            response = await aclient.chat.completions.create(**attempt)
+        except _FORMAT_ERRORS as e:
+            _step_down(e, attempt)
+            continue
+        _supported[_server(aclient)] = i
+        return response, key
+
+
+def _check(response, schema):
+    """(record, None) if the reply is valid, else (None, problems)."""
+    reply = response.choices[0].message.content or ""
+    try:
+        record = parse_json(reply)
+    except ValueError as e:
+        return None, [f"not valid JSON ({e})"]
+    errors = validate(record, schema)
+    return (None, errors) if errors else (record, None)
+
+
+def _repair(params, response, errors):
+    """The same request plus the bad reply and a list of what to fix."""
+    repair = dict(params)
+    repair["messages"] = list(params["messages"]) + [
+        {"role": "assistant", "content": response.choices[0].message.content or ""},
+        {"role": "user", "content": "That reply doesn't match the schema:\n- "
+                                    + "\n- ".join(errors)
+                                    + "\nReply again with ONLY the corrected JSON object."},
+    ]
+    return repair
+
+
+def _store(cache, key, response):
+    """Cache a reply once it has passed validation (key is None for cache hits)."""
+    if cache and key is not None:
+        cache.put(key, response)
+
+
+def create_structured(client, schema, cache=None, **params):
+    """
+    chat.completions.create() that returns (record, response), where
+    `record` is a dict guaranteed to match `schema`. Pass a
+    ResponseCache as `cache` to cache the calls — only replies that
+    pass validation are cached, so a bad one is never replayed.
+    """
+    response, key = _request(client, schema, cache, params)
+    record, errors = _check(response, schema)
+    if record is None:
+        # One repair round-trip: show the model its reply and what's wrong
+        response, key = _request(client, schema, cache, _repair(params, response, errors))
+        record, errors = _check(response, schema)
+        if record is None:
+            raise StructuredOutputError("; ".join(errors))
+    _store(cache, key, response)
+    return record, response
+
+
+async def acreate_structured(aclient, schema, cache=None, **params):
+    """Async create_structured() for an AsyncOpenAI client."""
+    response, key = await _arequest(aclient, schema, cache, params)
+    record, errors = _check(response, schema)
+    if record is None:
+        response, key = await _arequest(aclient, schema, cache, _repair(params, response, errors))
+        record, errors = _check(response, schema)
+        if record is None:
+            raise StructuredOutputError("; ".join(errors))
+    _store(cache, key, response)
+    return record, response
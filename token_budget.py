@@ -0,0 +1,225 @@
+"""
+================================================================
+token_budget.py
+COUNT TOKENS LOCALLY — AND CHECK THE CONTEXT WINDOW BEFORE SENDING
+================================================================
+
+🎯 GOAL:
+   Video 6 printed `response.usage` — but that only arrives AFTER
+   the call. If the prompt is too big for the model's context
+   window, we've already waited for the server to truncate it or
+   reject it.
+
+   This module answers "how big is this prompt?" on your laptop,
+   in microseconds, and checks it against the model's context
+   length before anything is sent:
+
+       from token_budget import ContextPlanner, count_tokens
+
+       count_tokens(messages, model)          # → 812
+
+       planner = ContextPlanner(client, model)
+       messages, max_tokens = planner.fit(messages, max_tokens=800)
+
+How it counts:
+  ✅ If `tiktoken` is installed and the model is an OpenAI one,
+     use the real tokenizer.
+  ✅ Otherwise estimate per model FAMILY (Llama, Qwen, Mistral,
+     Phi, Gemma, ...). Each family's tokenizer packs a slightly
+     different number of characters into a token.
+
+Where the context length comes from (first hit wins):
+  1. LLM_CONTEXT_LENGTH in .env
+  2. The server's model list (/v1/models — OpenRouter reports it)
+  3. LM Studio's own REST API (/api/v0/models)
+  4. A safe default of 4096
+================================================================
+"""
+
+import math
+import os
+import re
+
+import httpx
+from dotenv import load_dotenv
+
+try:
+    import tiktoken  # optional — exact counts for OpenAI models
+except ImportError:
+    tiktoken = None
+
+load_dotenv()
+
+
+# ============================================================
+# Counting
+# ============================================================
+# Average characters per token for each tokenizer family, measured
+# on English prose. Unknown models use a conservative (low) value
+# so we over-estimate rather than overflow.
+CHARS_PER_TOKEN = {
+    "llama": 3.8,
+    "qwen": 3.6,
+    "mistral": 3.7,
+    "phi": 3.8,
+    "gemma": 4.0,
+    "gpt": 4.0,
+    "default": 3.4,
+}
+MESSAGE_OVERHEAD = 4   # role + separators the chat template adds per message
+REPLY_PRIMING = 3      # tokens that start the assistant's turn
+
+# Words and single punctuation marks — punctuation is nearly always
+# its own token, long words get split into several.
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def model_family(model):
+    """Map a model id like 'lmstudio-community/Qwen2.5-3B' to 'qwen'."""
+    name = (model or "").lower()
+    for family in CHARS_PER_TOKEN:
+        if family in name:
+            return family
+    if name.startswith("openai/") or name.startswith("o1") or name.startswith("o3"):
+        return "gpt"
+    return "default"
+
+
+def _tiktoken_encoder(model):
+    if tiktoken is None or model_family(model) != "gpt":
+        return None
+    try:
+        return tiktoken.encoding_for_model(model.split("/")[-1])
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_text_tokens(text, model=None):
+    """Estimate the token count of one string."""
+    if not text:
+        return 0
+    encoder = _tiktoken_encoder(model)
+    if encoder is not None:
+        return len(encoder.encode(text))
+
+    ratio = CHARS_PER_TOKEN[model_family(model)]
+    return sum(
+        math.ceil(len(piece) / ratio) if piece[0].isalnum() or piece[0] == "_" else 1
+        for piece in _PIECES.findall(text)
+    )
+
+
+def count_tokens(messages, model=None):
+    """Estimate the prompt tokens for a whole chat message list."""
+    return REPLY_PRIMING + sum(
+        MESSAGE_OVERHEAD + count_text_tokens(m.get("content") or "", model)
+        for m in messages
+    )
+
+
+# ============================================================
+# Planning
+# ============================================================
+class ContextOverflowError(ValueError):
+    """The request can't fit in the model's context window."""
+
+
+DEFAULT_CONTEXT_LENGTH = 4096
+
+
+class ContextPlanner:
+    """Checks (and if allowed, trims) a request against the context window."""
+
+    def __init__(self, client, model, context_length=None, min_reply_tokens=128):
+        self.client = client
+        self.model = model
+        self.min_reply_tokens = min_reply_tokens
+        self._context_length = context_length or _env_context_length()
+
+    # ------------------------------------------------------------
+    @property
+    def context_length(self):
+        """The model's context window in tokens (looked up once, then cached)."""
+        if self._context_length is None:
+            self._context_length = (self._from_models_list()
+                                    or self._from_lmstudio()
+                                    or DEFAULT_CONTEXT_LENGTH)
+        return self._context_length
+
+    def _from_models_list(self):
+        try:
+            for item in self.client.models.list():
+                if item.id == self.model:
+                    extra = item.model_extra or {}
+                    for key in ("context_length", "max_context_length",
+                                "loaded_context_length"):
+                        if extra.get(key):
+                            return int(extra[key])
+        except Exception:
+            pass
+        return None
+
+    def _from_lmstudio(self):
+        # LM Studio's REST API lives next to /v1 at /api/v0
+        try:
+            root = str(self.client.base_url).rstrip("/").removesuffix("/v1")
+            r = httpx.get(f"{root}/api/v0/models/{self.model}", timeout=2)
+            r.raise_for_status()
+            info = r.json()
+            return int(info.get("loaded_context_length")
+                       or info.get("max_context_length") or 0) or None
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------
+    def plan(self, messages, max_tokens):
+        """Describe how a request fits, without changing it."""
+        prompt = count_tokens(messages, self.model)
+        return {
+            "prompt_tokens": prompt,
+            "max_tokens": max_tokens,
+            "context_length": self.context_length,
+            "fits": prompt + max_tokens <= self.context_length,
+        }
+
+    def fit(self, messages, max_tokens, trim=True):
+        """
+        Return (messages, max_tokens) that fit the context window.
+
+        1. If the prompt + reply fit, nothing changes.
+        2. Otherwise shrink the reply budget, down to min_reply_tokens.
+        3. Still too big and trim=True: drop the OLDEST non-system
+           messages (the latest message is always kept).
+        4. Still too big (or trim=False): raise ContextOverflowError
+           — without sending anything.
+        """
+        limit = self.context_length
+        prompt = count_tokens(messages, self.model)
+        if prompt + max_tokens <= limit:
+            return messages, max_tokens
+
+        room = limit - prompt
+        if room >= self.min_reply_tokens:
+            return messages, room
+
+        if trim:
+            messages = list(messages)
+            while prompt + self.min_reply_tokens > limit:
+                droppable = [i for i, m in enumerate(messages[:-1])
+                             if m["role"] != "system"]
+                if not droppable:
+                    break
+                messages.pop(droppable[0])
+                prompt = count_tokens(messages, self.model)
+
+        if prompt + self.min_reply_tokens > limit:
+            raise ContextOverflowError(
+                f"Prompt is ~{prompt} tokens; {self.model} has a "
+                f"{limit}-token context window."
+            )
+        return messages, min(max_tokens, limit - prompt)
+
+
+def _env_context_length():
+    value = os.getenv("LLM_CONTEXT_LENGTH")
+    return int(value) if value and value.isdigit() else None
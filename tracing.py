@@ -0,0 +1,245 @@
+"""
+================================================================
+tracing.py
+WHERE DID THAT TURN'S TIME GO? — SPANS, OFF BY DEFAULT
+================================================================
+
+🎯 GOAL:
+   A slow turn could be our code (skill detection, building the
+   prompt, compacting memory), the network, the server reading the
+   prompt, or the server generating the reply. Timing the whole
+   call can't tell those apart.
+
+   Wrap each phase in a span. Spans nest, carry token counts and
+   export to Chrome's trace viewer or a flat CSV:
+
+       from tracing import span, tracer
+
+       with span("qa.chat", skill="triage"):
+           with span("qa.detect_skill"):
+               ...
+           with span("llm.request") as s:
+               response = client.chat.completions.create(...)
+               s.usage(response)        # prompt/completion/cached tokens
+
+       tracer.export_chrome("trace.json")   # open in chrome://tracing
+                                            # or https://ui.perfetto.dev
+       tracer.export_csv("trace.csv")
+
+   s.usage(response) also picks up llama.cpp's server-side
+   `timings` (prompt_ms / predicted_ms) when the server sends them.
+   That splits the request into "server.prompt" and "server.generate",
+   and whatever is left over is network and client overhead.
+
+Off by default, and then nearly free: span() returns one shared
+do-nothing object, so an instrumented call costs a function call
+and an `if`. Turn it on with LLM_TRACE=1 in .env (the trace is
+written to LLM_TRACE_PATH when the program exits; a .csv path
+writes CSV), or from code with tracer.enable().
+================================================================
+"""
+
+import atexit
+import contextvars
+import csv
+import json
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_current = contextvars.ContextVar("current_span", default=None)   # works across asyncio tasks
+
+
+class _NoSpan:
+    """What span() returns while tracing is off: every method does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def usage(self, response):
+        pass
+
+    def phase(self, name, offset, duration, **attrs):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    """One timed phase. Use as a context manager (see span())."""
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.depth = 0
+        self.start = self.end = 0.0
+        self._server = (0.0, 0.0)   # llama.cpp (prompt, generation) seconds, if reported
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.depth = self.parent.depth + 1 if self.parent else 0
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._server_phases()
+        self.tracer._record(self.name, self.start, self.end, self.depth,
+                            self.parent.name if self.parent else "", self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attach values (token counts, sizes, choices) to this span."""
+        self.attrs.update(attrs)
+
+    def phase(self, name, offset, duration, **attrs):
+        """Record an already-measured child phase starting `offset` seconds into this span."""
+        start = self.start + offset
+        self.tracer._record(name, start, start + duration, self.depth + 1, self.name, attrs)
+
+    def usage(self, response):
+        """Token counts (and llama.cpp server timings, if sent) from a chat response."""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            self.attrs.update(
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
+                cached_tokens=getattr(details, "cached_tokens", None),
+            )
+        timings = (getattr(response, "model_extra", None) or {}).get("timings")
+        if timings:
+            # The server's own clock: prompt processing, then generation,
+            # ending just before the response reached us
+            prompt = timings.get("prompt_ms", 0) / 1000
+            generate = timings.get("predicted_ms", 0) / 1000
+            self.attrs.update(server_prompt_ms=round(prompt * 1000, 2),
+                              server_generate_ms=round(generate * 1000, 2))
+            self._server = (prompt, generate)
+
+    def _server_phases(self):
+        prompt, generate = self._server
+        if prompt or generate:
+            offset = max(self.end - self.start - prompt - generate, 0)
+            self.phase("server.prompt", offset, prompt)
+            self.phase("server.generate", offset + prompt, generate)
+
+
+class Tracer:
+    """Collects finished spans; exports Chrome trace-event JSON or CSV."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = []          # one dict per finished span, in finishing order
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NO_SPAN
+        return Span(self, name, attrs)
+
+    def _record(self, name, start, end, depth, parent, attrs):
+        entry = {
+            "name": name,
+            "start_ms": round((start - self._origin) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            "depth": depth,
+            "parent": parent,
+            "thread": threading.get_ident(),
+            **attrs,
+        }
+        with self._lock:
+            self.spans.append(entry)
+
+    # ------------------------------------------------------------
+    def summary(self):
+        """{span name: {"count", "total_ms", "mean_ms", "max_ms"}}, slowest total first."""
+        totals = {}
+        for s in self.spans:
+            t = totals.setdefault(s["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            t["count"] += 1
+            t["total_ms"] += s["duration_ms"]
+            t["max_ms"] = max(t["max_ms"], s["duration_ms"])
+        for t in totals.values():
+            t["total_ms"] = round(t["total_ms"], 3)
+            t["mean_ms"] = round(t["total_ms"] / t["count"], 3)
+        return dict(sorted(totals.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+    def export_chrome(self, path):
+        """Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev)."""
+        fixed = {"name", "start_ms", "duration_ms", "depth", "parent", "thread"}
+        events = [{
+            "name": s["name"],
+            "cat": s["name"].split(".")[0],
+            "ph": "X",                                # a complete event: start + duration
+            "ts": round(s["start_ms"] * 1000, 1),     # microseconds
+            "dur": round(s["duration_ms"] * 1000, 1),
+            "pid": os.getpid(),
+            "tid": s["thread"],
+            "args": {k: v for k, v in s.items() if k not in fixed},
+        } for s in self.spans]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path):
+        """One row per span, one column per attribute seen on any span."""
+        columns = ["name", "start_ms", "duration_ms", "depth", "parent", "thread"]
+        for s in self.spans:
+            columns.extend(k for k in s if k not in columns)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(sorted(self.spans, key=lambda s: s["start_ms"]))
+
+    def export(self, path):
+        """export_csv() for a .csv path, otherwise export_chrome()."""
+        if str(path).lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_chrome(path)
+
+
+tracer = Tracer(enabled=os.getenv("LLM_TRACE", "0") == "1")
+
+
+def span(name, **attrs):
+    """tracer.span(): a timed phase, or a shared no-op while tracing is off."""
+    return tracer.span(name, **attrs) if tracer.enabled else _NO_SPAN
+
+
+def _export_at_exit():
+    if tracer.spans:
+        path = os.getenv("LLM_TRACE_PATH", "llm_trace.json")
+        tracer.export(path)
+        print(f"🧭 Trace: {len(tracer.spans)} span(s) written to {path}")
+
+
+atexit.register(_export_at_exit)
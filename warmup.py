@@ -0,0 +1,89 @@
+"""
+================================================================
+warmup.py
+WARM THE MODEL UP WHILE THE USER IS STILL READING THE MENU
+================================================================
+
+🎯 GOAL:
+   LM Studio loads (and sometimes compiles) a model on its FIRST
+   request, so the first answer of every session is the slowest.
+   We can pay that cost in the background, during the seconds the
+   user spends reading the menu or typing their first question.
+
+       from warmup import start_warmup
+
+       warm = start_warmup(client, model)                 # load the model
+       ...show the menu...
+       warm = start_warmup(client, model, system_prompt)  # pre-process a persona
+       print(warm.describe())   # "ready in 2.4s" / "still warming up..." / "failed: ..."
+
+   With a system prompt, the warm-up sends that prompt too, so a
+   server with prompt caching (see prompt_layout.py) has already
+   processed it by the time the real first question arrives.
+
+   The warm-up thread is a daemon and swallows its own errors —
+   it can never block or crash the program.
+================================================================
+"""
+
+import threading
+import time
+
+
+class Warmup:
+    """Handle for one background warm-up request."""
+
+    def __init__(self, client, model, system_prompt=None):
+        self.client = client
+        self.model = model
+        self.system_prompt = system_prompt
+        self.status = "running"   # → "ready" or "failed"
+        self.error = None
+        self.seconds = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        messages = [{"role": "user", "content": "Hi"}]
+        if self.system_prompt:
+            messages.insert(0, {"role": "system", "content": self.system_prompt})
+        start = time.perf_counter()
+        try:
+            self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=1,      # we only want the load + prompt processing
+                temperature=0,
+            )
+            status = "ready"
+        except Exception as e:
+            status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+        # seconds and error first, status last: describe() runs on the
+        # main thread and may look at any moment
+        self.seconds = time.perf_counter() - start
+        self.status = status
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Block until the warm-up finishes (or `timeout` seconds). True if finished."""
+        return self._done.wait(timeout)
+
+    def describe(self):
+        """One-line status for the UI."""
+        if not self._done.is_set():
+            return "still warming up..."
+        if self.status == "ready":
+            return f"ready in {self.seconds:.1f}s"
+        if self.status == "failed":
+            return f"failed — {self.error}"
+        return "still warming up..."
+
+
+def start_warmup(client, model, system_prompt=None):
+    """Fire a tiny request in the background and return its Warmup handle."""
+    return Warmup(client, model, system_prompt).start()